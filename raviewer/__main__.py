@@ -7,14 +7,21 @@ import dearpygui.dearpygui as dpg
 dpg.create_context()
 
 import argparse
+import json
 import os
 import sys
 import logging
-from .src.core import (get_displayable, load_image, parse_image)
+from .src.core import (get_displayable, load_image, parse_image, set_threads,
+                       set_yuv_conversion, DEMOSAIC_METHODS)
 from .src.utils import save_image_as_file
-from .image.color_format import AVAILABLE_FORMATS, Endianness
+from .image.color_format import (AVAILABLE_FORMATS, Endianness, YUVMatrix,
+                                 YUVRange)
 from .gui.gui_init import AppInit
-from .format_recognition.detect import classify_top1, classify_all, predict_resolution
+from .format_recognition.detect import estimate_endianness, predict_resolution
+from .format_recognition.tiebreak import classify_ranked
+from .format_recognition.batch import detect_files
+from .format_recognition.scan import scan_file
+from .format_recognition.frames import first_frame
 from tests import test_formats
 
 
@@ -28,6 +35,18 @@ def check_formats():
     test_formats.test_all(AVAILABLE_FORMATS)
 
 
+def detect(paths, jobs):
+    '''Print detection results for given files as JSON lines'''
+    for report in detect_files(paths, jobs):
+        print(json.dumps(report), flush=True)
+
+
+def scan(path):
+    '''Print image-like regions found in given file as JSON lines'''
+    for region in scan_file(path):
+        print(json.dumps(region), flush=True)
+
+
 def run(file_path, width, height, color_format, export, args):
     if args["software_rendering"]:
         # These variables are needed to force OpenGL software rendering
@@ -36,6 +55,11 @@ def run(file_path, width, height, color_format, export, args):
         os.environ['__GLX_VENDOR_LIBRARY_NAME'] = 'mesa'
         os.environ['LIBGL_ALWAYS_SOFTWARE'] = 'true'
 
+    set_threads(args["threads"])
+    set_yuv_conversion(
+        YUVMatrix[args["yuv_matrix"].upper()] if args["yuv_matrix"] else None,
+        YUVRange[args["yuv_range"].upper()] if args["yuv_range"] else None)
+
     log_level = logging.DEBUG if args["debug"] else logging.WARNING
     logging.basicConfig(level=log_level,
                         format="%(asctime)s - %(levelname)s - %(message)s")
@@ -62,14 +86,19 @@ def run(file_path, width, height, color_format, export, args):
             raise FileNotFoundError(
                 "{} - no such file or directory".format(export))
         img = load_image(file_path)
+        frame, n_frames = first_frame(img)
         if color_format == "unknown":
-            color_format, _ = classify_top1(img)
+            predictions, _, _ = classify_ranked(frame, width)
+            color_format = predictions[0]
         if width == 0:
-            width, _ = predict_resolution(img, color_format)[0]
+            width, _ = predict_resolution(frame, color_format)[0]
+        #Only the first frame of a recording is exported, unless the frame height is given
+        if height < 1:
+            img = frame
 
         if "endianness" in args and args["endianness"]:
             if args["endianness"] == 'auto':
-                predictions, endianness = classify_all(img)
+                endianness, _ = estimate_endianness(frame, color_format)
                 endianness = Endianness[endianness]
             elif args["endianness"] == 'little':
                 endianness = Endianness.LITTLE_ENDIAN
@@ -78,9 +107,16 @@ def run(file_path, width, height, color_format, export, args):
 
             AVAILABLE_FORMATS[color_format].endianness = endianness
 
-        img = parse_image(img.data_buffer, color_format, width)
+        img = parse_image(img.data_buffer,
+                          color_format,
+                          width,
+                          stride=args["stride"])
         if height < 1: height = img.height
-        save_image_as_file(get_displayable(img, height), export)
+        save_image_as_file(
+            get_displayable(img,
+                            height,
+                            gamma=args["gamma"],
+                            demosaic=args["demosaic"]), export)
 
 
 def main():
@@ -118,12 +154,78 @@ def main():
                         action='store_true',
                         help='Test all formats')
 
+    parser.add_argument(
+        '--detect',
+        nargs='+',
+        metavar='PATH',
+        help=
+        'Detect format, endianness and resolution of given files (or files in given directories) and print results as JSON lines'
+    )
+
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        help=
+        'Number of worker processes used by --detect (default: number of CPUs)'
+    )
+
+    parser.add_argument(
+        '--scan',
+        metavar='PATH',
+        help=
+        'Locate regions that look like images in given file (e.g. a memory or firmware dump) and print their offsets, sizes, likely formats and widths as JSON lines'
+    )
+
     parser.add_argument('-H',
                         '--height',
                         type=int,
                         default=0,
                         help="Image height")
 
+    parser.add_argument(
+        '--stride',
+        type=int,
+        default=0,
+        help=
+        "Number of bytes per line including padding, 0 if lines are not padded (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        '--gamma',
+        type=float,
+        default=1.0,
+        help=
+        "Display gamma of exported grayscale and Bayer images (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        '--demosaic',
+        choices=list(DEMOSAIC_METHODS),
+        default="bilinear",
+        help=
+        "Demosaicing method of Bayer images, bilinear is the fastest, vng and ea preserve edges better (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=0,
+        help=
+        "Number of threads converting bands of images to RGB, 0 for the number of CPUs (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        '--yuv-matrix',
+        choices=[matrix.name.lower() for matrix in YUVMatrix],
+        help="Conversion matrix of YUV images (default: bt601)")
+
+    parser.add_argument(
+        '--yuv-range',
+        choices=[yuv_range.name.lower() for yuv_range in YUVRange],
+        help="Range of values of YUV images (default: limited)")
+
     parser.add_argument("--software-rendering",
                         action=argparse.BooleanOptionalAction,
                         default=True,
@@ -151,6 +253,10 @@ def main():
         list_formats()
     elif args["check_formats"]:
         check_formats()
+    elif args["detect"]:
+        detect(args["detect"], args["jobs"])
+    elif args["scan"]:
+        scan(args["scan"])
     else:
         run(file_path=args["FILE_PATH"],
             width=args["width"],
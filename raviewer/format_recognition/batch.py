@@ -0,0 +1,85 @@
+"""Batch format detection producing machine-readable reports"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from raviewer.src.core import load_image
+from raviewer.format_recognition.detect import predict_resolution
+from raviewer.format_recognition.tiebreak import classify_ranked
+from raviewer.format_recognition.frames import first_frame
+
+
+def collect_files(paths: Iterable[str]) -> List[str]:
+    """Expands given paths into a list of files, walking directories recursively
+    Keyword arguments:
+        paths: iterable of file or directory paths
+
+    Returns: list of file paths in the order they were given, directories sorted
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name) for name in sorted(names))
+        else:
+            files.append(path)
+    return files
+
+
+def detect_file(file_path: str) -> Dict:
+    """Runs format, endianness and resolution detection on a single file
+    Keyword arguments:
+        file_path: path to the file with raw data
+
+    Returns: dictionary with detection results, serializable to JSON
+    """
+    report = {"file": file_path}
+    try:
+        img = load_image(file_path)
+        start = time.perf_counter()
+        frame, n_frames = first_frame(img)
+        split = time.perf_counter()
+        formats, endianness, confidence = classify_ranked(frame)
+        classified = time.perf_counter()
+        resolutions = predict_resolution(frame, formats[0])
+        finished = time.perf_counter()
+    except Exception as e:
+        report["error"] = "{}: {}".format(type(e).__name__, e)
+        return report
+
+    report.update({
+        "size": len(img.data_buffer),
+        "formats": formats,
+        "confidence": round(confidence, 3),
+        "endianness": endianness,
+        "resolutions": [[int(w), int(h)] for w, h in resolutions],
+        "frames": n_frames,
+        "frame_size": len(frame.data_buffer),
+        "time": {
+            "frames": round(split - start, 6),
+            "format": round(classified - split, 6),
+            "resolution": round(finished - classified, 6),
+        }
+    })
+    return report
+
+
+def detect_files(paths: Iterable[str],
+                 jobs: Optional[int] = None) -> Iterator[Dict]:
+    """Runs detection on every file in a pool of worker processes
+    Keyword arguments:
+        paths: iterable of file or directory paths
+        jobs: number of worker processes, defaults to the number of CPUs
+
+    Returns: iterator over detection reports, in the order of the input files
+    """
+    files = collect_files(paths)
+    if jobs == 1 or len(files) <= 1:
+        yield from map(detect_file, files)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(detect_file, files)
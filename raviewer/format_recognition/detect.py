@@ -23,6 +23,20 @@ GRAY_CUTOFF = 6
 # constant used to differentiate RGGB from RG16 format
 RGGB_CUTOFF = 2300
 
+# constants used for estimating endianness by voting of blocks sampled from the data
+# number of blocks sampled at first
+ENDIANNESS_SAMPLE_BLOCKS = 8
+# size of a sampled block in bytes
+ENDIANNESS_BLOCK_SIZE = 4096
+# fraction of the blocks the winning byte order has to lead by to stop sampling
+ENDIANNESS_CONFIDENCE_CUTOFF = 0.6
+# maximal number of sampled bytes
+ENDIANNESS_MAX_SAMPLE = 1 << 19
+# relative difference of roughness below which a block does not vote
+ENDIANNESS_TIE_CUTOFF = 0.05
+# weight of the roughness of alpha, which is expected to be constant
+ENDIANNESS_ALPHA_WEIGHT = 4
+
 # list of recognized formats, grouped together if indistinguishable
 list_of_groups = [["unknown"], ["GRAY"], ["I422"], ["I420", "YV12"],
                   ["NV12", "NV21"], ["YUY2", "YVYU"], ["UYVY", "VYUY"],
@@ -140,6 +154,28 @@ def check_10bits_per_channel(img: Image, dtype: str = ">u2") -> bool:
     return check_bits_per_channel(img, 10, dtype)
 
 
+def cutoff_margin(value: float, cutoff: float) -> float:
+    """Measures how far a statistic is from the cutoff it is compared with
+    Keyword arguments:
+        value: value of the statistic
+        cutoff: cutoff of the decision
+
+    Returns: relative distance between 0 (at the cutoff) and 1
+    """
+    return float(abs(value - cutoff) / max(abs(value), abs(cutoff), 1e-9))
+
+
+def score_margin(scores: List[float]) -> float:
+    """Measures how much the highest of scores of candidates leads
+    Keyword arguments:
+        scores: list of non-negative scores
+
+    Returns: difference of the two highest scores relative to the highest one, between 0 and 1
+    """
+    first, second = sorted(scores, reverse=True)[:2]
+    return float((first - second) / max(first, 1e-9))
+
+
 def rolling_window(array: npt.NDArray, window: int) -> npt.NDArray:
     """Prepares view of array for fast calculation of rolling statistics like variance
     Keyword arguments:
@@ -164,8 +200,8 @@ def is_yuv(img: Image) -> bool:
     return False
 
 
-def yuv_type(img: Image) -> List[str]:
-    """For given YUV image determines its specific format"""
+def yuv_type(img: Image) -> Tuple[List[str], float]:
+    """For given YUV image determines its specific format and confidence between 0 and 1"""
     data = np.frombuffer(img.data_buffer, dtype=np.uint8)
     buffer_length = len(data)
 
@@ -193,9 +229,11 @@ def yuv_type(img: Image) -> List[str]:
         planar_or_semi1, planar_or_semi2)
     packed_score = max(packed1, packed2) / min(packed1, packed2)
     winning_score = max(planar_score, planar_or_semi_score, packed_score)
+    confidence = score_margin(
+        [planar_score, planar_or_semi_score, packed_score])
 
     if planar_score == winning_score:
-        return ["I422"]
+        return ["I422"], confidence
     elif planar_or_semi_score == winning_score:
 
         semiplanar_uv_1 = data[int(buffer_length * 2 / 3)::2]
@@ -207,10 +245,12 @@ def yuv_type(img: Image) -> List[str]:
         semiplanar_score = np.std(semiplanar_uv_1) + np.std(semiplanar_uv_2)
         planar_score = np.std(planar_uv_1) + np.std(planar_uv_2)
         winning_score = max(semiplanar_score, planar_score)
+        confidence = min(confidence,
+                         score_margin([semiplanar_score, planar_score]))
         if semiplanar_score == winning_score:
-            return ["I420", "YV12"]
+            return ["I420", "YV12"], confidence
         else:
-            return ["NV12", "NV21"]
+            return ["NV12", "NV21"], confidence
     else:
         #extract information about U and V channels
         channel1 = data[0::2]
@@ -219,10 +259,14 @@ def yuv_type(img: Image) -> List[str]:
         roll_std2 = np.std(rolling_window(channel2, 20), axis=-1)
         rolling_variance_median_1 = np.median(roll_std1)
         rolling_variance_median_2 = np.median(roll_std2)
+        confidence = min(
+            confidence,
+            score_margin(
+                [rolling_variance_median_1, rolling_variance_median_2]))
         if rolling_variance_median_1 < rolling_variance_median_2:
-            return ["YUY2", "YVYU"]
+            return ["YUY2", "YVYU"], confidence
         else:
-            return ["UYVY", "VYUY"]
+            return ["UYVY", "VYUY"], confidence
 
 
 def dtype_to_endianness(dtype: str) -> str:
@@ -241,8 +285,124 @@ def try_endianness(img: Image, f: Callable[..., bool],
     return dtype
 
 
-def classify_using_color_distribution(img: Image) -> Tuple[List[str], str]:
-    """Predicts image format and its endianness by inspecting color distribution"""
+def endianness_fields(
+        fmt_name: Optional[str]) -> Optional[List[Tuple[int, int, float]]]:
+    """Lists fields of 2-byte words that are compared between byte orders
+    Keyword arguments:
+        fmt_name: string with color format or None if the format is unknown
+
+    Returns: list of shifts, widths and weights of the fields or None if byte order does not matter in given format
+    """
+    if fmt_name is None:
+        return [(0, 16, 1)]
+    color_fmt = determine_color_format(fmt_name)
+    bpcs = [bits for bits in color_fmt.bits_per_components if bits]
+    if max(bpcs) > 8:
+        return [(0, 16, 1)]
+    if sum(bpcs) != 16:
+        return None
+    #components are stored from the most significant bits, like in the RGB parser
+    alpha = color_fmt.pixel_format.name.find("A")
+    fields = []
+    shift = 16
+    for i, bits in enumerate(bpcs):
+        shift -= bits
+        fields.append(
+            (shift, bits, ENDIANNESS_ALPHA_WEIGHT if i == alpha else 1))
+    return fields
+
+
+def sample_blocks(data: npt.NDArray, n_blocks: int,
+                  block_size: int) -> npt.NDArray:
+    """Gathers evenly spaced blocks starting at even offsets
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        n_blocks: number of blocks
+        block_size: even length of a block in bytes
+
+    Returns: 2D array with a block in every row
+    """
+    n_blocks = max(min(n_blocks, len(data) // block_size), 1)
+    starts = np.linspace(0,
+                         len(data) - block_size, n_blocks).astype(
+                             np.int64) & ~1
+    return data[starts[:, None] + np.arange(block_size)]
+
+
+def roughness(words: npt.NDArray, fields: List[Tuple[int, int,
+                                                     float]]) -> npt.NDArray:
+    """Computes mean absolute difference of neighboring values of given fields
+    Keyword arguments:
+        words: 2D array of 2-byte words
+        fields: list of shifts, widths and weights of the fields
+
+    Returns: weighted sum of differences normalized by the fields' ranges, one per row
+    """
+    total = np.zeros(len(words))
+    for shift, bits, weight in fields:
+        mask = (1 << bits) - 1
+        values = ((words >> shift) & mask).astype(np.int32)
+        total += weight * np.abs(np.diff(values, axis=1)).mean(axis=1) / mask
+    return total
+
+
+def endianness_votes(blocks: npt.NDArray,
+                     fields: List[Tuple[int, int, float]]) -> Tuple[int, int]:
+    """Lets every block vote for the byte order in which its values are smoother
+    Keyword arguments:
+        blocks: 2D uint8 array with a block in every row
+        fields: list of shifts, widths and weights of compared fields
+
+    Returns: number of votes for big and little endian
+    """
+    big = roughness(blocks.view('>u2'), fields)
+    little = roughness(blocks.view('<u2'), fields)
+    difference = (little - big) / np.maximum(little + big, 1e-9)
+    return int(np.count_nonzero(difference > ENDIANNESS_TIE_CUTOFF)), int(
+        np.count_nonzero(difference < -ENDIANNESS_TIE_CUTOFF))
+
+
+def estimate_endianness(img: Image,
+                        fmt_name: Optional[str] = None) -> Tuple[str, float]:
+    """Estimates endianness from a small sample of the data
+
+    Natural images are smooth, so neighboring values decoded in the right
+    byte order differ less than in the swapped one. A few blocks sampled
+    across the buffer vote and the sample grows only if the vote is close.
+
+    Keyword arguments:
+        img: Image instance
+        fmt_name: string with color format or None if the format is unknown
+
+    Returns: string with endianness and confidence between 0 and 1
+    """
+    default = "BIG_ENDIAN"
+    if fmt_name is not None:
+        default = determine_color_format(fmt_name).endianness.name
+    fields = endianness_fields(fmt_name)
+    if fields is None:
+        return default, 1.0
+    data = np.frombuffer(img.data_buffer, dtype=np.uint8)
+    block_size = min(ENDIANNESS_BLOCK_SIZE, len(data)) & ~1
+    if block_size < 4:
+        return default, 0.0
+    n_blocks = ENDIANNESS_SAMPLE_BLOCKS
+    while True:
+        blocks = sample_blocks(data, n_blocks, block_size)
+        big, little = endianness_votes(blocks, fields)
+        confidence = abs(big - little) / len(blocks)
+        if (confidence >= ENDIANNESS_CONFIDENCE_CUTOFF or blocks.size >= min(
+                len(data) - block_size, ENDIANNESS_MAX_SAMPLE)):
+            break
+        n_blocks *= 4
+    if big == little:
+        return default, confidence
+    return ("BIG_ENDIAN" if big > little else "LITTLE_ENDIAN"), confidence
+
+
+def classify_using_color_distribution(
+        img: Image) -> Tuple[List[str], str, float]:
+    """Predicts image format, its endianness and confidence between 0 and 1 by inspecting color distribution"""
     data = np.frombuffer(img.data_buffer, dtype=np.uint8)
     hists = []
     divisible = True
@@ -266,6 +426,7 @@ def classify_using_color_distribution(img: Image) -> Tuple[List[str], str]:
                                      len(hists[0]) // 10),
                       axis=-1)
 
+    confidence = cutoff_margin(np.median(roll_std), BAYER_AND_GRAY_CUTOFF)
     if np.median(roll_std) >= BAYER_AND_GRAY_CUTOFF:
         parsed = parse_image(img.data_buffer.copy(), 'RGB565', len(data) // 2)
         hists = []
@@ -277,67 +438,87 @@ def classify_using_color_distribution(img: Image) -> Tuple[List[str], str]:
         roll_std = np.std(rolling_window(hists[0][:32] / channel_length,
                                          len(hists[0]) // 10),
                           axis=-1)
+        confidence = min(confidence,
+                         cutoff_margin(np.median(roll_std), RGB565_CUTOFF))
         if np.median(roll_std) >= RGB565_CUTOFF:
-            return ["RGB332"], "LITTLE_ENDIAN"
+            return ["RGB332"], "LITTLE_ENDIAN", confidence
         else:
-            try:
+            endianness, endian_conf = estimate_endianness(img, "RGB565")
+            if endian_conf < ENDIANNESS_CONFIDENCE_CUTOFF:
                 endianness = "LITTLE_ENDIAN"
-                big_endian = np.frombuffer(img.data_buffer,
-                                           dtype=np.dtype('>u2'))
-                little_endian = np.frombuffer(img.data_buffer,
-                                              dtype=np.dtype('<u2'))
-                big_endian_variance = np.median(
-                    np.std(rolling_window(big_endian, 10), axis=-1))
-                little_endian_variance = np.median(
-                    np.std(rolling_window(little_endian, 10), axis=-1))
-                if big_endian_variance < little_endian_variance:
-                    endianness = "BIG_ENDIAN"
-            except ValueError:
-                endianness = "LITTLE_ENDIAN"
-            return ["RGB565"], endianness
+            return ["RGB565"], endianness, confidence
     corr = np.corrcoef(hists[0], hists[1])[0, 1]
+    if divisible:
+        #correlations close to 1 are compared by their distance from 1
+        confidence = min(confidence, cutoff_margin(1 - corr, 1 - 0.95))
     #if the image does not have 3 channels then the correlation between 3 arbitrary channels is higher
     if corr >= 0.95 or not divisible:
         roll_std = np.std(rolling_window(data, 5), axis=-1)
+        confidence = min(confidence,
+                         cutoff_margin(np.median(roll_std), GRAY_CUTOFF))
         if np.median(roll_std) <= GRAY_CUTOFF:
-            return ["GRAY"], "BIG_ENDIAN"
+            return ["GRAY"], "BIG_ENDIAN", confidence
         try:
             data = np.frombuffer(img.data_buffer, dtype=np.dtype('>u2'))
             roll_std = np.std(rolling_window(data, 5), axis=-1)
+            confidence = min(confidence,
+                             cutoff_margin(np.median(roll_std), RGGB_CUTOFF))
             if np.median(roll_std) <= RGGB_CUTOFF:
-                return ["RGGB"], "BIG_ENDIAN"
+                return ["RGGB"], "BIG_ENDIAN", confidence
             else:
-                return ["RG16"], "BIG_ENDIAN"  #TODO: add test for endianness
+                return [
+                    "RG16"
+                ], "BIG_ENDIAN", confidence  #TODO: add test for endianness
         except ValueError:
-            return ["RGGB"], "BIG_ENDIAN"
-    return ["RGB24", "BGR24"], "BIG_ENDIAN"
+            return ["RGGB"], "BIG_ENDIAN", confidence
+    return ["RGB24", "BGR24"], "BIG_ENDIAN", confidence
 
 
-def classify_2byte(img: Image) -> Tuple[List[str], str]:
-    """Predicts image format given that it uses 2 bytes per channel value"""
+def classify_2byte(img: Image) -> Tuple[List[str], str, float]:
+    """Predicts image format, its endianness and confidence between 0 and 1 given that it uses 2 bytes per channel value"""
     dtype = try_endianness(img, check_12bits_per_channel)
     if dtype is not None:
         deviation = np.std(
             np.frombuffer(img.data_buffer, dtype=np.dtype(dtype)))
+        confidence = cutoff_margin(deviation, GRAY_CUTOFF_12BIT)
         if GRAY_CUTOFF_12BIT < deviation:
-            return ["RG12"], dtype_to_endianness(dtype)
+            return ["RG12"], dtype_to_endianness(dtype), confidence
         else:
-            return ["GRAY12"], dtype_to_endianness(dtype)
+            return ["GRAY12"], dtype_to_endianness(dtype), confidence
 
     dtype = try_endianness(img, check_10bits_per_channel)
     if dtype is not None:
         deviation = np.std(
             np.frombuffer(img.data_buffer, dtype=np.dtype(dtype)))
+        confidence = cutoff_margin(deviation, GRAY_CUTOFF_10BIT)
         if GRAY_CUTOFF_10BIT < deviation:
-            return ["RG10"], dtype_to_endianness(dtype)
+            return ["RG10"], dtype_to_endianness(dtype), confidence
         else:
-            return ["GRAY10"], dtype_to_endianness(dtype)
+            return ["GRAY10"], dtype_to_endianness(dtype), confidence
 
 
 def classify(img: Image) -> Tuple[List[str], str]:
     """Predicts image format and its endianness"""
+    fmts, endianness, _ = classify_scored(img)
+    return fmts, endianness
+
+
+def classify_scored(img: Image) -> Tuple[List[str], str, float]:
+    """Predicts image format, its endianness and confidence of the format
+
+    The confidence is the smallest margin of the decisions made, i.e. how
+    far statistics are from their cutoffs or how much the score of the
+    chosen candidate leads the others. Checks of exact bit patterns are
+    certain.
+
+    Keyword arguments:
+        img: Image instance
+
+    Returns: list of strings with image formats, string with endianness and confidence between 0 and 1
+    """
     if is_yuv(img):
-        return yuv_type(img), "BIG_ENDIAN"
+        fmts, confidence = yuv_type(img)
+        return fmts, "BIG_ENDIAN", confidence
     else:
         if try_endianness(
                 img, check_12bits_per_channel) is not None or try_endianness(
@@ -345,22 +526,22 @@ def classify(img: Image) -> Tuple[List[str], str]:
             return classify_2byte(img)
 
         if is_every_fourth_max(img, start=3):
-            return ["RGBA32", "BGRA32"], "BIG_ENDIAN"
+            return ["RGBA32", "BGRA32"], "BIG_ENDIAN", 1.
         if is_every_fourth_max(img, start=0):
-            return ["ARGB32", "ABGR32"], "BIG_ENDIAN"
+            return ["ARGB32", "ABGR32"], "BIG_ENDIAN", 1.
 
         dtype = try_endianness(img, are_bits_set, num_bits=4, start=False)
         if dtype is not None:
-            return ["RGBA444", "BGRA444"], dtype_to_endianness(dtype)
+            return ["RGBA444", "BGRA444"], dtype_to_endianness(dtype), 1.
         dtype = try_endianness(img, are_bits_set, num_bits=4, start=True)
         if dtype is not None:
-            return ["ARGB444", "ABGR444"], dtype_to_endianness(dtype)
+            return ["ARGB444", "ABGR444"], dtype_to_endianness(dtype), 1.
         dtype = try_endianness(img, are_bits_set, num_bits=1, start=False)
         if dtype is not None:
-            return ["RGBA555", "BGRA555"], dtype_to_endianness(dtype)
+            return ["RGBA555", "BGRA555"], dtype_to_endianness(dtype), 1.
         dtype = try_endianness(img, are_bits_set, num_bits=1, start=True)
         if dtype is not None:
-            return ["ARGB555", "ABGR555"], dtype_to_endianness(dtype)
+            return ["ARGB555", "ABGR555"], dtype_to_endianness(dtype), 1.
 
         return classify_using_color_distribution(img)
 
@@ -391,11 +572,22 @@ def classify_all(img: Image) -> Tuple[list[str], str]:
 
     Returns: list of strings with image formats and string with endianness
     """
-    fmts, endianness = classify(img)
+    fmts, endianness, _ = classify_all_scored(img)
+    return fmts, endianness
+
+
+def classify_all_scored(img: Image) -> Tuple[list[str], str, float]:
+    """Predicts format of the image, its endianness and confidence of the first format
+    Keyword arguments:
+        img: Image instance
+
+    Returns: list of strings with image formats, string with endianness and confidence between 0 and 1, see classify_scored
+    """
+    fmts, endianness, confidence = classify_scored(img)
     top2 = top2_dict.get(fmts[0])
     if top2 is not None:
         fmts += top2
-    return fmts, endianness
+    return fmts, endianness, confidence
 
 
 def possible_resolutions(length: int, ratio_limit: int = 4) -> List[int]:
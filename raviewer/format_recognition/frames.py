@@ -0,0 +1,161 @@
+"""Detection of the frame size of dumps containing several frames, e.g. recordings"""
+import numpy as np
+import cv2 as cv
+import numpy.typing as npt
+from typing import Tuple
+
+from raviewer.image.image import Image
+from raviewer.format_recognition.scan import BLOCK_SIZE, row_periodicity
+
+# number of blocks the buffer is divided into to find the frame period
+N_BLOCKS = 1 << 14
+# smallest number of blocks in a frame
+MIN_FRAME_BLOCKS = 8
+# autocorrelation of block statistics at the frame period has to reach this value
+PERIOD_CUTOFF = 0.85
+# and exceed its minimum at shorter lags by this value
+PROMINENCE_CUTOFF = 0.3
+# fraction of the strongest peak a shorter period has to reach to be chosen over it
+HARMONIC_FRACTION = 0.9
+# number of bytes of the first frame matched against the second one
+MATCH_LENGTH = 1 << 16
+# correlation between the first and the second frame required to accept the period
+MATCH_CUTOFF = 0.5
+
+
+def line_stride(data: npt.NDArray) -> int:
+    """Estimates the line length of image data at the beginning of the buffer
+
+    Returns: line length in bytes or 1 if the buffer is too short
+    """
+    if len(data) < BLOCK_SIZE:
+        return 1
+    strides, _ = row_periodicity(np.asarray(data[:BLOCK_SIZE])[None])
+    return int(strides[0])
+
+
+def block_autocorrelation(means: npt.NDArray) -> npt.NDArray:
+    """Computes unbiased autocorrelation of a sequence for lags up to a half of its length
+
+    Keyword arguments:
+        means: 1D array of block statistics
+
+    Returns: array of correlation coefficients indexed by lag
+    """
+    n = len(means)
+    centered = means - means.mean()
+    spectrum = np.fft.rfft(centered, 2 * n)
+    correlation = np.fft.irfft(spectrum * spectrum.conj())[:n // 2 + 1]
+    if correlation[0] <= 0:
+        return np.zeros_like(correlation)
+    # every lag is normalized by the number of overlapping blocks
+    return correlation / correlation[0] * n / (n - np.arange(len(correlation)))
+
+
+def coarse_period(correlation: npt.NDArray) -> int:
+    """Chooses the frame period among peaks of autocorrelation of block statistics
+
+    Blocks of consecutive frames are similar, so the autocorrelation peaks at
+    the frame period and its multiples. The shortest period whose peak is
+    nearly as strong as the strongest one is chosen.
+
+    Keyword arguments:
+        correlation: autocorrelation indexed by lag
+
+    Returns: frame period in blocks or 0 if there is no distinct peak
+    """
+    lags = np.arange(MIN_FRAME_BLOCKS, len(correlation))
+    if len(lags) == 0:
+        return 0
+    values = correlation[lags]
+    # the longest lag (two frames) has no right neighbor
+    following = np.append(correlation[lags[:-1] + 1], -np.inf)
+    dips = np.minimum.accumulate(correlation[1:])[lags - 2]
+    peaks = ((values >= correlation[lags - 1]) & (values >= following) &
+             (values >= PERIOD_CUTOFF) & (values - dips >= PROMINENCE_CUTOFF))
+    if not peaks.any():
+        return 0
+    strongest = values[peaks].max()
+    return int(lags[peaks & (values >= HARMONIC_FRACTION * strongest)][0])
+
+
+def refine_period(data: npt.NDArray, coarse: int, tolerance: int) -> int:
+    """Finds the exact frame period by matching the first frame against the second one
+
+    Periods dividing the buffer into whole frames are preferred, as long as
+    the frames match at them.
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        coarse: approximate frame period in bytes
+        tolerance: maximal error of the approximate period
+
+    Returns: frame period in bytes or 0 if frames do not match
+    """
+    length = min(MATCH_LENGTH, coarse - tolerance)
+    first = max(coarse - tolerance, 1)
+    window = np.asarray(data[first:coarse + tolerance + length])
+    if length < 1 or len(window) < length:
+        return 0
+    scores = cv.matchTemplate(window[None],
+                              np.asarray(data[:length])[None],
+                              cv.TM_CCOEFF_NORMED)[0]
+    periods = np.arange(first, first + len(scores))
+    n_frames = np.arange(len(data) // periods[-1], len(data) // first + 1)
+    whole = len(data) // n_frames[len(data) % n_frames == 0]
+    whole = whole[(whole >= first) & (whole <= periods[-1])]
+    if len(whole) and scores[whole - first].max() >= MATCH_CUTOFF:
+        return int(whole[scores[whole - first].argmax()])
+    return int(periods[scores.argmax()]) if scores.max() >= MATCH_CUTOFF else 0
+
+
+def frame_period(data: npt.NDArray) -> int:
+    """Estimates the frame period of a buffer containing several similar frames.
+
+    The buffer is divided into blocks of whole lines, so that the blocks'
+    mean values follow the content of the frame from top to bottom. The
+    period is found in the autocorrelation of the means and refined to single
+    bytes by matching the data of the first two frames.
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array (e.g. numpy.memmap)
+
+    Returns: frame period in bytes or 0 if the buffer does not consist of frames
+    """
+    stride = line_stride(data)
+    block_size = stride * max(-(-len(data) // (N_BLOCKS * stride)), 1)
+    n_blocks = len(data) // block_size
+    if n_blocks < 2 * MIN_FRAME_BLOCKS:
+        return 0
+    means = np.asarray(data[:n_blocks * block_size]).reshape(
+        n_blocks, block_size).mean(axis=1)
+    period = coarse_period(block_autocorrelation(means))
+    if period == 0:
+        return 0
+    return refine_period(data, period * block_size, block_size)
+
+
+def find_frames(img: Image) -> Tuple[int, int]:
+    """Finds frames in a buffer containing a recording
+    Keyword arguments:
+        img: Image instance
+
+    Returns: size of a frame in bytes and the number of whole frames
+    """
+    period = frame_period(np.frombuffer(img.data_buffer, dtype=np.uint8))
+    if period == 0 or len(img.data_buffer) // period < 2:
+        return len(img.data_buffer), 1
+    return period, len(img.data_buffer) // period
+
+
+def first_frame(img: Image) -> Tuple[Image, int]:
+    """Extracts the first frame of a buffer containing a recording
+    Keyword arguments:
+        img: Image instance
+
+    Returns: Image instance with the first frame (img itself if there is one frame) and the number of frames
+    """
+    frame_size, n_frames = find_frames(img)
+    if n_frames == 1:
+        return img, 1
+    return Image(img.data_buffer[:frame_size]), n_frames
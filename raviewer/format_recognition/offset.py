@@ -0,0 +1,176 @@
+"""Discovery of data offsets (e.g. headers) at the beginning of raw dumps"""
+import numpy as np
+import numpy.typing as npt
+from typing import List, Tuple
+
+from raviewer.image.color_format import PixelFormat, PixelPlane, SubsampledColorFormat
+from raviewer.src.utils import determine_color_format
+from raviewer.image.image import Image
+
+# number of rows sampled from the whole buffer to locate the row boundary
+SAMPLE_ROWS = 256
+# fraction of the typical row-to-row correlation a row has to reach to be considered image data
+COHERENCE_CUTOFF = 0.5
+
+
+def line_layout(fmt_name: str, width: int) -> Tuple[int, int]:
+    """Computes the number of bytes in the first plane's line and the length of the repeating pixel pattern
+    Keyword arguments:
+        fmt_name: string with color format
+        width: image width in pixels
+
+    Returns: bytes per line and bytes per smallest repeating group of pixels
+    """
+    color_fmt = determine_color_format(fmt_name)
+    bpcs = color_fmt.bits_per_components
+    if color_fmt.pixel_format in [
+            PixelFormat.MONO, PixelFormat.BAYER_RG, PixelFormat.BAYER_BG,
+            PixelFormat.BAYER_GB, PixelFormat.BAYER_GR
+    ] or isinstance(color_fmt, SubsampledColorFormat):
+        pixel_bytes = (bpcs[0] + 7) // 8
+    else:
+        pixel_bytes = (sum(bpcs) + 7) // 8
+
+    group = 1
+    if color_fmt.pixel_format.name.startswith("BAYER"):
+        group = 2
+    elif isinstance(color_fmt, SubsampledColorFormat):
+        if color_fmt.pixel_plane == PixelPlane.PACKED:
+            pixel_bytes *= 2
+            group = 2
+    return pixel_bytes * width, pixel_bytes * group
+
+
+def _gather_rows(data: npt.NDArray, starts: npt.NDArray,
+                 length: int) -> npt.NDArray:
+    """Gathers rows of given length starting at given positions into a float32 matrix"""
+    return data[starts[:, None] + np.arange(length)].astype(np.float32)
+
+
+def row_boundary_scores(data: npt.NDArray, stride: int,
+                        group: int) -> npt.NDArray:
+    """Scores every position within a line for being the beginning of an image row.
+
+    Image rows are continuous, while the end of one row and the beginning of
+    the next one usually are not, which results in a vertical seam visible in
+    the image if the data is misaligned. The seam is located by averaging
+    horizontal differences over rows sampled from the whole buffer.
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        stride: number of bytes in a line
+        group: distance in bytes between the same components of neighboring pixels
+
+    Returns: array of scores (relative to the median) indexed by the offset modulo stride
+    """
+    n_rows = (len(data) - group) // stride
+    if n_rows < 2:
+        return np.zeros(stride, dtype=np.float32)
+    starts = np.linspace(0, n_rows - 1, min(SAMPLE_ROWS, n_rows)).astype(
+        np.int64) * stride
+    rows = _gather_rows(data, starts, stride + group)
+    gradient = np.abs(rows[:, group:] - rows[:, :-group]).mean(axis=0)
+
+    # difference crossing a row boundary at b is stored at b - group ... b - 1
+    seam = np.zeros(stride, dtype=np.float32)
+    for lag in range(1, group + 1):
+        seam += np.roll(gradient, lag)
+    median = np.median(seam)
+    return seam / median if median > 0 else seam
+
+
+def row_correlation(a: npt.NDArray, b: npt.NDArray) -> npt.NDArray:
+    """Computes correlation coefficients between corresponding rows of two arrays
+
+    Keyword arguments:
+        a, b: 2D arrays of rows of the same shape
+
+    Returns: array with correlation of every pair of rows (0 for constant rows)
+    """
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    products = (a * b).sum(axis=1)
+    denominators = np.sqrt((a**2).sum(axis=1) * (b**2).sum(axis=1))
+    return np.divide(products,
+                     denominators,
+                     out=np.zeros_like(products),
+                     where=denominators > 0)
+
+
+def row_coherence(rows: npt.NDArray, period: int = 1) -> npt.NDArray:
+    """Computes correlation coefficients between rows period rows apart"""
+    return row_correlation(rows[:-period], rows[period:])
+
+
+def header_rows(data: npt.NDArray,
+                start: int,
+                stride: int,
+                max_rows: int,
+                period: int = 1) -> int:
+    """Counts whole rows at the beginning of data that do not look like image data
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        start: offset of the first row
+        stride: number of bytes in a line
+        max_rows: maximal number of rows that can be skipped
+        period: number of rows after which the pattern of components repeats
+
+    Returns: number of rows to skip
+    """
+    n_rows = (len(data) - start) // stride
+    if n_rows < 2 + period:
+        return 0
+    starts = np.linspace(0, n_rows - 1 - period,
+                         min(SAMPLE_ROWS, n_rows - period))
+    starts = starts.astype(np.int64) * stride + start
+    typical = np.median(
+        row_correlation(_gather_rows(data, starts, stride),
+                        _gather_rows(data, starts + period * stride, stride)))
+    if typical <= 0:
+        return 0
+
+    max_rows = min(max_rows, n_rows - 1 - period)
+    head = _gather_rows(data,
+                        start + np.arange(max_rows + 1 + period) * stride,
+                        stride)
+    coherent = np.nonzero(
+        row_coherence(head, period) >= COHERENCE_CUTOFF * typical)[0]
+    return int(coherent[0]) if len(coherent) else 0
+
+
+def find_offsets(img: Image,
+                 fmt_name: str,
+                 width: int,
+                 max_offset: int = 65536,
+                 count: int = 3) -> List[Tuple[int, float]]:
+    """Suggests offsets at which image data begins, e.g. after a header
+    Keyword arguments:
+        img: Image instance
+        fmt_name: string with color format
+        width: image width in pixels
+        max_offset: maximal offset to consider
+        count: number of suggested offsets
+
+    Returns: list of up to count pairs of offset (in bytes) and its score, best first
+    """
+    data = np.frombuffer(img.data_buffer, dtype=np.uint8)
+    stride, group = line_layout(fmt_name, width)
+    if stride <= 0 or len(data) < 2 * stride + group:
+        return [(0, 0.0)]
+
+    # rows of color filter arrays alternate, so rows of the same kind are compared
+    period = 2 if determine_color_format(
+        fmt_name).pixel_format.name.startswith("BAYER") else 1
+    scores = row_boundary_scores(data, stride, group)
+    candidates = []
+    for residue in np.argsort(scores)[::-1]:
+        if residue > max_offset:
+            continue
+        rows = header_rows(data, int(residue), stride,
+                           (max_offset - residue) // stride, period)
+        candidates.append(
+            (int(residue) + rows * stride, round(float(scores[residue]), 3)))
+        if len(candidates) == count:
+            break
+    return candidates
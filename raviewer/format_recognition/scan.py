@@ -0,0 +1,363 @@
+"""Localization of image-like regions inside large memory or firmware dumps"""
+import numpy as np
+import cv2 as cv
+import numpy.typing as npt
+from typing import Dict, Iterator, List, Tuple
+
+from raviewer.image.image import Image
+from raviewer.src.utils import determine_color_format
+from raviewer.format_recognition.detect import classify_all
+from raviewer.format_recognition.offset import line_layout, find_offsets
+
+# number of bytes described by a single set of statistics
+BLOCK_SIZE = 1 << 16
+# number of blocks processed at once, bounds memory used while scanning
+CHUNK_BLOCKS = 64
+# shortest and longest (as a fraction of the block) line length considered
+MIN_STRIDE = 256
+MAX_STRIDE_FRACTION = 4
+# blocks with lower entropy are padding, with higher - compressed or random data
+ENTROPY_RANGE = (1.0, 7.9)
+# autocorrelation at the line length above which a block is considered an image
+PERIODICITY_CUTOFF = 0.2
+# lower cutoff for blocks with the same line length as their neighbor
+WEAK_PERIODICITY_CUTOFF = 0.05
+# divisors of the line length checked for shorter periods of records (e.g. tables)
+MAX_DIVISOR = 8
+MIN_PERIOD = 16
+# number of blocks that can interrupt a region, e.g. flat areas of an image
+MAX_GAP = 2
+# number of bytes from the beginning of a region used to guess its format
+SAMPLE_SIZE = 1 << 22
+
+
+def block_histograms(blocks: npt.NDArray) -> npt.NDArray:
+    """Counts occurrences of every byte value in every block with a single bincount
+    Keyword arguments:
+        blocks: 2D uint8 array with one block per row
+
+    Returns: array of shape (number of blocks, 256) with counts of byte values
+    """
+    n_blocks = len(blocks)
+    indices = blocks + (np.arange(n_blocks, dtype=np.intp) * 256)[:, None]
+    counts = np.bincount(indices.ravel(), minlength=n_blocks * 256)
+    return counts.reshape(n_blocks, 256)
+
+
+def histogram_entropy(counts: npt.NDArray) -> npt.NDArray:
+    """Computes Shannon entropy of every histogram
+    Keyword arguments:
+        counts: 2D array with one histogram of byte values per row
+
+    Returns: array of entropies in bits per byte
+    """
+    probabilities = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+    logs = np.log2(probabilities,
+                   out=np.zeros_like(probabilities),
+                   where=probabilities > 0)
+    return -(probabilities * logs).sum(axis=1)
+
+
+def histogram_mean(counts: npt.NDArray) -> npt.NDArray:
+    """Computes mean byte value of every histogram"""
+    return counts @ np.arange(256) / np.maximum(counts.sum(axis=1), 1)
+
+
+def block_entropy(blocks: npt.NDArray) -> npt.NDArray:
+    """Computes Shannon entropy of bytes in every block
+    Keyword arguments:
+        blocks: 2D uint8 array with one block per row
+
+    Returns: array of entropies in bits per byte
+    """
+    return histogram_entropy(block_histograms(blocks))
+
+
+def overview_statistics(
+    data,
+    start: int,
+    end: int,
+    n_blocks: int,
+    chunk_size: int = CHUNK_BLOCKS * BLOCK_SIZE
+) -> Iterator[Tuple[int, npt.NDArray, npt.NDArray]]:
+    """Computes entropy and mean byte value of blocks covering a range of data.
+
+    The range is divided into at most n_blocks blocks of equal size (the last
+    one can be shorter), which are processed a chunk at a time, so that the
+    results can be shown before the whole range is processed.
+
+    Keyword arguments:
+        data: bytes-like object or uint8 numpy array
+        start: offset of the first byte of the range
+        end: offset of the first byte after the range
+        n_blocks: maximal number of blocks
+        chunk_size: approximate number of bytes processed at once
+
+    Returns: iterator over tuples of the index of the first block in the chunk
+        and arrays of entropies and mean values
+    """
+    block_size = overview_block_size(start, end, n_blocks)
+    blocks_per_chunk = max(chunk_size // block_size, 1)
+    first = 0
+    while start + first * block_size < end:
+        begin = start + first * block_size
+        chunk = np.frombuffer(
+            data[begin:min(begin + blocks_per_chunk * block_size, end)],
+            dtype=np.uint8)
+        full = len(chunk) // block_size
+        counts = block_histograms(chunk[:full * block_size].reshape(
+            full, block_size))
+        if len(chunk) % block_size:
+            counts = np.vstack([
+                counts,
+                np.bincount(chunk[full * block_size:], minlength=256)
+            ])
+        if len(counts) == 0:
+            return
+        yield first, histogram_entropy(counts), histogram_mean(counts)
+        first += len(counts)
+
+
+def overview_block_size(start: int, end: int, n_blocks: int) -> int:
+    """Computes the size of blocks dividing a range into at most n_blocks blocks"""
+    return max(-(-(end - start) // n_blocks), 1)
+
+
+def row_periodicity(blocks: npt.NDArray,
+                    min_stride: int = MIN_STRIDE,
+                    max_stride: int = None) -> Tuple[npt.NDArray, npt.NDArray]:
+    """Finds the most likely line length of every block using autocorrelation.
+
+    Neighboring rows of an image are similar, so the autocorrelation of image
+    data has a sharp local peak at the line length. The peak is located as the
+    lag that stands out the most from its neighborhood and scored with its
+    correlation coefficient relative to the median one. Arrays of records
+    (e.g. tables of structures) correlate as well as images do, but also at
+    a fraction of the line length, so such peaks are scored relative to it.
+
+    Keyword arguments:
+        blocks: 2D uint8 array with one block per row
+        min_stride: shortest line length considered
+        max_stride: longest line length considered, defaults to a quarter of the block
+
+    Returns: arrays of line lengths (in bytes) and their scores
+    """
+    block_size = blocks.shape[1]
+    if max_stride is None:
+        max_stride = block_size // MAX_STRIDE_FRACTION
+    # rows are zero padded to compute linear autocorrelation with a transform,
+    # OpenCV transforms are much faster than numpy ones
+    samples = np.zeros((len(blocks), 2 * block_size), dtype=np.float32)
+    samples[:, :block_size] = blocks
+    samples[:, :block_size] -= samples[:, :block_size].mean(axis=1,
+                                                            keepdims=True)
+    spectrum = cv.dft(samples, flags=cv.DFT_ROWS)
+    spectrum = cv.mulSpectrums(spectrum, spectrum, cv.DFT_ROWS, conjB=True)
+    correlation = cv.idft(spectrum, flags=cv.DFT_ROWS
+                          | cv.DFT_REAL_OUTPUT)[:, :max_stride + 1]
+    variance = correlation[:, :1].copy()
+    np.divide(correlation, variance, out=correlation, where=variance > 0)
+    correlation[variance[:, 0] <= 0] = 0
+
+    margin = 4
+    neighborhood = np.maximum(correlation[:, min_stride - margin:-2 * margin],
+                              correlation[:, min_stride + margin:])
+    prominence = correlation[:, min_stride:-margin] - neighborhood
+    strides = prominence.argmax(axis=1) + min_stride
+
+    rows = np.arange(len(blocks))
+    baseline = np.median(correlation[:, min_stride:], axis=1)
+    for divisor in range(2, MAX_DIVISOR + 1):
+        periods = strides // divisor
+        records = (strides % divisor == 0) & (periods >= MIN_PERIOD)
+        np.maximum(baseline,
+                   np.where(records, correlation[rows, periods], baseline),
+                   out=baseline)
+    return strides, correlation[rows, strides] - baseline
+
+
+def block_statistics(
+    data: npt.NDArray,
+    block_size: int = BLOCK_SIZE
+) -> Iterator[Tuple[int, npt.NDArray, npt.NDArray, npt.NDArray]]:
+    """Computes statistics of consecutive blocks, one chunk of blocks at a time.
+
+    Only the processed chunk is read from data, so it can be a memory mapped
+    file larger than the available memory.
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array (e.g. numpy.memmap)
+        block_size: number of bytes in a block
+
+    Returns: iterator over tuples of the index of the first block in the chunk
+        and arrays of entropies, line lengths and periodicity scores
+    """
+    n_blocks = len(data) // block_size
+    for first in range(0, n_blocks, CHUNK_BLOCKS):
+        last = min(first + CHUNK_BLOCKS, n_blocks)
+        blocks = np.asarray(data[first * block_size:last *
+                                 block_size]).reshape(-1, block_size)
+        entropy = block_entropy(blocks)
+        strides = np.zeros(len(blocks), dtype=np.intp)
+        scores = np.zeros(len(blocks), dtype=np.float32)
+        candidates = (entropy > ENTROPY_RANGE[0]) & (entropy
+                                                     < ENTROPY_RANGE[1])
+        if candidates.any():
+            strides[candidates], scores[candidates] = row_periodicity(
+                blocks[candidates])
+        yield first, entropy, strides, scores
+
+
+def _continues(stride: int, region_stride: int) -> bool:
+    """Checks whether a block with given line length continues a region,
+    i.e. has the same line length or is a subsampled chroma plane"""
+    return stride == region_stride or 2 * stride == region_stride
+
+
+def find_regions(data: npt.NDArray,
+                 block_size: int = BLOCK_SIZE) -> List[Tuple[int, int, int]]:
+    """Groups consecutive image-like blocks with matching line lengths into regions.
+
+    A block is image-like if its periodicity is high, or is moderate and its
+    line length is shared with a neighboring block, as line lengths found in
+    other kinds of data are not consistent. A single block with a different
+    line length than both its neighbors (e.g. a multiple of it) is corrected
+    and regions interrupted by a few blocks are joined.
+
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        block_size: number of bytes in a block
+
+    Returns: list of tuples with region start, end and the most common line length
+    """
+    statistics = list(block_statistics(data, block_size))
+    if not statistics:
+        return []
+    strides = np.concatenate([stats[2] for stats in statistics])
+    scores = np.concatenate([stats[3] for stats in statistics])
+    outliers = (strides[:-2] == strides[2:]) & (strides[1:-1] != strides[:-2])
+    strides[1:-1][outliers] = strides[:-2][outliers]
+
+    weak = scores >= WEAK_PERIODICITY_CUTOFF
+    supported = np.zeros_like(weak)
+    consistent = weak[1:] & weak[:-1] & (strides[1:] == strides[:-1])
+    supported[1:] |= consistent
+    supported[:-1] |= consistent
+    image_like = (scores >= PERIODICITY_CUTOFF) | supported
+
+    regions = []
+    current = None
+    for index in range(len(strides)):
+        start = index * block_size
+        stride = int(strides[index])
+        if not image_like[index]:
+            continue
+        if current is not None and start - current[1] <= MAX_GAP * block_size \
+                and _continues(stride, current[2][0]):
+            current[1] = start + block_size
+            current[2].append(stride)
+        else:
+            current = [start, start + block_size, [stride]]
+            regions.append(current)
+
+    # blocks on the border of an image also contain other data, which can
+    # distort their line length, so they are merged into the adjacent region
+    merged = []
+    for region in regions:
+        if merged and merged[-1][1] == region[0] and min(
+                len(merged[-1][2]), len(region[2])) == 1:
+            merged[-1][1] = region[1]
+            merged[-1][2] += region[2]
+        else:
+            merged.append(region)
+
+    result = []
+    for start, end, region_strides in merged:
+        values, counts = np.unique(region_strides, return_counts=True)
+        # line length of chroma planes is not the line length of the image
+        counts[np.isin(2 * values, values)] = 0
+        result.append((start, end, int(values[counts.argmax()])))
+    return result
+
+
+def describe_region(data: npt.NDArray,
+                    start: int,
+                    end: int,
+                    stride: int,
+                    block_size: int,
+                    lower_bound: int = 0) -> Dict:
+    """Guesses format and width of an image-like region and refines its start
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        start: offset of the first byte of the region
+        end: offset of the first byte after the region
+        stride: line length in bytes
+        block_size: number of bytes in a block, i.e. the precision of start
+        lower_bound: offset before which the region cannot start
+
+    Returns: dictionary describing the region, serializable to JSON
+    """
+    # blocks on the borders of the region may contain other data
+    inner = start + block_size if end - start > 2 * block_size else start
+    length = min(end - block_size - inner, SAMPLE_SIZE)
+    if length <= 0:
+        length = min(end - start, SAMPLE_SIZE)
+    length -= length % 12
+    sample = Image(bytearray(data[inner:inner + length]))
+    formats, endianness = classify_all(sample)
+    fmt = formats[0]
+    pixel_bytes = line_layout(fmt, 1)[0]
+    if determine_color_format(fmt).pixel_format.name.startswith("BAYER"):
+        # the pattern of color filters repeats every two lines
+        pixel_bytes *= 2
+    width = max(stride // pixel_bytes, 1)
+
+    # the region is found with block precision, the image may start earlier,
+    # the window has to contain mostly image data to tell the typical rows
+    begin = max(start - block_size, lower_bound)
+    window = Image(np.asarray(data[begin:min(end, start + 4 * block_size)]))
+    offsets = find_offsets(window, fmt, width, max_offset=2 * block_size)
+    start = begin + offsets[0][0]
+
+    return {
+        "offset": start,
+        "size": end - start,
+        "format": fmt,
+        "endianness": endianness,
+        "width": width,
+        "stride": stride,
+    }
+
+
+def find_images(data: npt.NDArray, block_size: int = BLOCK_SIZE) -> List[Dict]:
+    """Locates regions of data that look like images
+    Keyword arguments:
+        data: buffer as an uint8 numpy array, may be memory mapped
+        block_size: number of bytes in a block, i.e. granularity of the scan
+
+    Returns: list of dictionaries with offset, size, likely format and width of every region
+    """
+    images = []
+    previous_end = 0
+    for start, end, stride in find_regions(data, block_size):
+        images.append(
+            describe_region(data, start, end, stride, block_size,
+                            previous_end))
+        previous_end = end
+    return images
+
+
+def scan_file(file_path: str, block_size: int = BLOCK_SIZE) -> List[Dict]:
+    """Locates image-like regions in a file without loading it into memory
+    Keyword arguments:
+        file_path: path to the dump
+        block_size: number of bytes in a block, i.e. granularity of the scan
+
+    Returns: list of dictionaries describing the regions, see find_images
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return []
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+    return find_images(data, block_size)
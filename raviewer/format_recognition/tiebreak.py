@@ -0,0 +1,195 @@
+"""Ranking of formats that differ only in the order of color channels or in the Bayer pattern phase"""
+import numpy as np
+import numpy.typing as npt
+from typing import List, Tuple
+
+from raviewer.image.image import Image
+from raviewer.image.color_format import PixelFormat, PixelPlane
+from raviewer.src.utils import determine_color_format
+from raviewer.format_recognition.frames import line_stride
+from raviewer.format_recognition.detect import classify_all_scored, find_in_formats, list_of_groups
+
+# maximal number of pixels (or chroma samples) the statistics are computed on
+N_SAMPLES = 1 << 16
+# minimal difference between red and blue of a pixel counted by the color prior
+WARMTH_CUTOFF = 16
+# phases of the Bayer pattern, named after the colors of the top left 2x2 cell
+BAYER_PHASES = ["RGGB", "GRBG", "GBRG", "BGGR"]
+
+
+def downsample(samples: npt.NDArray) -> npt.NDArray:
+    """Takes evenly spaced rows of an array, so that at most N_SAMPLES rows are left"""
+    return samples[::max(len(samples) // N_SAMPLES, 1)]
+
+
+def chroma_to_rgb(u: npt.NDArray, v: npt.NDArray) -> Tuple[npt.NDArray, ...]:
+    """Converts chroma samples to RGB offsets from luma (ITU-R BT.601)
+
+    The order of channels of a pixel does not depend on its luma, so luma is omitted.
+    """
+    u = u.astype(np.float32) - 128
+    v = v.astype(np.float32) - 128
+    return 1.402 * v, -0.344 * u - 0.714 * v, 1.772 * u
+
+
+def rgb_samples(data: npt.NDArray, fmt_name: str) -> Tuple[npt.NDArray, ...]:
+    """Extracts downsampled red, green and blue values of pixels in given format
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        fmt_name: string with RGB or YUV color format with 8-bit components
+
+    Returns: arrays with red, green and blue values (relative to luma for YUV formats)
+    """
+    color_fmt = determine_color_format(fmt_name)
+    order = color_fmt.pixel_format.name
+    if color_fmt.pixel_plane == PixelPlane.PACKED:
+        #every letter of the pixel format's name is a byte, e.g. YUYV or BGRA
+        pixels = downsample(data[:len(data) // len(order) *
+                                 len(order)].reshape(-1, len(order)))
+        if "U" in order:
+            return chroma_to_rgb(pixels[:, order.find("U")],
+                                 pixels[:, order.find("V")])
+        return tuple(pixels[:, order.find(c)].astype(np.float32)
+                     for c in "RGB")
+    #only 4:2:0 formats are indistinguishable, their luma takes two thirds of the frame
+    luma = len(data) * 2 // 3
+    if color_fmt.pixel_plane == PixelPlane.SEMIPLANAR:
+        chroma = data[luma:luma + (len(data) - luma) // 2 * 2].reshape(-1, 2)
+    else:
+        plane = (len(data) - luma) // 2
+        chroma = np.stack(
+            [data[luma:luma + plane], data[luma + plane:luma + 2 * plane]],
+            axis=1)
+    chroma = downsample(chroma)
+    u = 0 if color_fmt.pixel_format == PixelFormat.YUV else 1
+    return chroma_to_rgb(chroma[:, u], chroma[:, 1 - u])
+
+
+def color_prior(r: npt.NDArray, g: npt.NDArray, b: npt.NDArray) -> float:
+    """Measures how much colors follow the prior of natural images
+
+    Warm hues of skin, wood, soil or artificial light, where red exceeds green
+    and green exceeds blue, are more common than the opposite order of channels.
+    Swapping red and blue negates the result.
+
+    Keyword arguments:
+        r, g, b: arrays with values of channels
+
+    Returns: difference of fractions of warm and cold pixels, between -1 and 1
+    """
+    if len(r) == 0:
+        return 0.
+    warm = (r > g) & (g > b) & (r - b > WARMTH_CUTOFF)
+    cold = (b > g) & (g > r) & (b - r > WARMTH_CUTOFF)
+    return float(np.count_nonzero(warm) - np.count_nonzero(cold)) / len(r)
+
+
+def rank_channel_orders(img: Image,
+                        fmts: List[str]) -> Tuple[List[str], float]:
+    """Orders two formats differing only in swapped red and blue (or U and V) channels
+    Keyword arguments:
+        img: Image instance
+        fmts: list with two formats
+
+    Returns: list of formats, the most likely first, and confidence between 0 and 1
+    """
+    data = np.frombuffer(img.data_buffer, dtype=np.uint8)
+    prior = color_prior(*rgb_samples(data, fmts[0]))
+    if prior < 0:
+        return fmts[::-1], -prior
+    return list(fmts), prior
+
+
+def bayer_cells(data: npt.NDArray, width: int) -> npt.NDArray:
+    """Extracts downsampled 2x2 cells of 8-bit Bayer data
+    Keyword arguments:
+        data: buffer as an uint8 numpy array
+        width: width of the image in pixels
+
+    Returns: float array of cells with shape (N, 2, 2)
+    """
+    n_lines = len(data) // width // 2 * 2
+    lines = data[:n_lines * width].reshape(n_lines // 2, 2, width // 2, 2)
+    cells = lines.transpose(0, 2, 1, 3).reshape(-1, 2, 2)
+    return downsample(cells).astype(np.float32)
+
+
+def rank_bayer_phases(img: Image, width: int = 0) -> Tuple[List[str], float]:
+    """Orders phases of 8-bit Bayer pattern
+
+    Both green samples of a cell capture nearly the same value, so the
+    diagonal of the cell with the smaller difference holds green. Red and
+    blue on the other diagonal are told apart by the color prior.
+
+    Keyword arguments:
+        img: Image instance
+        width: width of the image, estimated from the data if 0
+
+    Returns: list of phases, the most likely first, and confidence between 0 and 1
+    """
+    data = np.frombuffer(img.data_buffer, dtype=np.uint8)
+    if width == 0:
+        #neighboring lines hold different colors, so the data repeats every two lines
+        width = line_stride(data) // 2
+    if width < 2 or width % 2 != 0 or len(data) < 2 * width:
+        return list(BAYER_PHASES), 0.
+    cells = bayer_cells(data, width)
+    main = np.abs(cells[:, 0, 0] - cells[:, 1, 1]).mean()
+    anti = np.abs(cells[:, 0, 1] - cells[:, 1, 0]).mean()
+    if anti <= main:
+        green = (cells[:, 0, 1] + cells[:, 1, 0]) / 2
+        prior = color_prior(cells[:, 0, 0], green, cells[:, 1, 1])
+        ranked = ["RGGB", "BGGR", "GRBG", "GBRG"]
+    else:
+        green = (cells[:, 0, 0] + cells[:, 1, 1]) / 2
+        prior = color_prior(cells[:, 0, 1], green, cells[:, 1, 0])
+        ranked = ["GRBG", "GBRG", "RGGB", "BGGR"]
+    if prior < 0:
+        ranked = [ranked[1], ranked[0], ranked[3], ranked[2]]
+    phase_confidence = abs(main - anti) / max(main + anti, 1e-9)
+    return ranked, min(phase_confidence, abs(prior))
+
+
+def rank_group(img: Image,
+               fmt_name: str,
+               width: int = 0) -> Tuple[List[str], float]:
+    """Orders the group of formats indistinguishable from given one by classification
+    Keyword arguments:
+        img: Image instance
+        fmt_name: string with color format
+        width: width of the image, estimated from the data if 0
+
+    Returns: list of formats of the group, the most likely first, and confidence between 0 and 1
+    """
+    if fmt_name in BAYER_PHASES:
+        return rank_bayer_phases(img, width)
+    index = find_in_formats(fmt_name)
+    if index == -1 or len(list_of_groups[index]) == 1:
+        return [fmt_name], 1.
+    group = list_of_groups[index]
+    bits = determine_color_format(group[0]).bits_per_components
+    if any(b not in (0, 8) for b in bits):
+        return list(group), 0.
+    return rank_channel_orders(img, group)
+
+
+def classify_ranked(img: Image,
+                    width: int = 0) -> Tuple[List[str], str, float]:
+    """Predicts format of the image and its endianness, ordering formats indistinguishable by classification
+    Keyword arguments:
+        img: Image instance
+        width: width of the image, estimated from the data if 0
+
+    Returns: list of strings with image formats (the most likely first), string with endianness and confidence of the first format, between 0 and 1
+    """
+    fmts, endianness, confidence = classify_all_scored(img)
+    ranked = []
+    for fmt in fmts:
+        if fmt in ranked:
+            continue
+        group, group_confidence = rank_group(img, fmt, width)
+        if len(ranked) == 0:
+            #the first format has to win both the classification and the ranking of its group
+            confidence *= group_confidence
+        ranked += [f for f in group if f not in ranked]
+    return ranked, endianness, confidence
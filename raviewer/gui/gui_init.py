@@ -37,6 +37,8 @@ class AppInit():
                 self.events.camera_ctrls.update_volatile_ctrls()
 
             self.events.refresh_frame()
+            self.events.refresh_preview()
+            self.events.refresh_overview()
             dpg.render_dearpygui_frame()
         '''
         hiding hex tab stops hexdump generation and prevents segfault when closing app while hexdump is being generated
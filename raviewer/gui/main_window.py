@@ -5,6 +5,7 @@ import dearpygui.dearpygui as dpg
 from .. import items
 from ..src.events import Events
 from ..src.controls import Controls
+from ..src.overview import Overview
 
 
 class MainWindow():
@@ -47,100 +48,152 @@ class MainWindow():
                                   height=self.vp_size["height"],
                                   horizontal_scrollbar=True):
 
-                with dpg.tab_bar(tag=items.plot.tab):
-                    with dpg.tab(label=" Preview", closable=False):
-                        dpg.add_plot(
-                            label="Raw data",
-                            tag=items.plot.main_plot,
-                            no_menus=True,
-                            height=-1,
-                            pan_button=Controls.pan_button,
-                            query_button=Controls.query_button,
-                            fit_button=Controls.autosize_button,
-                            box_select_button=Controls.box_select_button,
-                            crosshairs=True,
-                            query=True,
-                            equal_aspects=True,
-                            width=-1)
-                        dpg.add_plot_axis(label="Width",
-                                          axis=1000,
-                                          tag=items.plot.xaxis,
-                                          no_gridlines=False,
-                                          lock_min=False,
-                                          parent=items.plot.main_plot)
-
-                        dpg.add_plot_axis(label="Height",
-                                          axis=1001,
-                                          tag=items.plot.yaxis,
-                                          no_gridlines=False,
-                                          lock_min=False,
-                                          parent=items.plot.main_plot)
-
-                    with dpg.tab(label="Camera settings", closable=False):
-                        with dpg.group(horizontal=True):
-                            dpg.add_text(default_value="Camera:", indent=5)
-                            dpg.add_combo(
-                                tag=items.buttons.camera,
-                                items=list(self.events.available_cams.keys()),
-                                height_mode=dpg.mvComboHeight_Regular,
-                                width=250,
-                                callback=self.events.get_available_formats)
-                            dpg.add_button(
-                                label="Refresh",
-                                callback=self.events.get_available_cameras)
-
-                        with dpg.group(horizontal=True):
-                            dpg.add_text(default_value="Format:", indent=5)
-                            dpg.add_combo(
-                                tag=items.buttons.camera_format,
-                                height_mode=dpg.mvComboHeight_Regular,
-                                width=250,
-                                show=False,
-                                callback=self.events.get_available_framesizes)
-
-                        with dpg.group(horizontal=True):
-                            dpg.add_text(default_value="Framesize:", indent=5)
-                            dpg.add_combo(
-                                tag=items.buttons.camera_framesize,
-                                height_mode=dpg.mvComboHeight_Regular,
-                                width=230,
-                                show=False,
-                                callback=self.events.get_available_frame_rates)
-
-                        with dpg.group(horizontal=True):
-                            dpg.add_text(default_value="Frame rate:", indent=5)
-                            dpg.add_combo(
-                                tag=items.buttons.frame_rate,
-                                height_mode=dpg.mvComboHeight_Regular,
-                                width=225,
-                                show=False)
-
-                        with dpg.group(horizontal=True):
-                            dpg.add_text(default_value="Number of frames:",
-                                         indent=5)
-                            dpg.add_input_int(width=130,
-                                              default_value=1,
-                                              min_value=1,
-                                              max_value=128,
-                                              min_clamped=True,
-                                              max_clamped=True,
-                                              tag=items.buttons.nframes)
-
-                        with dpg.group(horizontal=True):
-                            dpg.add_button(
-                                label="Load frame from camera",
-                                indent=5,
-                                callback=self.events.load_img_from_camera)
-                            dpg.add_button(label="Start streaming",
-                                           callback=self.events.start_stream,
-                                           tag=items.buttons.stream)
-
-                        with dpg.group(tag=items.groups.camera_ctrls,
-                                       indent=5,
-                                       show=False):
-                            pass
-
-                        dpg.add_separator()
+                with dpg.texture_registry():
+                    for texture in [
+                            items.overview.coarse_texture,
+                            items.overview.detail_texture
+                    ]:
+                        dpg.add_dynamic_texture(width=2,
+                                                height=Overview.blocks,
+                                                default_value=[0.] *
+                                                (Overview.blocks * 2 * 4),
+                                                tag=texture)
+
+                with dpg.group(horizontal=True):
+                    with dpg.group(tag=items.overview.group):
+                        with dpg.plot(label="Overview",
+                                      tag=items.overview.plot,
+                                      width=60,
+                                      height=-1,
+                                      no_title=True,
+                                      no_menus=True,
+                                      no_box_select=True,
+                                      no_mouse_pos=True):
+                            dpg.add_plot_axis(dpg.mvXAxis,
+                                              tag=items.overview.xaxis,
+                                              no_gridlines=True,
+                                              no_tick_marks=True,
+                                              no_tick_labels=True)
+                            dpg.add_plot_axis(dpg.mvYAxis,
+                                              tag=items.overview.yaxis,
+                                              no_gridlines=True,
+                                              no_tick_labels=True)
+                            for series, texture in [
+                                (items.overview.coarse_series,
+                                 items.overview.coarse_texture),
+                                (items.overview.detail_series,
+                                 items.overview.detail_texture)
+                            ]:
+                                dpg.add_image_series(
+                                    texture,
+                                    bounds_min=[0, 0],
+                                    bounds_max=[2, 0],
+                                    tag=series,
+                                    show=False,
+                                    parent=items.overview.yaxis)
+                    with dpg.tooltip(parent=items.overview.group):
+                        dpg.add_text(tag=items.overview.description)
+
+                    with dpg.tab_bar(tag=items.plot.tab):
+                        with dpg.tab(label=" Preview", closable=False):
+                            dpg.add_plot(
+                                label="Raw data",
+                                tag=items.plot.main_plot,
+                                no_menus=True,
+                                height=-1,
+                                pan_button=Controls.pan_button,
+                                query_button=Controls.query_button,
+                                fit_button=Controls.autosize_button,
+                                box_select_button=Controls.box_select_button,
+                                crosshairs=True,
+                                query=True,
+                                equal_aspects=True,
+                                width=-1)
+                            dpg.add_plot_axis(label="Width",
+                                              axis=1000,
+                                              tag=items.plot.xaxis,
+                                              no_gridlines=False,
+                                              lock_min=False,
+                                              parent=items.plot.main_plot)
+
+                            dpg.add_plot_axis(label="Height",
+                                              axis=1001,
+                                              tag=items.plot.yaxis,
+                                              no_gridlines=False,
+                                              lock_min=False,
+                                              parent=items.plot.main_plot)
+
+                        with dpg.tab(label="Camera settings", closable=False):
+                            with dpg.group(horizontal=True):
+                                dpg.add_text(default_value="Camera:", indent=5)
+                                dpg.add_combo(
+                                    tag=items.buttons.camera,
+                                    items=list(
+                                        self.events.available_cams.keys()),
+                                    height_mode=dpg.mvComboHeight_Regular,
+                                    width=250,
+                                    callback=self.events.get_available_formats)
+                                dpg.add_button(
+                                    label="Refresh",
+                                    callback=self.events.get_available_cameras)
+
+                            with dpg.group(horizontal=True):
+                                dpg.add_text(default_value="Format:", indent=5)
+                                dpg.add_combo(
+                                    tag=items.buttons.camera_format,
+                                    height_mode=dpg.mvComboHeight_Regular,
+                                    width=250,
+                                    show=False,
+                                    callback=self.events.
+                                    get_available_framesizes)
+
+                            with dpg.group(horizontal=True):
+                                dpg.add_text(default_value="Framesize:",
+                                             indent=5)
+                                dpg.add_combo(
+                                    tag=items.buttons.camera_framesize,
+                                    height_mode=dpg.mvComboHeight_Regular,
+                                    width=230,
+                                    show=False,
+                                    callback=self.events.
+                                    get_available_frame_rates)
+
+                            with dpg.group(horizontal=True):
+                                dpg.add_text(default_value="Frame rate:",
+                                             indent=5)
+                                dpg.add_combo(
+                                    tag=items.buttons.frame_rate,
+                                    height_mode=dpg.mvComboHeight_Regular,
+                                    width=225,
+                                    show=False)
+
+                            with dpg.group(horizontal=True):
+                                dpg.add_text(default_value="Number of frames:",
+                                             indent=5)
+                                dpg.add_input_int(width=130,
+                                                  default_value=1,
+                                                  min_value=1,
+                                                  max_value=128,
+                                                  min_clamped=True,
+                                                  max_clamped=True,
+                                                  tag=items.buttons.nframes)
+
+                            with dpg.group(horizontal=True):
+                                dpg.add_button(
+                                    label="Load frame from camera",
+                                    indent=5,
+                                    callback=self.events.load_img_from_camera)
+                                dpg.add_button(
+                                    label="Start streaming",
+                                    callback=self.events.start_stream,
+                                    tag=items.buttons.stream)
+
+                            with dpg.group(tag=items.groups.camera_ctrls,
+                                           indent=5,
+                                           show=False):
+                                pass
+
+                            dpg.add_separator()
 
                 with dpg.menu_bar():
                     dpg.add_menu(label="File", tag=items.menu_bar.file)
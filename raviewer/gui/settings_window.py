@@ -2,8 +2,9 @@
 import dearpygui.dearpygui as dpg
 
 from .. import items
-from ..image.color_format import AVAILABLE_FORMATS
+from ..image.color_format import AVAILABLE_FORMATS, YUVMatrix, YUVRange
 from ..src.events import Events
+from ..src.core import DEMOSAIC_METHODS
 
 
 class SettingsWindow():
@@ -59,6 +60,38 @@ class SettingsWindow():
                               height_mode=dpg.mvComboHeight_Regular,
                               width=-1)
 
+                dpg.add_text(default_value="Demosaicing", indent=5)
+
+                dpg.add_combo(tag=items.buttons.demosaic,
+                              default_value=self.events.demosaic,
+                              items=list(DEMOSAIC_METHODS),
+                              indent=5,
+                              callback=self.events.change_demosaic,
+                              height_mode=dpg.mvComboHeight_Regular,
+                              width=-1)
+                with dpg.tooltip(parent=items.buttons.demosaic):
+                    dpg.add_text(
+                        "Method of demosaicing Bayer images, bilinear is the fastest"
+                    )
+
+                dpg.add_text(default_value="YUV matrix", indent=5)
+
+                dpg.add_combo(tag=items.buttons.yuv_matrix,
+                              items=[matrix.name for matrix in YUVMatrix],
+                              indent=5,
+                              callback=self.events.change_yuv_matrix,
+                              height_mode=dpg.mvComboHeight_Regular,
+                              width=-1)
+
+                dpg.add_text(default_value="YUV range", indent=5)
+
+                dpg.add_combo(tag=items.buttons.yuv_range,
+                              items=[yuv_range.name for yuv_range in YUVRange],
+                              indent=5,
+                              callback=self.events.change_yuv_range,
+                              height_mode=dpg.mvComboHeight_Regular,
+                              width=-1)
+
                 dpg.add_text(label="Color format description",
                              indent=5,
                              tag=items.static_text.color_description)
@@ -88,6 +121,20 @@ class SettingsWindow():
                                       callback=self.events.update_height,
                                       on_enter=True,
                                       enabled=False)
+                    dpg.add_input_int(label="Stride",
+                                      tag=items.buttons.stride_setter,
+                                      min_value=0,
+                                      min_clamped=True,
+                                      indent=5,
+                                      width=170,
+                                      default_value=0,
+                                      callback=self.events.update_stride,
+                                      on_enter=True,
+                                      enabled=False)
+                    with dpg.tooltip(parent=items.buttons.stride_setter):
+                        dpg.add_text(
+                            "Bytes per line including padding, 0 if lines are not padded"
+                        )
                     dpg.add_input_int(label="Number of frames",
                                       tag=items.buttons.n_frames_setter,
                                       min_value=1,
@@ -98,6 +145,20 @@ class SettingsWindow():
                                       indent=5,
                                       step=0,
                                       step_fast=0)
+                    dpg.add_input_int(label="Frame",
+                                      tag=items.buttons.frame_setter,
+                                      min_value=0,
+                                      max_value=0,
+                                      min_clamped=True,
+                                      max_clamped=True,
+                                      default_value=0,
+                                      width=100,
+                                      indent=5,
+                                      callback=self.events.update_frame,
+                                      on_enter=True,
+                                      enabled=False)
+                    with dpg.tooltip(parent=items.buttons.frame_setter):
+                        dpg.add_text("Index of the displayed frame")
                     dpg.add_button(label="Find resolution",
                                    width=170,
                                    indent=5,
@@ -165,6 +226,8 @@ class SettingsWindow():
                                       enabled=False,
                                       tag=items.buttons.nnumber)
                     dpg.add_button(label="apply", callback=self.events.align)
+                    dpg.add_button(label="undo",
+                                   callback=self.events.undo_align)
                 with dpg.group(horizontal=True):
                     dpg.add_text(indent=5, default_value="Value:")
                     dpg.add_input_int(width=130,
@@ -175,6 +238,26 @@ class SettingsWindow():
                 dpg.add_checkbox(label="Add/skip data in every frame",
                                  indent=5,
                                  tag=items.buttons.nnumber_every_frame)
+                with dpg.group(horizontal=True):
+                    dpg.add_button(label="Find offset",
+                                   indent=5,
+                                   tag=items.buttons.find_offset,
+                                   callback=self.events.find_offset)
+                    dpg.add_combo(tag=items.buttons.offset_candidates,
+                                  items=[],
+                                  width=-1,
+                                  height_mode=dpg.mvComboHeight_Regular,
+                                  callback=self.events.apply_offset)
+                with dpg.group(horizontal=True):
+                    dpg.add_button(label="Find images",
+                                   indent=5,
+                                   tag=items.buttons.find_images,
+                                   callback=self.events.find_images)
+                    dpg.add_combo(tag=items.buttons.image_regions,
+                                  items=[],
+                                  width=-1,
+                                  height_mode=dpg.mvComboHeight_Regular,
+                                  callback=self.events.jump_to_image)
                 dpg.add_separator()
                 dpg.add_text(default_value="Reverse bytes", indent=5)
                 with dpg.group(horizontal=False):
@@ -40,6 +40,30 @@ class Platform(Enum):
     TX2 = 2
 
 
+class YUVMatrix(Enum):
+    """Standard of the conversion between YUV and RGB."""
+
+    BT601 = 1
+    BT709 = 2
+    BT2020 = 3
+
+
+class YUVRange(Enum):
+    """Range of values of YUV components."""
+
+    # luma from 16 to 235, chroma from 16 to 240 (for 8 bits)
+    LIMITED = 1
+    FULL = 2
+
+
+# weights of red and blue in luma (Kr, Kb) of YUV matrices
+LUMA_WEIGHTS = {
+    YUVMatrix.BT601: (0.299, 0.114),
+    YUVMatrix.BT709: (0.2126, 0.0722),
+    YUVMatrix.BT2020: (0.2627, 0.0593)
+}
+
+
 class PixelPlane(Enum):
     """Representation of color format pixel plane."""
 
@@ -111,12 +135,19 @@ class SubsampledColorFormat(ColorFormat):
                  subsampling_horizontal=1,
                  subsampling_vertical=1,
                  fourcc=None,
-                 palette=None):
+                 palette=None,
+                 msb_aligned=False,
+                 yuv_matrix=YUVMatrix.BT601,
+                 yuv_range=YUVRange.LIMITED):
         super().__init__(pixel_format, endianness, pixel_plane, bpc1, bpc2,
                          bpc3, bpc4, name, fourcc)
         self.subsampling_horizontal = subsampling_horizontal
         self.subsampling_vertical = subsampling_vertical
         self.palette = palette
+        # components narrower than 16 bits are stored in the most significant bits of 16-bit words
+        self.msb_aligned = msb_aligned
+        self.yuv_matrix = yuv_matrix
+        self.yuv_range = yuv_range
 
 
 def rgb_palette():
@@ -419,6 +450,53 @@ AVAILABLE_FORMATS = {
                           subsampling_horizontal=2,
                           subsampling_vertical=1,
                           palette=yuv_palette()),
+    'P010':
+    SubsampledColorFormat(PixelFormat.YUV,
+                          Endianness.LITTLE_ENDIAN,
+                          PixelPlane.SEMIPLANAR,
+                          10,
+                          10,
+                          10,
+                          name="P010",
+                          subsampling_horizontal=2,
+                          subsampling_vertical=2,
+                          palette=yuv_palette(),
+                          msb_aligned=True),
+    'P016':
+    SubsampledColorFormat(PixelFormat.YUV,
+                          Endianness.LITTLE_ENDIAN,
+                          PixelPlane.SEMIPLANAR,
+                          16,
+                          16,
+                          16,
+                          name="P016",
+                          subsampling_horizontal=2,
+                          subsampling_vertical=2,
+                          palette=yuv_palette()),
+    'I010':
+    SubsampledColorFormat(PixelFormat.YUV,
+                          Endianness.LITTLE_ENDIAN,
+                          PixelPlane.PLANAR,
+                          10,
+                          10,
+                          10,
+                          name="I010",
+                          subsampling_horizontal=2,
+                          subsampling_vertical=2,
+                          palette=yuv_palette()),
+    'Y210':
+    SubsampledColorFormat(PixelFormat.YUYV,
+                          Endianness.LITTLE_ENDIAN,
+                          PixelPlane.PACKED,
+                          10,
+                          10,
+                          10,
+                          10,
+                          "Y210",
+                          2,
+                          1,
+                          palette=yuv_palette(),
+                          msb_aligned=True),
     'GRAY':
     ColorFormat(PixelFormat.MONO,
                 Endianness.BIG_ENDIAN,
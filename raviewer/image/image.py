@@ -1,5 +1,6 @@
 """Support for containing image."""
 
+import math
 import numpy
 
 
@@ -28,6 +29,68 @@ class Image:
         self.width = width
         self.height = height
         self.orig_size = None
+        # values of the data read in each byte order (instances of Endianness), converted to native order
+        self.byte_order_views = {}
+        # whole packed pixels of formats with components not aligned to bytes (lines of native values)
+        self.packed_pixels = None
+        # components arranged for raw coloring with the geometry they were arranged for, see AbstractParser.raw_planes
+        self.raw_planes = None
+        # number of values of processed data per pixel of a line, frames are views of processed data of whole lines
+        self.samples_per_pixel = 1
+
+    def frame_size(self, height):
+        """Provides the number of values of processed data in a frame of given height"""
+        return self.width * int(height * self.samples_per_pixel)
+
+    def n_frames(self, height=0):
+        """Provides the number of frames of given height, the last one may be incomplete
+
+        Keyword arguments:
+
+            height: height of a frame, the whole image is a frame if 0
+
+        Returns: number of frames, 0 if the image is empty
+        """
+        if self.height == 0:
+            return 0
+        if height < 1:
+            return 1
+        return math.ceil(self.processed_data.size / self.frame_size(height))
+
+    def frame(self, i, height=0):
+        """Provides i-th frame of given height without copying the data
+
+        Processed data of an image is split into frames of whole lines, so
+        a frame is an image with views of the processed data (and packed
+        pixels) of its lines.
+
+        Keyword arguments:
+
+            i: index of the frame
+            height: height of a frame, the whole image is a frame if 0
+
+        Returns: instance of Image sharing the data with this image
+        """
+        if height < 1:
+            return self
+        size = self.frame_size(height)
+        data = self.processed_data
+        # rows of processed data padded by lines of a stride hold single lines
+        step = size if data.ndim == 1 else size // data.shape[1]
+        processed_data = data[i * step:(i + 1) * step]
+        frame = Image(
+            self.data_buffer, self.color_format, processed_data, self.width,
+            math.ceil(processed_data.size /
+                      (self.width * self.samples_per_pixel)))
+        frame.samples_per_pixel = self.samples_per_pixel
+        if self.packed_pixels is not None:
+            frame.packed_pixels = self.packed_pixels[i * height:(i + 1) *
+                                                     height]
+        return frame
+
+    def frames(self, height=0):
+        """Provides all frames of given height, see frame"""
+        return [self.frame(i, height) for i in range(self.n_frames(height))]
 
     def reshape(self, new_width):
         if self.orig_size is None:
@@ -51,6 +51,7 @@ __items = {
         "export_image",
         "width_setter",
         "height_setter",
+        "stride_setter",
         "anti_checkbox",
         "r_ychannel",
         "g_uchannel",
@@ -66,7 +67,14 @@ __items = {
         "nnumber",
         "nvalues",
         "nnumber_every_frame",
+        "find_offset",
+        "offset_candidates",
+        "find_images",
+        "image_regions",
         "raw_display",
+        "demosaic",
+        "yuv_matrix",
+        "yuv_range",
         "n_frames_setter",
         "frame_setter",
         "reverse",
@@ -102,6 +110,17 @@ __items = {
         "annotation",
         "tab",
     ],
+    "overview": [
+        "group",
+        "plot",
+        "xaxis",
+        "yaxis",
+        "coarse_texture",
+        "detail_texture",
+        "coarse_series",
+        "detail_series",
+        "description",
+    ],
     "file_selector": [
         "read",
         "export",
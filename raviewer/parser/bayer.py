@@ -1,18 +1,30 @@
 """Parser implementation for Bayer pixel format"""
-from abc import ABCMeta
+from abc import ABCMeta, abstractmethod
 
 from ..image.image import Image
 from ..image.color_format import Endianness, Platform
-from .common import AbstractParser
+from .common import AbstractParser, display_lut, parallel_map, split_bands
+from .kernels import palette_color
 from ..src.utils import determine_color_format, pad_modulo
 
 import numpy
 import cv2 as cv
 
+# suffixes of OpenCV demosaicing codes of available methods, from the fastest
+DEMOSAIC_METHODS = {"bilinear": "", "vng": "_VNG", "ea": "_EA"}
+# lines above and below a band read to demosaic it, even to keep the phase of the pattern
+DEMOSAIC_OVERLAP = 4
+
 
 class ParserBayer(AbstractParser, metaclass=ABCMeta):
 
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    @property
+    @abstractmethod
+    def _filter(self):
+        """Colors of filters of a 2x2 cell of the pattern, row by row"""
+        pass
+
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         """Parses provided raw data to an image, calculating height from provided width.
 
         Keyword arguments:
@@ -20,53 +32,58 @@ class ParserBayer(AbstractParser, metaclass=ABCMeta):
             raw_data: bytes object
             color_format: target instance of ColorFormat
             width: target width to interpret
+            reverse_bytes: number of bytes in reversed groups
+            stride: number of bytes per line including padding, 0 if lines are not padded
 
         Returns: instance of Image processed to chosen format
         """
         max_value = max(color_format.bits_per_components)
         curr_dtype = self.get_dtype(max_value, color_format.endianness)
 
-        processed_data = []
-        raw_data = bytearray(raw_data)
         if len(set(color_format.bits_per_components)) == 2 or len(
                 set(color_format.bits_per_components)
         ) == 1 and max_value % 8 == 0:
 
-            if len(raw_data) % numpy.dtype(curr_dtype).alignment != 0:
-                raw_data += (0).to_bytes(len(raw_data) %
-                                         numpy.dtype(curr_dtype).alignment,
-                                         byteorder="little")
-            temp_raw_data = self.reverse(raw_data, reverse_bytes)
-            processed_data = numpy.frombuffer(temp_raw_data, dtype=curr_dtype)
+            raw_data = self.fix_alignment(raw_data, curr_dtype)
+            views = {}
+            words = self.read_words(self.reverse(raw_data, reverse_bytes),
+                                    max_value, color_format.endianness, views)
         else:
             raise NotImplementedError(
                 "All color components needs to have same bits per pixel. Current: 1: {} bpp, 2: {} bpp, 3: {} bpp"
                 .format(color_format.bits_per_components[0],
                         color_format.bits_per_components[1],
                         color_format.bits_per_components[2]))
+        image = self.assemble(raw_data, words, color_format, width, stride)
+        image.byte_order_views = views
+        return image
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        if stride:
+            processed_data = self.strip_padding(words, width, stride)
+        else:
+            processed_data = pad_modulo(words, (width, ))
+        return Image(raw_data, color_format, processed_data, width,
+                     processed_data.size // width)
+
+    def _platform_shift(self, color_format):
         """
         some Tegra platforms use non-standard data alignment, in order for
         frames captured by these devices to be properly displayed,
         the data needs to be bitwise shifted by a value dependent on the platform
         """
         if color_format.platform == Platform.TX2:
-            processed_data = numpy.right_shift(
-                processed_data, 16 - color_format.bits_per_components[0] - 2)
+            return 16 - color_format.bits_per_components[0] - 2
         elif color_format.platform == Platform.XAVIER:
-            processed_data = numpy.right_shift(
-                processed_data, 16 - color_format.bits_per_components[0])
-
-        processed_data = pad_modulo(processed_data, (width, ))
-        return Image(raw_data, color_format, processed_data, width,
-                     processed_data.size // width)
+            return 16 - color_format.bits_per_components[0]
+        return 0
 
-    def _preprocess(self, image):
-        return_data = numpy.reshape(numpy.copy(image.processed_data),
-                                    (image.height, image.width))
-        coeff = 255 / (2**image.color_format.bits_per_components[0] - 1)
-        numpy.multiply(return_data, coeff, out=return_data, casting="unsafe")
-
-        return return_data
+    def _preprocess(self, image, gamma=1.0):
+        lut = display_lut(image.color_format.bits_per_components[0],
+                          self._platform_shift(image.color_format), gamma)
+        return self.apply_lut(
+            numpy.reshape(image.processed_data, (image.height, image.width)),
+            lut)
 
     def _channel_mask(self, im, channels):
         if not channels["r_y"]:
@@ -79,65 +96,163 @@ class ParserBayer(AbstractParser, metaclass=ABCMeta):
 
         return im
 
-    def _get_cmap(self, color_format, filter):
-        assert len(filter) == 4
-        assert set(filter).issubset(['R', 'G', 'B'])
-
-        if color_format is None or color_format.palette is None:
-            return None
+    def raw_planes(self, image, height=0):
+        return [(self._preprocess(frame), [self._filter[:2], self._filter[2:]])
+                for frame in image.frames(height)]
+
+    def _bayer_get_displayable(self,
+                               image,
+                               channels,
+                               pattern,
+                               gamma=1.0,
+                               preview=False,
+                               demosaic="bilinear",
+                               height=0):
+        """Converts Bayer image to displayable image data
+
+        Bands of the image are demosaiced in parallel, each with a few
+        overlapping lines of its neighbors, so that they match the
+        demosaicing of the whole image. Frames are demosaiced separately,
+        every one starting with the first line of the pattern.
 
-        cmap = numpy.array([color_format.palette[x] for x in filter]).reshape(
-            (1, 4, 3))
-
-        return cmap
+        Keyword arguments:
 
-    def _bayer_raw_coloring(self, image, filter):
-        im = self._preprocess(image)
-        if (cmap := self._get_cmap(image.color_format, filter)) is None:
-            return None
+            image: processed image object
+            channels: dictionary with displayed channels
+            pattern: name of the pattern in OpenCV conversion codes
+            gamma: display gamma
+            preview: whether to display every 2x2 cell as one pixel instead of demosaicing
+            demosaic: demosaicing method, one of DEMOSAIC_METHODS
+            height: height of a frame, the whole image is a frame if 0
 
-        return self._non_debayerized_display(im, cmap).astype('uint8')
+        Returns: Numpy array containing displayable data
+        """
+        if demosaic not in DEMOSAIC_METHODS:
+            raise ValueError(
+                "Unknown demosaicing method {}, expected one of: {}".format(
+                    demosaic, ", ".join(DEMOSAIC_METHODS)))
+        if image.n_frames(height) > 1:
+            return numpy.concatenate([
+                self._bayer_get_displayable(frame, channels, pattern, gamma,
+                                            preview, demosaic)
+                for frame in image.frames(height)
+            ])
+        if preview:
+            return self._superpixel_display(image, channels, gamma)
+        words = numpy.reshape(image.processed_data,
+                              (image.height, image.width))
+        lut = display_lut(image.color_format.bits_per_components[0],
+                          self._platform_shift(image.color_format), gamma)
+        # Converting from Bayer BG (but data is Bayer RG) to RGB -> THIS IS A BUG IN OPENCV
+        code = getattr(
+            cv, "COLOR_BAYER_{}2RGB{}".format(pattern,
+                                              DEMOSAIC_METHODS[demosaic]))
+        out = numpy.empty((image.height, image.width, 3), dtype=numpy.uint8)
+
+        def convert(band):
+            first, last = band
+            top = max(first - DEMOSAIC_OVERLAP, 0)
+            bottom = min(last + DEMOSAIC_OVERLAP, image.height)
+            im = self._channel_mask(self.apply_lut(words[top:bottom], lut),
+                                    channels)
+            if (top, bottom) == band:
+                cv.cvtColor(im, code, dst=out[first:last])
+            else:
+                out[first:last] = cv.cvtColor(im, code)[first - top:last - top]
+
+        parallel_map(convert, split_bands(image.height, 2))
+        return out
+
+    def _superpixel_display(self, image, channels, gamma=1.0, out=None):
+        """Converts Bayer image to a preview of half the width and height
+
+        Every 2x2 cell of the pattern becomes a single pixel with the red and
+        blue samples of the cell and the mean of both green samples, so no
+        interpolation is done. Even and odd lines are split into contiguous
+        planes of samples of every filter, so the mean and the mapping to
+        display values run on contiguous integer data, and the mapped planes
+        are merged into the output.
 
-    def _bayer_get_displayable(self, image, channels, code):
-        im = self._preprocess(image)
-        im = self._channel_mask(im, channels)
+        Keyword arguments:
 
-        # Converting from Bayer BG (but data is Bayer RG) to RGB -> THIS IS A BUG IN OPENCV
+            image: processed image object
+            channels: dictionary with displayed channels
+            gamma: display gamma
+            out: preallocated uint8 numpy array (height / 2 x width / 2 x 3), allocated if None
 
-        return cv.cvtColor(im.astype('uint8'), code)
+        Returns: Numpy array containing displayable data (height / 2 x width / 2 x 3)
+        """
+        words = numpy.reshape(image.processed_data,
+                              (image.height, image.width))
+        height, width = image.height // 2, image.width // 2
+        out = self.output(out, (height, width, 3))
+        if out.size == 0:
+            return out
+        lut = display_lut(image.color_format.bits_per_components[0],
+                          self._platform_shift(image.color_format), gamma)
+        red, blue = (self._filter.index(c) for c in "RB")
+        green, other_green = (i for i, c in enumerate(self._filter)
+                              if c == 'G')
+
+        def convert(band):
+            first, last = band
+            #splitting into preallocated planes avoids copying the strided lines first
+            samples = numpy.empty((4, last - first, width), dtype=words.dtype)
+            for row in range(2):
+                cv.split(
+                    words[2 * first + row:2 * last:2, :2 * width].reshape(
+                        -1, width, 2),
+                    [samples[2 * row], samples[2 * row + 1]])
+            #mean of greens rounded down, (a & b) + ((a ^ b) >> 1), computed in place without wider integers
+            a, b = samples[green], samples[other_green]
+            numpy.bitwise_xor(a, b, out=b)
+            numpy.bitwise_or(a, b, out=a)
+            numpy.subtract(a, b, out=a)
+            numpy.right_shift(b, 1, out=b)
+            numpy.add(a, b, out=a)
+            #8-bit samples are mapped to display values in place
+            display = samples if words.itemsize == 1 else numpy.empty(
+                samples.shape, dtype=numpy.uint8)
+            for plane, channel in zip((red, green, blue),
+                                      ("r_y", "g_u", "b_v")):
+                if channels[channel]:
+                    self.apply_lut(samples[plane], lut, display[plane])
+                else:
+                    display[plane] = 0
+            cv.merge([display[red], display[green], display[blue]],
+                     dst=out[first:last])
+
+        parallel_map(convert, split_bands(height))
+        return out
 
     @staticmethod
-    def _non_debayerized_display(im, cmap):
+    def _non_debayerized_display(im, cmap, out=None):
         """Converts bayer formatted image to displayable image data
 
+        Every pixel is scaled by the palette color of its filter, by the
+        compiled kernel if available.
+
+        Keyword arguments:
+
+            im: 2D uint8 numpy array with the Bayer image
+            cmap: numpy array (1, 4, 3) with colors of filters of a 2x2 cell, row by row
+            out: preallocated uint8 numpy array (height x width x 3), allocated if None
+
         Returns: Numpy array containing displayable data (width x height x 3)
         """
 
         if cmap.shape != (1, 4, 3):
             raise ValueError("Expected palette to be (1, 4, 3) shaped.")
 
-        # Split image into 2 pixels wide columns and stack them vertically.
-        t = numpy.vstack(numpy.hsplit(im, im.shape[1] // 2))
-
-        # Reshape it into a shape (x, 4, 1) broadcastable with the palette (1, 4, 3)
-        t = t.reshape(-1, 4, 1)
-
-        # Compute RGB values by scaling each cmap vector by corresponding pixel.
-        t = t * cmap
-
-        # Return to the shape obtained in the first step
-        t = t.reshape(-1, 2, 3)
-
-        # Perform an inverse operation to one from the first step
-        result = numpy.hstack(numpy.vsplit(t, im.shape[1] // 2))
-
-        return result
+        return palette_color(im, cmap.reshape(2, 2, 3), out)
 
     def get_pixel_raw_components(self, image, row, column, index):
         #Bayer interpolation
         step_bytes = len([i for i in image.color_format._bpcs if i != 0])
         index = row // 2 * image.width // 2 * step_bytes + column // 2 * step_bytes
-        return image.processed_data[index:index + 3]
+        return image.processed_data.flat[index:index +
+                                         3] >> self._platform_shift(
+                                             image.color_format)
 
     def crop_image2rawformat(self, img, up_row, down_row, left_column,
                              right_column):
@@ -154,40 +269,84 @@ class ParserBayer(AbstractParser, metaclass=ABCMeta):
 
 class ParserBayerRG(ParserBayer):
 
-    def get_displayable(self, image: Image, channels):
+    @property
+    def _filter(self):
+        return ['R', 'G', 'G', 'B']
+
+    def get_displayable(self,
+                        image: Image,
+                        height=0,
+                        channels={
+                            "r_y": True,
+                            "g_u": True,
+                            "b_v": True
+                        },
+                        gamma=1.0,
+                        preview=False,
+                        demosaic="bilinear"):
         # Converting from Bayer BG (but data is Bayer RG) to RGB -> THIS IS A BUG IN OPENCV
-        return self._bayer_get_displayable(image, channels,
-                                           cv.COLOR_BAYER_BG2RGB)
-
-    def raw_coloring(self, image: Image, height=0):
-        return self._bayer_raw_coloring(image, ['R', 'G', 'G', 'B'])
+        return self._bayer_get_displayable(image, channels, "BG", gamma,
+                                           preview, demosaic, height)
 
 
 class ParserBayerBG(ParserBayer):
 
-    def get_displayable(self, image: Image, channels):
-        return self._bayer_get_displayable(image, channels,
-                                           cv.COLOR_BAYER_RG2RGB)
-
-    def raw_coloring(self, image: Image, height=0):
-        return self._bayer_raw_coloring(image, ['B', 'G', 'G', 'R'])
+    @property
+    def _filter(self):
+        return ['B', 'G', 'G', 'R']
+
+    def get_displayable(self,
+                        image: Image,
+                        height=0,
+                        channels={
+                            "r_y": True,
+                            "g_u": True,
+                            "b_v": True
+                        },
+                        gamma=1.0,
+                        preview=False,
+                        demosaic="bilinear"):
+        return self._bayer_get_displayable(image, channels, "RG", gamma,
+                                           preview, demosaic, height)
 
 
 class ParserBayerGB(ParserBayer):
 
-    def get_displayable(self, image: Image, channels):
-        return self._bayer_get_displayable(image, channels,
-                                           cv.COLOR_BAYER_GR2RGB)
-
-    def raw_coloring(self, image: Image, height=0):
-        return self._bayer_raw_coloring(image, ['G', 'B', 'R', 'G'])
+    @property
+    def _filter(self):
+        return ['G', 'B', 'R', 'G']
+
+    def get_displayable(self,
+                        image: Image,
+                        height=0,
+                        channels={
+                            "r_y": True,
+                            "g_u": True,
+                            "b_v": True
+                        },
+                        gamma=1.0,
+                        preview=False,
+                        demosaic="bilinear"):
+        return self._bayer_get_displayable(image, channels, "GR", gamma,
+                                           preview, demosaic, height)
 
 
 class ParserBayerGR(ParserBayer):
 
-    def get_displayable(self, image: Image, channels):
-        return self._bayer_get_displayable(image, channels,
-                                           cv.COLOR_BAYER_GB2RGB)
-
-    def raw_coloring(self, image: Image, height=0):
-        return self._bayer_raw_coloring(image, ['G', 'R', 'B', 'G'])
+    @property
+    def _filter(self):
+        return ['G', 'R', 'B', 'G']
+
+    def get_displayable(self,
+                        image: Image,
+                        height=0,
+                        channels={
+                            "r_y": True,
+                            "g_u": True,
+                            "b_v": True
+                        },
+                        gamma=1.0,
+                        preview=False,
+                        demosaic="bilinear"):
+        return self._bayer_get_displayable(image, channels, "GB", gamma,
+                                           preview, demosaic, height)
@@ -5,7 +5,99 @@ from ..image.image import Image
 from ..image.color_format import Endianness
 import numpy
 import math
+import functools
+import os
 import cv2 as cv
+from concurrent.futures import ThreadPoolExecutor
+from . import kernels
+from ..src.transforms import Reverse
+
+
+@functools.lru_cache(maxsize=None)
+def display_lut(bits, shift=0, gamma=1.0):
+    """Builds a lookup table mapping raw values to 8-bit display values.
+
+    Keyword arguments:
+
+        bits: number of significant bits of a value
+        shift: number of least significant bits dropped from raw values (e.g. Tegra alignment)
+        gamma: display gamma, normalized values are raised to the power of 1 / gamma
+
+    Returns: read-only uint8 numpy array with 2^(bits + shift) entries
+    """
+    values = (numpy.arange(1 << (bits + shift)) >> shift) / ((1 << bits) - 1)
+    if gamma != 1.0:
+        values = values**(1 / gamma)
+    lut = (255 * values).astype(numpy.uint8)
+    lut.flags.writeable = False
+    return lut
+
+
+# smallest number of lines of a band of an image converted by a separate thread
+MIN_BAND_LINES = 64
+
+# number of threads converting images
+_threads = os.cpu_count() or 1
+
+
+def set_threads(threads):
+    """Sets the number of threads converting images.
+
+    Keyword arguments:
+
+        threads: number of threads, the number of CPUs if 0
+    """
+    global _threads
+    if threads < 0:
+        raise ValueError(
+            "Number of threads ({}) can not be negative".format(threads))
+    _threads = threads or os.cpu_count() or 1
+
+
+def get_threads():
+    """Provides the number of threads converting images"""
+    return _threads
+
+
+def parallel_map(function, items):
+    """Calls a function for every item, in a pool of threads if there are more items.
+
+    Conversions done by OpenCV and numpy release the GIL, so independent
+    items (e.g. frames or bands of a frame) are processed on all cores.
+
+    Keyword arguments:
+
+        function: function taking an item
+        items: list of items
+
+    Returns: list of results in order of items
+    """
+    if len(items) < 2 or _threads < 2:
+        return [function(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), _threads)) as pool:
+        return list(pool.map(function, items))
+
+
+def split_bands(height, alignment=1):
+    """Splits lines of an image into horizontal bands, one for every thread.
+
+    Bands are converted separately into their parts of a shared output,
+    so that a single large frame is converted on all cores.
+
+    Keyword arguments:
+
+        height: number of lines of the image
+        alignment: number of lines every band but the last is a multiple of
+
+    Returns: list of (first, last) ranges of lines, last is exclusive
+    """
+    n_bands = min(_threads, height // MIN_BAND_LINES)
+    if n_bands < 2:
+        return [(0, height)]
+    lines = -(-height // n_bands)
+    lines = -(-lines // alignment) * alignment
+    return [(first, min(first + lines, height))
+            for first in range(0, height, lines)]
 
 
 class AbstractParser(metaclass=ABCMeta):
@@ -23,8 +115,54 @@ class AbstractParser(metaclass=ABCMeta):
         """
         pass
 
+    def raw_planes(self, image, height=0):
+        """Provides 8-bit components of an image arranged for coloring by the palette.
+
+        Keyword arguments:
+
+            image: processed image object
+            height: height of a frame, the whole image is a frame if 0
+
+        Returns: list of (components, keys) pairs, where components is a 2D uint8 numpy array and keys is a 2D sequence of palette keys of its periodic pattern, all components are as wide and colored one below another
+        """
+        raise NotImplementedError(
+            "Raw coloring of {} images is not supported".format(
+                image.color_format))
+
     def raw_coloring(self, image, height=0):
-        return None
+        """Colors components of an image by the palette of its format.
+
+        Components are arranged once and cached on the image, so that a
+        change of the palette only recomputes their colors.
+
+        Keyword arguments:
+
+            image: processed image object
+            height: height of a frame, the whole image is a frame if 0
+
+        Returns: Numpy array with a pixel for every component or None if the format has no palette
+        """
+        palette = image.color_format.palette
+        if palette is None:
+            return None
+        geometry = (image.width, image.height, height)
+        if image.raw_planes is None or image.raw_planes[0] != geometry:
+            image.raw_planes = (geometry, self.raw_planes(image, height))
+        planes = image.raw_planes[1]
+        if planes == []:
+            return numpy.array([], dtype=numpy.uint8)
+
+        out = numpy.empty(
+            (sum(len(components)
+                 for components, _ in planes), planes[0][0].shape[1], 3),
+            dtype=numpy.uint8)
+        first = 0
+        for components, keys in planes:
+            colors = [[palette[key] for key in row] for row in keys]
+            kernels.palette_color(components, colors,
+                                  out[first:first + len(components)])
+            first += len(components)
+        return out
 
     def get_dtype(self, max_value, endianness):
         if max_value <= 8:
@@ -32,17 +170,201 @@ class AbstractParser(metaclass=ABCMeta):
         else:
             return '>u2' if endianness == Endianness.BIG_ENDIAN else '<u2'
 
+    def output(self, out, shape):
+        """Provides a buffer for displayable data.
+
+        Keyword arguments:
+
+            out: preallocated uint8 numpy array or None
+            shape: shape of the displayable data
+
+        Returns: out if it fits the data or a newly allocated uint8 numpy array
+        """
+        if out is None:
+            return numpy.empty(shape, dtype=numpy.uint8)
+        if out.shape != tuple(shape) or out.dtype != numpy.uint8:
+            raise ValueError(
+                "Output of shape {} and type {} does not fit data of shape {}".
+                format(out.shape, out.dtype, tuple(shape)))
+        return out
+
+    def apply_lut(self, data, lut, out=None):
+        """Maps values of an array through a lookup table.
+
+        Values exceeding the table are mapped to its last entry. Every value
+        is replaced by a row of the table if the table has more dimensions.
+
+        Keyword arguments:
+
+            data: numpy array of unsigned integers
+            lut: numpy array indexed by values along the first axis
+            out: preallocated contiguous numpy array for the result, allocated if None
+
+        Returns: numpy array of the shape of data followed by the shape of a row of the table
+        """
+        flat = data.reshape(-1)
+        if out is None:
+            out = numpy.empty(data.shape + lut.shape[1:], dtype=lut.dtype)
+        table = lut.reshape(len(lut), -1)
+        kernels.lookup(flat, table, out.reshape(flat.size, table.shape[1]))
+        return out
+
+    def shift_to_8bit(self, data, shift):
+        """Converts values to 8 bits by dropping least significant bits.
+
+        Keyword arguments:
+
+            data: numpy array of unsigned integers
+            shift: number of dropped bits
+
+        Returns: new uint8 numpy array of the shape of data
+        """
+        out = numpy.empty(data.shape, dtype=numpy.uint8)
+        numpy.right_shift(data, shift, out=out, casting='unsafe')
+        return out
+
+    def fix_alignment(self, raw_data, dtype):
+        """Pads raw data with zeros to a multiple of the alignment of values.
+
+        The data is copied only if it is not aligned, so that aligned data
+        is read without copying.
+
+        Keyword arguments:
+
+            raw_data: bytes-like object
+            dtype: numpy dtype of values
+
+        Returns: raw_data if it is aligned, otherwise its padded copy
+        """
+        padding = -len(raw_data) % numpy.dtype(dtype).alignment
+        if padding:
+            return bytes(raw_data) + bytes(padding)
+        return raw_data
+
+    def read_words(self, raw_data, max_value, endianness, views):
+        """Reads raw data as values stored in given byte order, converted to native order.
+
+        Bytes are swapped only once, so that all later operations work on
+        native values. The values are cached in views for every byte order,
+        so that changing endianness does not need to read the data again.
+
+        Keyword arguments:
+
+            raw_data: bytes-like object with length aligned to the size of a value
+            max_value: number of bits of the largest component
+            endianness: byte order of the data, instance of Endianness
+            views: dictionary with already read values for byte orders
+
+        Returns: 1D numpy array with native byte order
+        """
+        if endianness not in views:
+            dtype = numpy.dtype(self.get_dtype(max_value, endianness))
+            data = numpy.frombuffer(raw_data, dtype=dtype)
+            if not dtype.isnative:
+                data = data.byteswap().view(dtype.newbyteorder())
+            views[endianness] = data
+        return views[endianness]
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        """Arranges values read from raw data into an image.
+
+        Keyword arguments:
+
+            raw_data: bytes object
+            words: 1D numpy array with values in native byte order
+            color_format: target instance of ColorFormat
+            width: target width to interpret
+            stride: number of bytes per line including padding, 0 if lines are not padded
+
+        Returns: instance of Image processed to chosen format
+        """
+        raise NotImplementedError(
+            "Changing endianness of parsed {} images is not supported".format(
+                color_format))
+
+    def change_endianness(self, image, endianness, stride=0):
+        """Reinterprets already parsed image in given byte order.
+
+        Only values cached by the parser are swapped, the raw data is not parsed again.
+
+        Keyword arguments:
+
+            image: processed image object
+            endianness: target byte order, instance of Endianness
+            stride: number of bytes per line including padding, 0 if lines are not padded
+
+        Returns: instance of Image processed to the target byte order
+        """
+        views = image.byte_order_views
+        if len(views) == 0:
+            raise ValueError("Image was not parsed by a parser")
+        words = next(iter(views.values()))
+        if words.itemsize == 1:
+            return image
+        if endianness not in views:
+            views[endianness] = words.byteswap()
+        result = self.assemble(image.data_buffer, views[endianness],
+                               image.color_format, image.width, stride)
+        result.byte_order_views = views
+        return result
+
     def reverse(self, raw_data, reverse_bytes):
-        temp_raw_data = bytearray()
-        if reverse_bytes > 1:
-            for i in range(0, len(raw_data) + 1, reverse_bytes):
-                temp_raw_data += raw_data[i:i + reverse_bytes][::-1]
-            return temp_raw_data
-        else:
-            return raw_data
+        return Reverse(reverse_bytes).apply(raw_data)
+
+    def strip_padding(self, data, line_size, stride):
+        """Drops padding at the end of every line without copying the data.
+
+        Keyword arguments:
+
+            data: 1D numpy array
+            line_size: number of elements in a line without padding
+            stride: number of bytes between beginnings of consecutive lines
+
+        Returns: 2D numpy array (view of data) with a line in every row
+        """
+        if stride % data.itemsize != 0:
+            raise ValueError(
+                "Stride ({} B) is not a multiple of the pixel component size ({} B)"
+                .format(stride, data.itemsize))
+        if stride < line_size * data.itemsize:
+            raise ValueError(
+                "Stride ({} B) is shorter than a line ({} B)".format(
+                    stride, line_size * data.itemsize))
+        n_lines = 0
+        if data.size >= line_size:
+            n_lines = (data.nbytes - line_size * data.itemsize) // stride + 1
+        return numpy.lib.stride_tricks.as_strided(data,
+                                                  shape=(n_lines, line_size),
+                                                  strides=(stride,
+                                                           data.itemsize),
+                                                  writeable=False)
+
+    def strip_planar_padding(self, data, width, stride, luma_lines):
+        """Drops padding at the end of lines of planar data, where lines of
+        chroma planes are half as wide as luma lines and padded to half of the stride.
+
+        Keyword arguments:
+
+            data: 1D numpy array
+            width: number of luma samples in a line
+            stride: number of bytes per luma line including padding
+            luma_lines: number of lines in the luma plane
+
+        Returns: 1D numpy array with luma plane followed by chroma planes without padding
+        """
+        if stride % 2 != 0:
+            raise ValueError(
+                "Stride ({} B) of planar data has to be even".format(stride))
+        luma_size = luma_lines * stride // data.itemsize
+        chroma_size = (data.nbytes // stride -
+                       luma_lines) * stride // data.itemsize
+        luma = self.strip_padding(data[:luma_size], width, stride)
+        chroma = self.strip_padding(data[luma_size:luma_size + chroma_size],
+                                    width // 2, stride // 2)
+        return numpy.concatenate([luma.ravel(), chroma.ravel()])
 
     @abstractmethod
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         """Parses provided raw data to an image, calculating height from provided width.
 
                 Keyword arguments:
@@ -50,6 +372,8 @@ class AbstractParser(metaclass=ABCMeta):
                     raw_data: bytes object
                     color_format: target instance of ColorFormat
                     width: target width to interpret
+                    reverse_bytes: number of bytes in reversed groups
+                    stride: number of bytes per line including padding, 0 if lines are not padded
 
                 Returns: instance of Image processed to chosen format
         """
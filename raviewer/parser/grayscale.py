@@ -2,7 +2,7 @@
 
 from ..image.image import Image
 from ..image.color_format import Endianness
-from .common import AbstractParser
+from .common import AbstractParser, display_lut, parallel_map, split_bands
 from ..src.utils import pad_modulo
 
 import numpy
@@ -12,7 +12,7 @@ import cv2 as cv
 class ParserGrayscale(AbstractParser):
     """A grayscale implementation of a parser"""
 
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         """Parses provided raw data to an image, calculating height from provided width.
 
         Keyword arguments:
@@ -20,6 +20,8 @@ class ParserGrayscale(AbstractParser):
             raw_data: bytes object
             color_format: target instance of ColorFormat
             width: target width to interpret
+            reverse_bytes: number of bytes in reversed groups
+            stride: number of bytes per line including padding, 0 if lines are not padded
 
         Returns: instance of Image processed to chosen format
         """
@@ -27,38 +29,50 @@ class ParserGrayscale(AbstractParser):
         bits_per_gray = color_format.bits_per_components[0]
         curr_dtype = self.get_dtype(bits_per_gray, color_format.endianness)
 
-        raw_data = bytearray(raw_data)
-        if len(raw_data) % numpy.dtype(curr_dtype).alignment != 0:
-            raw_data += (0).to_bytes(len(raw_data) %
-                                     numpy.dtype(curr_dtype).alignment,
-                                     byteorder="little")
-        processed_data = numpy.frombuffer(self.reverse(raw_data,
-                                                       reverse_bytes),
-                                          dtype=curr_dtype)
-        processed_data = pad_modulo(processed_data, (width, ))
+        raw_data = self.fix_alignment(raw_data, curr_dtype)
+        views = {}
+        words = self.read_words(self.reverse(raw_data, reverse_bytes),
+                                bits_per_gray, color_format.endianness, views)
+        image = self.assemble(raw_data, words, color_format, width, stride)
+        image.byte_order_views = views
+        return image
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        if stride:
+            processed_data = self.strip_padding(words, width, stride)
+        else:
+            processed_data = pad_modulo(words, (width, ))
 
         return Image(raw_data, color_format, processed_data, width,
                      processed_data.size // width)
 
-    def get_displayable(self, image):
+    def get_displayable(self, image, height=0, gamma=1.0):
         """Provides displayable image data (RGB formatted)
 
+        Keyword arguments:
+
+            image: processed image object
+            height: height of a frame, lines are converted independently, so frames are converted together
+            gamma: display gamma
+
         Returns: Numpy array containing displayable data.
         """
-        return_data = image.processed_data
-
-        data_array = numpy.reshape(return_data,
-                                   (image.height, image.width)).astype('float')
+        lut = display_lut(image.color_format.bits_per_components[0],
+                          gamma=gamma)
+        gray = numpy.reshape(image.processed_data, (image.height, image.width))
+        out = numpy.empty((image.height, image.width, 3), dtype=numpy.uint8)
 
-        data_array[:] = 255 * (
-            data_array[:] / (2**image.color_format.bits_per_components[0] - 1))
+        def convert(band):
+            first, last = band
+            cv.cvtColor(self.apply_lut(gray[first:last], lut),
+                        cv.COLOR_GRAY2RGB,
+                        dst=out[first:last])
 
-        return_data = cv.cvtColor(data_array.astype('uint8'),
-                                  cv.COLOR_GRAY2RGB)
-        return return_data
+        parallel_map(convert, split_bands(image.height))
+        return out
 
     def get_pixel_raw_components(self, image, row, column, index):
-        return image.processed_data[index:index + 1]
+        return image.processed_data.flat[index:index + 1]
 
     def crop_image2rawformat(self, img, up_row, down_row, left_column,
                              right_column):
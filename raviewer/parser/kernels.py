@@ -0,0 +1,156 @@
+"""Loops over pixels, compiled with numba if it is installed.
+
+Every kernel has a numpy implementation used when numba is missing,
+both implementations give identical results.
+"""
+
+import numpy
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# number of values mapped by a lookup table at once, keeps temporary indices in cache
+LUT_CHUNK_SIZE = 1 << 16
+
+# implementations of kernels, numba is available only if it is installed
+BACKENDS = ["numpy", "numba"]
+
+# implementation of kernels in use
+_backend = "numpy" if numba is None else "numba"
+
+
+def available_backends():
+    """Provides names of implementations of kernels that can be used"""
+    return [b for b in BACKENDS if b != "numba" or numba is not None]
+
+
+def set_backend(backend):
+    """Sets the implementation of kernels.
+
+    Keyword arguments:
+
+        backend: one of BACKENDS
+    """
+    global _backend
+    if backend not in available_backends():
+        raise ValueError(
+            "Kernel backend {} is not available, expected one of: {}".format(
+                backend, ", ".join(available_backends())))
+    _backend = backend
+
+
+def get_backend():
+    """Provides the name of the implementation of kernels in use"""
+    return _backend
+
+
+if numba is not None:
+
+    @numba.njit(nogil=True, cache=True)
+    def _lookup_compiled(flat, lut, flat_out):
+        last = lut.shape[0] - 1
+        for i in range(flat.shape[0]):
+            value = flat[i]
+            if value > last:
+                value = last
+            flat_out[i] = lut[value]
+
+    @numba.njit(nogil=True, cache=True)
+    def _palette_color_compiled(values, tables, lines):
+        rows, columns = tables.shape[0], tables.shape[1]
+        width = values.shape[1]
+        for y in range(values.shape[0]):
+            row = tables[y % rows]
+            samples = values[y]
+            line = lines[y]
+            for first in range(columns):
+                table = row[first]
+                for x in range(first, width, columns):
+                    color = table[samples[x]]
+                    line[3 * x] = color & 0xFF
+                    line[3 * x + 1] = (color >> 8) & 0xFF
+                    line[3 * x + 2] = color >> 16
+
+
+def _scalar_rows(lut, flat_out):
+    """Views rows of a table and of an output as single values, if they fit in one"""
+    size = lut.shape[1] * lut.itemsize
+    if size not in (1, 2, 4, 8) or not (lut.flags.c_contiguous
+                                        and flat_out.flags.c_contiguous):
+        return None
+    dtype = numpy.dtype("u{}".format(size))
+    return lut.view(dtype).reshape(-1), flat_out.view(dtype).reshape(-1)
+
+
+def lookup(flat, lut, flat_out):
+    """Maps values through a lookup table, values exceeding the table are mapped to its last row.
+
+    Keyword arguments:
+
+        flat: 1D numpy array of unsigned integers
+        lut: 2D numpy array with a row for every value
+        flat_out: 2D numpy array with a row for every value of flat
+    """
+    if _backend == "numba" and (scalars := _scalar_rows(lut, flat_out)):
+        _lookup_compiled(flat, *scalars)
+        return
+    for start in range(0, flat.size, LUT_CHUNK_SIZE):
+        numpy.take(lut,
+                   flat[start:start + LUT_CHUNK_SIZE],
+                   axis=0,
+                   out=flat_out[start:start + LUT_CHUNK_SIZE],
+                   mode='clip')
+
+
+def palette_color(values, colors, out=None):
+    """Colors values by a periodic pattern of palette colors.
+
+    A value is multiplied by the color at its position modulo the shape of
+    the pattern in single precision and truncated to 8 bits, e.g. a 2x2
+    pattern colors Bayer cells and a 1xN pattern colors N components of
+    packed pixels.
+
+    Keyword arguments:
+
+        values: 2D numpy array of 8-bit values
+        colors: numpy array (rows x columns x 3) with colors of the pattern
+        out: preallocated uint8 numpy array (height x width x 3), allocated if None
+
+    Returns: Numpy array containing colored values (height x width x 3)
+    """
+    if out is None:
+        out = numpy.empty(values.shape + (3, ), dtype=numpy.uint8)
+    colors = numpy.asarray(colors, dtype=numpy.float32)
+    if (_backend == "numba" and values.dtype == numpy.uint8
+            and out.flags.c_contiguous):
+        # colors of all 8-bit values, computed like the numpy implementation and packed into words
+        tables = numpy.empty(colors.shape[:2] + (256, 3), dtype=numpy.uint8)
+        numpy.multiply(numpy.arange(256, dtype=numpy.float32)[:, None],
+                       colors[:, :, None],
+                       out=tables,
+                       casting='unsafe')
+        tables = tables.astype(numpy.uint32)
+        _palette_color_compiled(
+            values,
+            tables[..., 0] | tables[..., 1] << 8 | tables[..., 2] << 16,
+            out.reshape(values.shape[0], values.shape[1] * 3))
+        return out
+
+    rows, columns = colors.shape[:2]
+    for row in range(rows):
+        for column in range(columns):
+            pixels = values[row::rows, column::columns]
+            view = out[row::rows, column::columns]
+            for channel, value in enumerate(colors[row, column]):
+                if value == 1:
+                    view[..., channel] = pixels
+                elif value == 0:
+                    view[..., channel] = 0
+                else:
+                    numpy.multiply(pixels,
+                                   value,
+                                   out=view[..., channel],
+                                   casting='unsafe')
+    return out
@@ -1,80 +1,75 @@
 from abc import ABCMeta, abstractmethod
 from ..image.image import Image
 from ..image.color_format import PixelFormat
-from .common import AbstractParser
+from .common import AbstractParser, parallel_map, split_bands
 from ..src.utils import pad_modulo
 
 import numpy
-
-
-def rescale_to_8bit(data, cbits):
-    bpcs = 4
-    if cbits[3] == 0:
-        bpcs = 3
-    for i in range(bpcs):
-        if cbits[i] != 8:
-            coeff = 255 / (2**cbits[i] - 1)
-            numpy.multiply(data[:, :, i],
-                           coeff,
-                           out=data[:, :, i],
-                           casting="unsafe")
-    return data
-
-
-def fix_alpha(data, cbits):
-    if cbits[3] == 0:
-        data[:, :, 3] = numpy.uint8(255)
-    return data
+import functools
+import cv2 as cv
+
+# OpenCV conversions of pixels with 8-bit components to RGBA, by order of components
+CVT_CODES = {
+    "RGB": cv.COLOR_RGB2RGBA,
+    "BGR": cv.COLOR_BGR2RGBA,
+    "BGRA": cv.COLOR_BGRA2RGBA
+}
+
+
+@functools.lru_cache(maxsize=None)
+def pixel_lut(bits_per_components, columns=(0, 1, 2, 3), scaled=False):
+    """Builds a lookup table decoding packed pixels to their components.
+
+    Components are packed from the most significant bits of a pixel in
+    the order of the color format.
+
+    Keyword arguments:
+
+        bits_per_components: tuple with numbers of bits of components
+        columns: indices of components in columns of the table
+        scaled: if components are scaled to 8 bits, missing components are then set to 255
+
+    Returns: read-only uint8 numpy array with a row for every value of a pixel
+    """
+    pixels = numpy.arange(1 << sum(bits_per_components))
+    components = []
+    shift = sum(bits_per_components)
+    for bits in bits_per_components:
+        shift -= bits
+        values = (pixels >> shift) & ((1 << bits) - 1)
+        if scaled and bits == 0:
+            values = numpy.full_like(pixels, 255)
+        elif scaled and bits != 8:
+            values = values * (255 / ((1 << bits) - 1))
+        components.append(values.astype(numpy.uint8))
+    lut = numpy.stack([components[i] for i in columns], axis=1)
+    lut.flags.writeable = False
+    return lut
 
 
 class AbstractParserRGBA(AbstractParser, metaclass=ABCMeta):
     """An abstract parser for RGBA and its variants (e.g. ARGB, ABGR)"""
 
-    def _parse_not_bytefilled(self, raw_data, color_format):
-        """Parses provided raw data to an image - bits per component are not multiple of 8.
+    def _parse_not_bytefilled(self, pixels, color_format):
+        """Decodes packed pixels - bits per component are not multiple of 8.
 
         Keyword arguments:
 
-            raw_data: bytes object
+            pixels: numpy array with pixels in native byte order
             color_format: target instance of ColorFormat
 
-        Returns: properly parsed buffer data (numpy ndarray)
+        Returns: 1D numpy array with components of the pixels in order of the color format
         """
         cbits = color_format.bits_per_components
-        pixel_size = sum(cbits)
-        if pixel_size & 7 != 0:
-            raise Exception("Invalid pixel format")
-        curr_dtype = self.get_dtype(pixel_size, color_format.endianness)
-        if len(raw_data) % (pixel_size // 8) != 0:
-            raw_data += b'\x00' * (pixel_size // 8 - (len(raw_data) %
-                                                      (pixel_size // 8)))
-        processed_data = numpy.frombuffer(raw_data, dtype=curr_dtype)
-        temp = pixel_size
-        res = numpy.empty((4 * len(processed_data), ), dtype=curr_dtype)
-        all_equal = True
-        for j, i in enumerate(cbits):
-            if i != cbits[0]:
-                all_equal = False
-        mask = 0
-        for j, i in enumerate(cbits):
-            mask = (1 << i) - 1
-            mask <<= temp - i
-            temp -= i
-            if all_equal:
-                numpy.right_shift(processed_data, temp, out=res[j::4])
-            else:
-                channel = numpy.bitwise_and(processed_data, mask)
-                numpy.right_shift(channel, temp, out=res[j::4])
-        if all_equal:
-            res = numpy.bitwise_and(res, mask, out=res)
-
-        if min(color_format.bits_per_components) == 0:
-            return numpy.delete(res.reshape(-1, 4), 3, 1).flatten()
+        lut = pixel_lut(cbits, tuple(range(len(self._order))))
+        return self.apply_lut(pixels, lut).reshape(-1)
 
-        return res
+    def _display_columns(self):
+        """Indices of components shown as red, green, blue and alpha"""
+        return tuple(
+            self._order.find(c) if c in self._order else 3 for c in "RGBA")
 
     def _color_mask(self, im, channels):
-        im = numpy.copy(im)
         if not channels["r_y"]:
             im[:, :, 0] = 0
         if not channels["g_u"]:
@@ -85,97 +80,140 @@ class AbstractParserRGBA(AbstractParser, metaclass=ABCMeta):
             im[:, :, 3] = 255
         return im
 
-    def _convert(self, color_format, im):
-        return im[:, :, [self._order.find(x) for x in "RGBA"]]
+    def _convert(self, im, out):
+        """Writes pixels with 8-bit components to RGBA output in a single pass"""
+        if self._order == "RGBA":
+            numpy.copyto(out, im)
+        elif self._order in CVT_CODES:
+            cv.cvtColor(im, CVT_CODES[self._order], dst=out)
+        else:
+            cv.mixChannels([im], [out], [
+                index for pair in enumerate(self._display_columns())
+                for index in pair[::-1]
+            ])
+        return out
 
     @property
     @abstractmethod
     def _order(self):
         pass
 
-    def _fix_alignment(self, raw_data, curr_dtype):
-        if len(raw_data) % numpy.dtype(curr_dtype).alignment != 0:
-            raw_data += (0).to_bytes(len(raw_data) %
-                                     numpy.dtype(curr_dtype).alignment,
-                                     byteorder="little")
-        return raw_data
-
     def _pad(self, im, width, curr_dtype):
         return pad_modulo(im, (width * 4, ))
 
-    def _raw_channel_color(self, image, im):
-        im = numpy.copy(im)
-        p = [image.color_format.palette[x] for x in self._order]
-        p = numpy.array(p).astype('float64').reshape((1, -1, 3))
-
-        im = im.astype('float64')
-
-        im = im.reshape((-1, p.shape[1], 1))
-        im = im * p
-
-        return im.reshape((-1, image.width, 3))
-
     def get_displayable(self,
                         image,
+                        height=0,
                         channels={
                             "r_y": True,
                             "g_u": True,
                             "b_v": True,
                             "a_v": True
-                        }):
+                        },
+                        out=None):
         """Provides displayable image data (RGB formatted)
 
-        Returns: Numpy array containing displayable data.
-        """
+        The data is written once to the output, pixels with components not
+        aligned to bytes are decoded straight to 8-bit RGBA through a lookup
+        table. Hidden channels are masked in place. Bands of the image are
+        converted in parallel.
 
-        return_data = numpy.reshape(
-            image.processed_data.astype('uint8'),
-            (image.height, image.width, len(self._order)))
-
-        return_data = rescale_to_8bit(return_data,
-                                      image.color_format.bits_per_components)
-
-        return_data = self._convert(image.color_format, return_data)
+        Keyword arguments:
 
-        return_data = fix_alpha(return_data,
-                                image.color_format.bits_per_components)
+            image: processed image object
+            height: height of a frame, lines are converted independently, so frames are converted together
+            channels: dictionary with visibility of channels
+            out: preallocated uint8 numpy array of shape (height, width, 4), allocated if None
 
-        return self._color_mask(return_data, channels)
+        Returns: Numpy array containing displayable data.
+        """
+        out = self.output(out, (image.height, image.width, 4))
 
-    def raw_coloring(self, image, height=0):
-        return_data = numpy.reshape(
-            image.processed_data.astype('uint8'),
-            (image.height, image.width, len(self._order)))
+        cbits = image.color_format.bits_per_components
+        if max(cbits) % 8 != 0:
+            lut = pixel_lut(cbits, self._display_columns(), scaled=True)
+        else:
+            return_data = numpy.reshape(
+                image.processed_data.astype('uint8', copy=False),
+                (image.height, image.width, len(self._order)))
+
+        def convert(band):
+            first, last = band
+            if max(cbits) % 8 != 0:
+                self.apply_lut(image.packed_pixels[first:last],
+                               lut,
+                               out=out[first:last])
+            else:
+                self._convert(return_data[first:last], out[first:last])
+            self._color_mask(out[first:last], channels)
 
-        return_data = rescale_to_8bit(return_data,
-                                      image.color_format.bits_per_components)
+        parallel_map(convert, split_bands(image.height))
+        return out
 
-        out = self._raw_channel_color(image, return_data).astype('uint8')
-        return out.reshape(-1, image.width * len(self._order), 3)
+    def raw_planes(self, image, height=0):
+        cbits = image.color_format.bits_per_components
+        if max(cbits) % 8 != 0:
+            lut = pixel_lut(cbits, tuple(range(len(self._order))), scaled=True)
+            return_data = self.apply_lut(image.packed_pixels, lut)
+        else:
+            return_data = image.processed_data.astype('uint8', copy=False)
+        return [(numpy.reshape(return_data,
+                               (image.height, image.width * len(self._order))),
+                 [self._order])]
 
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         max_val = max(color_format.bits_per_components)
 
         curr_dtype = self.get_dtype(max_val, color_format.endianness)
 
+        views = {}
         if max_val % 8 == 0:
-            raw_data = self._fix_alignment(raw_data, curr_dtype)
-            reversed_raw_data = self.reverse(raw_data, reverse_bytes)
-            processed_data = numpy.frombuffer(reversed_raw_data, curr_dtype)
+            raw_data = self.fix_alignment(raw_data, curr_dtype)
+            words = self.read_words(self.reverse(raw_data, reverse_bytes),
+                                    max_val, color_format.endianness, views)
+        else:
+            pixel_size = sum(color_format.bits_per_components)
+            if pixel_size & 7 != 0:
+                raise Exception("Invalid pixel format")
+            reversed_raw_data = self.fix_alignment(
+                self.reverse(raw_data, reverse_bytes),
+                self.get_dtype(pixel_size, color_format.endianness))
+            words = self.read_words(reversed_raw_data, pixel_size,
+                                    color_format.endianness, views)
+
+        image = self.assemble(raw_data, words, color_format, width, stride)
+        image.byte_order_views = views
+        return image
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        packed_pixels = None
+        if max(color_format.bits_per_components) % 8 == 0:
+            processed_data = words
+            if stride:
+                processed_data = self.strip_padding(processed_data,
+                                                    width * len(self._order),
+                                                    stride)
+            else:
+                processed_data = self._pad(processed_data, width, words.dtype)
         else:
-            reversed_raw_data = self.reverse(raw_data, reverse_bytes)
+            if stride:
+                packed_pixels = self.strip_padding(words, width, stride)
+            else:
+                packed_pixels = pad_modulo(words, (width, )).reshape(-1, width)
             processed_data = self._parse_not_bytefilled(
-                reversed_raw_data, color_format)
-
-        processed_data = self._pad(processed_data, width, curr_dtype)
+                packed_pixels, color_format)
 
-        return Image(raw_data, color_format, processed_data, width,
-                     processed_data.size // (width * len(self._order)))
+        image = Image(raw_data, color_format, processed_data, width,
+                      processed_data.size // (width * len(self._order)))
+        image.packed_pixels = packed_pixels
+        image.samples_per_pixel = len(self._order)
+        return image
 
     def get_pixel_raw_components(self, image, row, column, index):
         step_bytes = len(image.color_format._bpcs)
-        return image.processed_data[index * step_bytes:index * step_bytes +
-                                    step_bytes]
+        return image.processed_data.flat[index *
+                                         step_bytes:index * step_bytes +
+                                         step_bytes]
 
     def crop_image2rawformat(self, img, up_row, down_row, left_column,
                              right_column):
@@ -189,12 +227,6 @@ class AbstractParserRGBA(AbstractParser, metaclass=ABCMeta):
 class AbstractParserRGB(AbstractParserRGBA, metaclass=ABCMeta):
     """An abstract parser for RGB and its variants"""
 
-    def _convert(self, color_format, im):
-        im = im[:, :, [self._order.find(x) for x in "RGB"]]
-        return numpy.pad(im, ((0, 0), (0, 0), (0, 1)),
-                         'constant',
-                         constant_values=(0, 255))
-
     def _pad(self, im, width, curr_dtype):
         return pad_modulo(im, (width * 3, ))
 
@@ -1,16 +1,23 @@
 """Parser implementation for YUV pixel format"""
 from abc import abstractmethod, ABCMeta
 
-from ..image.color_format import PixelFormat, Endianness
+from ..image.color_format import (PixelFormat, Endianness, YUVMatrix, YUVRange,
+                                  LUMA_WEIGHTS)
 from ..image.image import Image
-from .common import AbstractParser
+from .common import AbstractParser, parallel_map, split_bands
 from ..src.utils import pad_modulo
 
 import numpy
 import cv2 as cv
+import functools
 import math
 from itertools import cycle
 
+# number of lines of planar YUV422 interleaved at once, the interleaved chunk stays in cache
+CHUNK_LINES = 32
+# number of luma lines converted at once with other matrices than BT.601, their chroma and merged samples stay in cache
+CONVERSION_CHUNK_LINES = 64
+
 
 def normal_round(n):
     if n - math.floor(n) < 0.5:
@@ -25,6 +32,100 @@ def interleave_channels(u, v):
     return data
 
 
+def display_shift(color_format):
+    """Number of least significant bits of stored components dropped to display them with 8 bits"""
+    bits = max(color_format.bits_per_components)
+    if bits <= 8:
+        return 0
+    if color_format.msb_aligned:
+        return 8
+    return bits - 8
+
+
+def sample_values(color_format, values):
+    """Aligns values of components picked from an image to their least significant bit"""
+    bits = max(color_format.bits_per_components)
+    if bits > 8 and color_format.msb_aligned:
+        return [value >> (16 - bits) for value in values]
+    return values
+
+
+@functools.lru_cache(maxsize=None)
+def conversion_coefficients(matrix, yuv_range):
+    """Builds the affine transformation of 8-bit YUV samples to RGB.
+
+    Keyword arguments:
+
+        matrix: instance of YUVMatrix
+        yuv_range: instance of YUVRange
+
+    Returns: read-only 3x4 float32 numpy array with coefficients of Y, U and V and offsets of R, G and B
+    """
+    kr, kb = LUMA_WEIGHTS[matrix]
+    kg = 1 - kr - kb
+    if yuv_range == YUVRange.LIMITED:
+        luma, black, chroma = 255 / 219, 16, 255 / 224
+    else:
+        luma, black, chroma = 1, 0, 1
+    green_u = -2 * kb * (1 - kb) / kg * chroma
+    green_v = -2 * kr * (1 - kr) / kg * chroma
+    coefficients = numpy.array([[luma, 0, 2 * (1 - kr) * chroma, 0],
+                                [luma, green_u, green_v, 0],
+                                [luma, 2 * (1 - kb) * chroma, 0, 0]])
+    coefficients[:, 3] = -luma * black - 128 * coefficients[:, 1:3].sum(axis=1)
+    coefficients = coefficients.astype(numpy.float32)
+    coefficients.flags.writeable = False
+    return coefficients
+
+
+def conversion_matrix(color_format):
+    """Provides the transformation of samples of a format to RGB, None if OpenCV converts them (BT.601, limited range)"""
+    if (color_format.yuv_matrix, color_format.yuv_range) == (YUVMatrix.BT601,
+                                                             YUVRange.LIMITED):
+        return None
+    return conversion_coefficients(color_format.yuv_matrix,
+                                   color_format.yuv_range)
+
+
+def yuv_to_rgb(y, u, v, coefficients, out):
+    """Converts planes of YUV samples to RGB with an affine transformation.
+
+    Chroma planes are subsampled by integer factors of the luma plane.
+    Lines are converted in chunks through buffers allocated once, so the
+    samples stay in cache and no memory is mapped for every chunk.
+
+    Keyword arguments:
+
+        y: 2D uint8 numpy array with luma samples
+        u, v: 2D uint8 numpy arrays with chroma samples
+        coefficients: 3x4 float32 numpy array from conversion_coefficients
+        out: preallocated uint8 numpy array (height x width x 3) of the luma plane
+    """
+    if u.size == 0:
+        return
+    vertical = len(y) // len(u)
+    lines = max(CONVERSION_CHUNK_LINES // vertical, 1)
+    width = y.shape[1]
+    luma = numpy.empty((lines * vertical, width), dtype=numpy.uint8)
+    chroma = numpy.empty((2, lines, u.shape[1]), dtype=numpy.uint8)
+    upsampled = numpy.empty((2, lines * vertical, width), dtype=numpy.uint8)
+    merged = numpy.empty((lines * vertical, width, 3), dtype=numpy.uint8)
+    for first in range(0, len(u), lines):
+        last = min(first + lines, len(u))
+        n = (last - first) * vertical
+        numpy.copyto(luma[:n], y[first * vertical:last * vertical])
+        for plane, samples, upsampled_plane in zip((u, v), chroma, upsampled):
+            numpy.copyto(samples[:last - first], plane[first:last])
+            cv.resize(samples[:last - first], (width, n),
+                      dst=upsampled_plane[:n],
+                      interpolation=cv.INTER_NEAREST)
+        cv.merge([luma[:n], upsampled[0, :n], upsampled[1, :n]],
+                 dst=merged[:n])
+        cv.transform(merged[:n],
+                     coefficients,
+                     dst=out[first * vertical:last * vertical])
+
+
 def is_luma_only(channels):
     return not channels["b_v"] and not channels["g_u"] and channels["r_y"]
 
@@ -49,7 +150,7 @@ def concatenate_frames(frames):
 class AbstractParserYUV420(AbstractParser, metaclass=ABCMeta):
     """An abstract YUV420 parser"""
 
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         """Parses provided raw data to an image, calculating height from provided width.
 
         Keyword arguments:
@@ -57,6 +158,8 @@ class AbstractParserYUV420(AbstractParser, metaclass=ABCMeta):
             raw_data: bytes object
             color_format: target instance of ColorFormat
             width: target width to interpret
+            reverse_bytes: number of bytes in reversed groups
+            stride: number of bytes per line including padding, 0 if lines are not padded
 
         Returns: instance of Image processed to chosen format
         """
@@ -64,24 +167,34 @@ class AbstractParserYUV420(AbstractParser, metaclass=ABCMeta):
         max_value = max(color_format.bits_per_components)
         curr_dtype = self.get_dtype(max_value, color_format.endianness)
 
-        raw_data = bytearray(raw_data)
-        if len(set(
-                color_format.bits_per_components)) == 2 and max_value % 8 == 0:
-            if len(raw_data) % numpy.dtype(curr_dtype).alignment != 0:
-                raw_data += (0).to_bytes(len(raw_data) %
-                                         numpy.dtype(curr_dtype).alignment,
-                                         byteorder="little")
+        if len(set(color_format.bits_per_components)) == 2 and max_value <= 16:
+            raw_data = self.fix_alignment(raw_data, curr_dtype)
         else:
             raise NotImplementedError(
-                "Other than 8-bit YUVs are not currently supported")
-        processed_data = numpy.frombuffer(self.reverse(raw_data,
-                                                       reverse_bytes),
-                                          dtype=curr_dtype)
-        processed_data = numpy.array(processed_data, dtype=curr_dtype)
+                "Only YUVs with components of equal size up to 16 bits are supported"
+            )
+        views = {}
+        words = self.read_words(self.reverse(raw_data, reverse_bytes),
+                                max_value, color_format.endianness, views)
+        image = self.assemble(raw_data, words, color_format, width, stride)
+        image.byte_order_views = views
+        return image
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        processed_data = words
+        if stride:
+            processed_data = self._strip_padding(words, width, stride)
         processed_data = pad_modulo(processed_data, (width, ))
 
         new_height = math.ceil(math.ceil(processed_data.size / width) / 1.5)
-        return Image(raw_data, color_format, processed_data, width, new_height)
+        image = Image(raw_data, color_format, processed_data, width,
+                      new_height)
+        # chroma samples of a pair of lines take as much as one luma line
+        image.samples_per_pixel = 1.5
+        return image
+
+    def _strip_padding(self, data, width, stride):
+        return self.strip_padding(data, width, stride).ravel()
 
     @abstractmethod
     def _channel_mask(self, channels, image, im, height):
@@ -98,17 +211,13 @@ class AbstractParserYUV420(AbstractParser, metaclass=ABCMeta):
         pass
 
     @abstractmethod
-    def _raw_channel_color(self, image, im):
-        pass
-
-    @abstractmethod
-    def _get_nframes(self, image, height):
+    def _raw_frame_planes(self, im, height):
+        """Provides components of a padded frame with lines of luma samples followed by lines of chroma samples, arranged for raw coloring"""
         pass
 
-    def _preprocess(self, image, i, height):
-        return numpy.copy(
-            image.processed_data[i * image.width * int(height * 1.5):(1 + i) *
-                                 image.width * int(height * 1.5)])
+    def _preprocess(self, frame):
+        return self.shift_to_8bit(frame.processed_data,
+                                  display_shift(frame.color_format))
 
     def _pad(self, image, im):
         im = numpy.copy(im)
@@ -124,80 +233,153 @@ class AbstractParserYUV420(AbstractParser, metaclass=ABCMeta):
                             "r_y": True,
                             "g_u": True,
                             "b_v": True
-                        }):
+                        },
+                        out=None):
         """Provides displayable image data (RGB formatted)
 
+        Frames, and bands of complete frames, are converted in parallel,
+        each into its part of the output. Data of frames is copied only to
+        mask channels.
+
+        Keyword arguments:
+
+            image: processed image object
+            height: height of a frame, the whole image is a frame if 0
+            channels: dictionary with visibility of channels
+            out: preallocated uint8 numpy array for the displayable data, allocated if None
+
         Returns: Numpy array containing displayable data.
         """
-        tmp = []
         if height < 1:
             height = image.height
 
-        n_frames = self._get_nframes(image, height)
+        frames = [frame.processed_data for frame in image.frames(height)]
+        # lines of every frame are padded to a multiple of 3, two thirds of them hold luma
+        rows = [-(-frame.size // image.width // 3) * 2 for frame in frames]
+        offsets = numpy.cumsum([0] + rows)
+        out = self.output(out, (offsets[-1], image.width + image.width % 2, 3))
+        masked = not all(channels[c] for c in ["r_y", "g_u", "b_v"])
+
+        def prepare(im):
+            if im.itemsize > 1:
+                im = self.shift_to_8bit(im, display_shift(image.color_format))
+            if masked:
+                im = self._channel_mask(channels, image, im, height)
+            return im
+
+        frames = parallel_map(prepare, frames)
+        bands = []
+        for i, im in enumerate(frames):
+            complete = im.size % (3 *
+                                  image.width) == 0 and image.width % 2 == 0
+            if complete and not is_luma_only(channels):
+                bands += [(i, first, last)
+                          for first, last in split_bands(rows[i], 2)]
+            else:
+                bands.append((i, 0, rows[i]))
+
+        coefficients = conversion_matrix(image.color_format)
+
+        def convert(band):
+            i, first, last = band
+            part = out[offsets[i] + first:offsets[i] + last]
+            if coefficients is not None and not is_luma_only(channels):
+                y, u, v = self._padded_planes(frames[i], image)
+                yuv_to_rgb(y[first:last], u[first // 2:last // 2],
+                           v[first // 2:last // 2], coefficients, part)
+            elif (first, last) == (0, rows[i]):
+                self._convert(frames[i], image, height, channels, part)
+            else:
+                cv.cvtColor(self._band(frames[i], image.width, first, last),
+                            self._conversion_const,
+                            dst=part)
+
+        parallel_map(convert, bands)
+        return out
+
+    def _planes(self, im, width):
+        """Provides views of planes of a complete frame
 
-        for i in range(n_frames):
-            return_data = self._preprocess(image, i, height)
-            return_data = self._channel_mask(channels, image, return_data,
-                                             height)
-            return_data = self._convert(return_data, image, height, channels)
-            tmp.append(return_data)
+        Keyword arguments:
 
-        return concatenate_frames(tmp)
+            im: 1D numpy array with data of a complete frame of even width
+            width: width of the image
 
-    def _convert(self, im, image, height, channels):
-        if is_luma_only(channels):
-            return cv.cvtColor(im[0:image.width * height], cv.COLOR_GRAY2RGB)
+        Returns: 2D numpy arrays with Y, U and V samples
+        """
+        luma = im.size * 2 // 3
+        y = im[:luma].reshape(-1, width)
+        if self._chroma_planes == 1:
+            chroma = im[luma:].reshape(-1, width // 2, 2)
+            u, v = chroma[..., 0], chroma[..., 1]
         else:
-            im = self._pad(image, im)
-            return cv.cvtColor(im, self._conversion_const)
-
-    def raw_coloring(self, image, height=0):
-        tmp = []
-
-        if height < 1:
-            height = image.height
-
-        n_frames = self._get_nframes(image, height)
+            u, v = (plane.reshape(-1, width // 2)
+                    for plane in numpy.split(im[luma:], 2))
+        return (y, u, v) if self._order == "YUV" else (y, v, u)
 
-        for i in range(n_frames):
-            return_data = self._preprocess(image, i, height)
+    def _padded_planes(self, im, image):
+        """Provides planes of a frame, padded to even width and whole pairs of luma lines if incomplete"""
+        if im.size % (3 * image.width) != 0 or image.width % 2 != 0:
+            im = self._pad(image, im).ravel()
+        return self._planes(im, image.width + image.width % 2)
 
-            processed_data = self._pad(image, return_data)
+    def _band(self, im, width, first, last):
+        """Provides data of a band of lines of a complete frame, arranged like a frame
 
-            processed_data = numpy.expand_dims(processed_data, 2)
+        Keyword arguments:
 
-            return_data = processed_data * numpy.array([1, 1, 1]).reshape(
-                (1, 1, 3))
+            im: 1D numpy array with data of a complete frame of even width
+            width: width of the image
+            first, last: even numbers of the first and after the last luma line of the band
 
-            return_data = self._raw_channel_color(image, return_data)
+        Returns: 2D numpy array with luma lines of the band followed by their chroma samples
+        """
+        luma = im.size * 2 // 3
+        lines = luma // width
+        planes = numpy.split(im[luma:], self._chroma_planes)
+        return numpy.concatenate([im[first * width:last * width]] + [
+            plane[first * plane.size // lines:last * plane.size // lines]
+            for plane in planes
+        ]).reshape(-1, width)
+
+    def _convert(self, im, image, height, channels, out):
+        """Converts data of a frame to RGB written to given output"""
+        width = image.width
+        if is_luma_only(channels):
+            lines = min(len(out), height, im.size // width)
+            out[:lines, :width] = im[:lines * width].reshape(lines, width, 1)
+            out[lines:] = 0
+            out[:, width:] = 0
+        elif im.size % (3 * width) == 0 and width % 2 == 0:
+            cv.cvtColor(im.reshape(-1, width).astype('uint8', copy=False),
+                        self._conversion_const,
+                        dst=out)
+        else:
+            cv.cvtColor(self._pad(image, im), self._conversion_const, dst=out)
+        return out
 
-            return_data = return_data.astype('uint8')
-            tmp.append(return_data)
+    def raw_planes(self, image, height=0):
+        if height < 1:
+            height = image.height
 
-        return concatenate_frames(tmp)
+        planes = []
+        for frame in image.frames(height):
+            planes += self._raw_frame_planes(
+                self._pad(image, self._preprocess(frame)), height)
+        return planes
 
 
 class AbstractParserYUV420SP(AbstractParserYUV420, metaclass=ABCMeta):
     """An abstract semi-planar YUV420 parser"""
 
-    def _raw_channel_color(self, image, im):
-        im = numpy.copy(im)
-        p = (image.color_format.palette[x] for x in self._order)
-        p = [numpy.array(x).reshape((1, 1, 3)).astype('float64') for x in p]
-
-        im = im.astype('float64')
-
-        im[:image.height, :] *= p[0]
-
-        cmap = numpy.array(p[1:]).reshape((1, 2, 3))
-
-        uv = im[image.height:, :].reshape((-1, 2, 3))
-        uv *= cmap
-
-        return im
+    @property
+    def _chroma_planes(self):
+        """Number of planes of chroma samples following the luma plane"""
+        return 1
 
-    def _get_nframes(self, image, height):
-        return 0 if image.height == 0 else math.ceil(image.height / height)
+    def _raw_frame_planes(self, im, height):
+        return [(im[:height], [self._order[:1]]),
+                (im[height:], [self._order[1:]])]
 
     def get_pixel_raw_components(self, image, row, column, index):
         return_data = [
@@ -210,24 +392,24 @@ class AbstractParserYUV420SP(AbstractParserYUV420, metaclass=ABCMeta):
         ]
         if image.color_format.pixel_format == PixelFormat.YVU:
             return_data[1], return_data[2] = return_data[2], return_data[1]
-        return return_data
+        return sample_values(image.color_format, return_data)
 
     def crop_image2rawformat(self, image, up_row, down_row, left_column,
                              right_column):
         return_data = numpy.reshape(
-            image.processed_data.astype('uint8'),
+            image.processed_data,
             (len(image.processed_data) // image.width, image.width))
         u = numpy.array(image.processed_data[image.width * image.height +
                                              1::2])
         v = numpy.array(image.processed_data[image.width * image.height::2])
         u = numpy.repeat(u, 2)
         u = numpy.array(u)
-        u = numpy.reshape(u.astype('uint8'), (image.height // 2, image.width))
+        u = numpy.reshape(u, (image.height // 2, image.width))
         u = u[up_row // 2:down_row // 2, left_column:right_column:2]
 
         v = numpy.repeat(v, 2)
         v = numpy.array(v)
-        v = numpy.reshape(v.astype('uint8'), (image.height // 2, image.width))
+        v = numpy.reshape(v, (image.height // 2, image.width))
         v = v[up_row // 2:down_row // 2, left_column:right_column:2]
         v = v.flatten()
         u = u.flatten()
@@ -289,21 +471,20 @@ class ParserYVU420SP(AbstractParserYUV420SP):
 class AbstractParserYUV420P(AbstractParserYUV420SP, metaclass=ABCMeta):
     """An abstract planar YUV420 parser"""
 
-    def _get_nframes(self, image, height):
-        return 0 if image.height == 0 else math.ceil(
-            len(image.processed_data) / image.width / height / 1.5)
-
-    def _raw_channel_color(self, image, im):
-        im = numpy.copy(im)
-        p = (image.color_format.palette[x] for x in self._order)
-        p = [numpy.array(x).reshape((1, 1, 3)).astype('float64') for x in p]
+    @property
+    def _chroma_planes(self):
+        return 2
 
-        im = im.astype('float64')
-        im[:image.height, :] *= p[0]
-        im[image.height:image.height + image.height // 4, :] *= p[1]
-        im[image.height + image.height // 4:, :] *= p[2]
+    def _strip_padding(self, data, width, stride):
+        # a third of lines of the frame contain two chroma lines
+        return self.strip_planar_padding(data, width, stride,
+                                         data.nbytes // stride * 2 // 3)
 
-        return im
+    def _raw_frame_planes(self, im, height):
+        # luma lines are followed by lines of U and V planes, each holding a quarter of samples
+        bounds = [0, height, height + height // 4, len(im)]
+        return [(im[first:last], [[key]])
+                for first, last, key in zip(bounds, bounds[1:], self._order)]
 
     def get_pixel_raw_components(self, image, row, column, index):
         return_data = [
@@ -316,12 +497,12 @@ class AbstractParserYUV420P(AbstractParserYUV420SP, metaclass=ABCMeta):
         ]
         if image.color_format.pixel_format == PixelFormat.YVU:
             return_data[1], return_data[2] = return_data[2], return_data[1]
-        return return_data
+        return sample_values(image.color_format, return_data)
 
     def crop_image2rawformat(self, image, up_row, down_row, left_column,
                              right_column):
         return_data = numpy.reshape(
-            image.processed_data.astype('uint8'),
+            image.processed_data,
             (len(image.processed_data) // image.width, image.width))
         u = numpy.array(
             image.processed_data[image.width *
@@ -329,14 +510,14 @@ class AbstractParserYUV420P(AbstractParserYUV420SP, metaclass=ABCMeta):
                                  image.width * image.height // 4])
         u = numpy.repeat(u, 2)
         u = numpy.array(u)
-        u = numpy.reshape(u.astype('uint8'), (image.height // 2, image.width))
+        u = numpy.reshape(u, (image.height // 2, image.width))
         u = u[up_row // 2:(down_row // 2) + 1, left_column:right_column:2]
         u = u.flatten()
         v = numpy.array(image.processed_data[image.width * image.height +
                                              image.width * image.height // 4:])
         v = numpy.repeat(v, 2)
         v = numpy.array(v)
-        v = numpy.reshape(v.astype('uint8'), (image.height // 2, image.width))
+        v = numpy.reshape(v, (image.height // 2, image.width))
         v = v[up_row // 2:(down_row // 2) + 1, left_column:right_column:2]
         v = v.flatten()
         yuv = numpy.concatenate([
@@ -397,13 +578,15 @@ class ParserYVU420P(AbstractParserYUV420P):
 class AbstractParserYUV422(AbstractParser, metaclass=ABCMeta):
     """An abstract YUV422 parserr"""
 
-    def parse(self, raw_data, color_format, width, reverse_bytes=0):
+    def parse(self, raw_data, color_format, width, reverse_bytes=0, stride=0):
         """Parses provided raw data to an image, calculating height from provided width.
         Keyword arguments:
 
             raw_data: bytes object
             color_format: target instance of ColorFormat
             width: target width to interpret
+            reverse_bytes: number of bytes in reversed groups
+            stride: number of bytes per line including padding, 0 if lines are not padded
 
         Returns: instance of Image processed to chosen format
         """
@@ -411,24 +594,33 @@ class AbstractParserYUV422(AbstractParser, metaclass=ABCMeta):
         curr_dtype = self.get_dtype(max_value, color_format.endianness)
 
         bpcs_set = set(color_format.bits_per_components)
-        if len(bpcs_set) == 2 or len(bpcs_set) == 1 and max_value % 8 == 0:
-            raw_data = bytearray(raw_data)
-            if len(raw_data) % numpy.dtype(curr_dtype).alignment != 0:
-                raw_data += (0).to_bytes(len(raw_data) %
-                                         numpy.dtype(curr_dtype).alignment,
-                                         byteorder="little")
+        if len(bpcs_set) <= 2 and max_value <= 16:
+            raw_data = self.fix_alignment(raw_data, curr_dtype)
         else:
             raise NotImplementedError(
-                "Other than 8-bit YUVs are not currently supported")
-
-        processed_data = numpy.frombuffer(self.reverse(raw_data,
-                                                       reverse_bytes),
-                                          dtype=curr_dtype)
-        processed_data = numpy.array(processed_data, dtype=curr_dtype)
+                "Only YUVs with components of equal size up to 16 bits are supported"
+            )
+
+        views = {}
+        words = self.read_words(self.reverse(raw_data, reverse_bytes),
+                                max_value, color_format.endianness, views)
+        image = self.assemble(raw_data, words, color_format, width, stride)
+        image.byte_order_views = views
+        return image
+
+    def assemble(self, raw_data, words, color_format, width, stride=0):
+        processed_data = words
+        if stride:
+            processed_data = self._strip_padding(words, width, stride)
         processed_data = pad_modulo(processed_data, (width * 2, ))
 
-        return Image(raw_data, color_format, processed_data, width,
-                     processed_data.size // (width * 2))
+        image = Image(raw_data, color_format, processed_data, width,
+                      processed_data.size // (width * 2))
+        image.samples_per_pixel = 2
+        return image
+
+    def _strip_padding(self, data, width, stride):
+        return self.strip_padding(data, width * 2, stride).ravel()
 
 
 class AbstractParserYUV422PA(AbstractParserYUV422, metaclass=ABCMeta):
@@ -444,84 +636,89 @@ class AbstractParserYUV422PA(AbstractParserYUV422, metaclass=ABCMeta):
                         }):
         """Provides displayable image data (RGB formatted)
 
+        Bands of frames are converted in parallel, each into its part of the output.
+
         Returns: Numpy array containing displayable data.
         """
-        tmp = []
-        if height < 1: height = image.height
-        n_frames = 0 if image.height == 0 else math.ceil(image.height / height)
 
-        for i in range(n_frames):
-            temp_processed_data = image.processed_data[i * (
-                image.width * height * 2):(1 + i) * (image.width * height * 2)]
-            height = math.ceil(len(temp_processed_data) / image.width / 2)
+        def prepare(frame):
+            im = self.shift_to_8bit(frame.processed_data,
+                                    display_shift(image.color_format))
+            return self._color_mask(im, channels)
 
-            temp_processed_data = self._color_mask(temp_processed_data,
-                                                   channels)
-            temp_processed_data = self._convert(temp_processed_data,
-                                                image.width, channels)
-            tmp.append(temp_processed_data)
-
-        return concatenate_frames(tmp)
+        frames = parallel_map(prepare, image.frames(height))
+        frames = [self._pad(im, image.width)[0] for im in frames]
+        even_width = image.width + image.width % 2
+        if is_luma_only(channels):
+            return concatenate_frames(
+                [self._convert2GRAY(im, even_width) for im in frames])
+
+        offsets = numpy.cumsum([0] +
+                               [len(im) // (even_width * 2) for im in frames])
+        out = numpy.empty((offsets[-1], even_width, 3), dtype=numpy.uint8)
+        coefficients = conversion_matrix(image.color_format)
+
+        def convert(band):
+            i, first, last = band
+            im = frames[i][first * even_width * 2:last * even_width * 2]
+            part = out[offsets[i] + first:offsets[i] + last]
+            if coefficients is None:
+                self._convert2RGB(im, even_width, part)
+            else:
+                yuv_to_rgb(*self._planes(im, even_width), coefficients, part)
+
+        parallel_map(
+            convert,
+            [(i, first, last) for i in range(len(frames))
+             for first, last in split_bands(offsets[i + 1] - offsets[i])])
+        return out
 
     def _pad(self, im, width):
         even_width = width + width % 2
         return pad_modulo(im, (even_width * 2, )), even_width
 
-    def _convert(self, im, width, channels):
-        if is_luma_only(channels):
-            return self._convert2GRAY(im)
-        else:
-            im, width = self._pad(im, width)
-            return self._convert2RGB(im, width)
-
-    def _convert2GRAY(self, im):
-        return cv.cvtColor(im[self._offset["Y"]::2], cv.COLOR_GRAY2RGB)
-
-    def _raw_channel_color(self, image, im, width):
-        im = numpy.copy(im)
-        p = [image.color_format.palette[x] for x in self._order]
-        p = numpy.array(p).astype('float64').reshape((1, 4, 3))
-
-        im = im.astype('float64')
-
-        im = im.reshape((-1, 4, 1))
-        im = im * p
-
-        return im.reshape((-1, width, 3))
+    def _convert2GRAY(self, im, width):
+        """Converts luma samples of packed pixels of even width to gray lines"""
+        return cv.cvtColor(im[self._offset["Y"]::2].reshape(-1, width),
+                           cv.COLOR_GRAY2RGB)
+
+    def _planes(self, im, width):
+        """Provides views of Y, U and V samples of packed pixels of even width"""
+        cells = im.reshape(-1, width // 2, 4)
+        return (im.reshape(-1, width * 2)[:, self._offset["Y"]::2],
+                cells[..., self._offset["U"]], cells[..., self._offset["V"]])
+
+    def raw_planes(self, image, height=0):
+        planes = []
+        for frame in image.frames(height):
+            im = self.shift_to_8bit(frame.processed_data,
+                                    display_shift(image.color_format))
+            im, width = self._pad(im, image.width)
+            planes.append((im.reshape(-1, width * 2), [self._order]))
+        return planes
 
     def raw_coloring(self, image, height=0):
-        tmp = []
-        if height < 1:
-            height = image.height
-
-        n_frames = 0 if image.height == 0 else math.ceil(image.height / height)
-
-        for i in range(n_frames):
-            temp_processed_data = image.processed_data[i * (
-                image.width * height * 2):(1 + i) * (image.width * height * 2)]
-            height = math.ceil(len(temp_processed_data) / image.width / 2)
-
-            return_data, width = self._pad(temp_processed_data, image.width)
-            return_data = self._raw_channel_color(image, return_data, width)
-            return_data = return_data.astype('uint8')
-            return_data = return_data.reshape((-1, width, 3))
-
-            tmp.append(return_data)
-
-        return concatenate_frames(tmp)
+        """Colors components of an image by the palette of its format, two per pixel"""
+        out = super().raw_coloring(image, height)
+        if out is None or out.size == 0:
+            return out
+        return out.reshape(-1, image.width + image.width % 2, 3)
 
     def get_pixel_raw_components(self, image, row, column, index):
-        return image.processed_data[(index // 2) * 4:(index // 2) * 4 + 4]
+        return sample_values(
+            image.color_format,
+            image.processed_data[(index // 2) * 4:(index // 2) * 4 + 4])
 
     def crop_image2rawformat(self, image, up_row, down_row, left_column,
                              right_column):
         return_data = numpy.reshape(
-            image.processed_data.astype(numpy.byte),
+            image.processed_data,
             (image.height, len(image.processed_data) // image.height))
         return return_data[up_row:down_row, left_column * 2:right_column * 2]
 
     @abstractmethod
-    def _convert2RGB(self, im, width):
+    def _convert2RGB(self, im, width, out):
+        """Converts packed pixels of even width to RGB written to given output"""
         pass
 
     @property
@@ -552,8 +749,10 @@ class ParserYUYV422PA(AbstractParserYUV422PA):
     def _order(self):
         return "YUYV"
 
-    def _convert2RGB(self, im, width):
-        return cv.cvtColor(im.reshape(-1, width, 2), cv.COLOR_YUV2RGB_YUYV)
+    def _convert2RGB(self, im, width, out):
+        return cv.cvtColor(im.reshape(-1, width, 2),
+                           cv.COLOR_YUV2RGB_YUYV,
+                           dst=out)
 
 
 class ParserUYVY422PA(AbstractParserYUV422PA):
@@ -563,8 +762,10 @@ class ParserUYVY422PA(AbstractParserYUV422PA):
     def _order(self):
         return "UYVY"
 
-    def _convert2RGB(self, im, width):
-        return cv.cvtColor(im.reshape(-1, width, 2), cv.COLOR_YUV2RGB_UYVY)
+    def _convert2RGB(self, im, width, out):
+        return cv.cvtColor(im.reshape(-1, width, 2),
+                           cv.COLOR_YUV2RGB_UYVY,
+                           dst=out)
 
 
 class ParserVYUY422PA(AbstractParserYUV422PA):
@@ -574,9 +775,11 @@ class ParserVYUY422PA(AbstractParserYUV422PA):
     def _order(self):
         return "VYUY"
 
-    def _convert2RGB(self, im, width):
+    def _convert2RGB(self, im, width, out):
         im = im.reshape((-1, 4))[:, [2, 1, 0, 3]]
-        return cv.cvtColor(im.reshape(-1, width, 2), cv.COLOR_YUV2RGB_UYVY)
+        return cv.cvtColor(im.reshape(-1, width, 2),
+                           cv.COLOR_YUV2RGB_UYVY,
+                           dst=out)
 
 
 class ParserYVYU422PA(AbstractParserYUV422PA):
@@ -586,22 +789,23 @@ class ParserYVYU422PA(AbstractParserYUV422PA):
     def _order(self):
         return "YVYU"
 
-    def _convert2RGB(self, im, width):
-        return cv.cvtColor(im.reshape(-1, width, 2), cv.COLOR_YUV2RGB_YVYU)
+    def _convert2RGB(self, im, width, out):
+        return cv.cvtColor(im.reshape(-1, width, 2),
+                           cv.COLOR_YUV2RGB_YVYU,
+                           dst=out)
 
 
 class ParserYUV422P(AbstractParserYUV422):
     """A planar YUV422 (I422) parser"""
 
-    def _get_nframes(self, image, height):
-        return 0 if image.height == 0 else math.ceil(
-            len(image.processed_data) / image.width / height / 2)
+    def _strip_padding(self, data, width, stride):
+        # a half of lines of the frame contain two chroma lines
+        return self.strip_planar_padding(data, width, stride,
+                                         data.nbytes // stride // 2)
 
-    def _preprocess(self, image, height, i):
-        return numpy.copy(
-            image.processed_data[int(i * (image.width * height) *
-                                     2):int((1 + i) * (image.width * height) *
-                                            2)])
+    def _preprocess(self, frame):
+        return self.shift_to_8bit(frame.processed_data,
+                                  display_shift(frame.color_format))
 
     def get_displayable(self,
                         image,
@@ -610,117 +814,154 @@ class ParserYUV422P(AbstractParserYUV422):
                             "r_y": True,
                             "g_u": True,
                             "b_v": True
-                        }):
+                        },
+                        out=None):
         """Provides displayable image data (RGB formatted)
 
+        Planes of bands of frames are converted straight to the output, in parallel.
+
+        Keyword arguments:
+
+            image: processed image object
+            height: height of a frame, the whole image is a frame if 0
+            channels: dictionary with visibility of channels
+            out: preallocated uint8 numpy array for the displayable data, allocated if None
+
         Returns: Numpy array containing displayable data.
         """
         if height < 1: height = image.height
-        tmp = []
-        n_frames = self._get_nframes(image, height)
-        for i in range(n_frames):
-            temp_processed_data = self._preprocess(image, height, i)
-            height = math.ceil(len(temp_processed_data) / image.width / 2)
-            temp_processed_data = self._channel_mask(channels, image,
-                                                     temp_processed_data,
-                                                     height)
-            return_data = self._convert(temp_processed_data, image.width,
-                                        height, channels)
-            tmp.append(return_data)
-
-        return concatenate_frames(tmp)
+        frames = [frame.processed_data for frame in image.frames(height)]
+        planes = [
+            self._planes(frame, image.width,
+                         math.ceil(len(frame) / image.width / 2))
+            for frame in frames
+        ]
+        offsets = numpy.cumsum([0] + [len(y) for y, _, _ in planes])
+        out = self.output(out, (offsets[-1], image.width + image.width % 2, 3))
+        coefficients = conversion_matrix(image.color_format)
+
+        def convert(band):
+            i, first, last = band
+            y, u, v = (plane[first:last] for plane in planes[i])
+            if y.itemsize > 1:
+                shift = display_shift(image.color_format)
+                y, u, v = (self.shift_to_8bit(plane, shift)
+                           for plane in (y, u, v))
+            self._convert(*self._channel_mask(channels, image, y, u,
+                                              v), image.width, channels,
+                          out[offsets[i] + first:offsets[i] + last],
+                          coefficients)
+
+        parallel_map(convert, [(i, first, last)
+                               for i, (y, _, _) in enumerate(planes)
+                               for first, last in split_bands(len(y))])
+        return out
+
+    def _planes(self, im, width, height):
+        """Splits data of a frame into planes with equal numbers of lines
 
-    def _channel_mask(self, channels, image, im, height):
-        im = im.copy()
+        Keyword arguments:
+
+            im: 1D numpy array with data of a frame
+            width: width of the image
+            height: number of lines of the frame
+
+        Returns: 2D numpy arrays with Y, U and V planes, views of im if the frame is complete and its width is even
+        """
+        if width % 2 == 0 and len(im) == 2 * width * height:
+            y, u, v = numpy.split(im,
+                                  [height * width, height * width * 3 // 2])
+            return (y.reshape(height, width), u.reshape(height, width // 2),
+                    v.reshape(height, width // 2))
+        y = im[0:height * width:]
+        u = im[height * width:height * (3 * width // 2 + width % 2)]
+        v = im[height * (3 * width // 2 + width % 2):]
+        even_width = width + width % 2
+        y = pad_modulo(y, (even_width, ))
+        u = numpy.pad(u, (0, max(y.size // 2 - u.size, 0)))[:y.size // 2]
+        v = numpy.pad(v, (0, max(y.size // 2 - v.size, 0)))[:y.size // 2]
+        return (y.reshape(-1, even_width), u.reshape(-1, even_width // 2),
+                v.reshape(-1, even_width // 2))
+
+    def _channel_mask(self, channels, image, y, u, v):
         if image.color_format.pixel_format == PixelFormat.YUV:
             if not channels["r_y"]:
-                im[0:height * image.width:] = 0
+                y = numpy.zeros_like(y)
             if not channels["g_u"]:
-                im[height * image.width:height *
-                   (3 * image.width // 2 + image.width % 2)] = 0
+                u = numpy.zeros_like(u)
             if not channels["b_v"]:
-                im[height * (3 * image.width // 2 + image.width % 2):] = 0
-        return im
+                v = numpy.zeros_like(v)
+        return y, u, v
 
-    def _convert(self, im, width, height, channels):
+    def _convert(self, y, u, v, width, channels, out, coefficients=None):
         if is_luma_only(channels):
-            return cv.cvtColor(im[:width * height], cv.COLOR_GRAY2RGB)
+            out[:, :width] = y[:, :width, None]
+            out[:, width:] = 0
+        elif coefficients is not None:
+            yuv_to_rgb(y, u, v, coefficients, out)
         else:
-            return self.convert2RGB(im, width, height)
-
-    def raw_coloring(self, image, height=0):
-        tmp = []
+            self.convert2RGB(y, u, v, out)
+        return out
 
+    def raw_planes(self, image, height=0):
         if height < 1:
             height = image.height
 
-        n_frames = self._get_nframes(image, height)
-
-        for i in range(n_frames):
-            processed_data = self._preprocess(image, height, i)
-
-            processed_data = processed_data.reshape((-1, image.width, 1))
-
-            return_data = processed_data * numpy.array([1, 1, 1]).reshape(
-                (1, 1, 3))
+        planes = []
+        for frame in image.frames(height):
+            im = self._preprocess(frame).reshape((-1, image.width))
+            # luma lines are followed by lines of U and V planes, each holding a half of samples
+            bounds = [0, height, height + height // 2, len(im)]
+            planes += [(im[first:last], [[key]])
+                       for first, last, key in zip(bounds, bounds[1:], "YUV")]
+        return planes
 
-            return_data = self._raw_channel_color(image, return_data)
+    def convert2RGB(self, y, u, v, out):
+        """Converts planes to RGB written to given output
 
-            return_data = return_data.astype('uint8')
-            tmp.append(return_data)
+        Chunks of lines are interleaved to YUYV, small enough to stay in
+        cache, and converted by OpenCV.
 
-        return concatenate_frames(tmp)
-
-    def _raw_channel_color(self, image, im):
-        im = numpy.copy(im)
-
-        p = (image.color_format.palette[x] for x in "YUV")
-        p = [numpy.array(x).reshape((1, 1, 3)).astype('float64') for x in p]
-
-        im = im.astype('float64')
-        im[:image.height, :] *= p[0]
-        im[image.height:image.height + image.height // 2, :] *= p[1]
-        im[image.height + image.height // 2:, :] *= p[2]
+        Keyword arguments:
 
-        return im
+            y: 2D numpy array with luma plane of even width
+            u, v: 2D numpy arrays with chroma planes, half as wide as luma
+            out: uint8 numpy array with shape of luma plane followed by 3 channels
 
-    def convert2RGB(self, processed_data, width, height):
-        y = processed_data[0:height * width:]
-        u = processed_data[height * width:height *
-                           (3 * width // 2 + width % 2)]
-        v = processed_data[height * (3 * width // 2 + width % 2):]
-        even_width = width + width % 2
-        y = pad_modulo(y, (even_width, ))
-        u = numpy.pad(u, (0, max(y.size // 2 - u.size, 0)))[:y.size // 2]
-        v = numpy.pad(v, (0, max(y.size // 2 - v.size, 0)))[:y.size // 2]
-        yuv = numpy.empty((y.size, 2), dtype=numpy.uint8)
-        yuv[:, 0] = y
-        yuv[0::2, 1] = u
-        yuv[1::2, 1] = v
-        rgb = cv.cvtColor(yuv.reshape((-1, even_width, 2)),
-                          cv.COLOR_YUV2RGB_YUYV)
-        return rgb
+        Returns: out
+        """
+        height, width = y.shape
+        lines = min(height, CHUNK_LINES)
+        uv = numpy.empty((lines, width // 2, 2), dtype=numpy.uint8)
+        yuyv = numpy.empty((lines, width, 2), dtype=numpy.uint8)
+        for first in range(0, height, lines):
+            last = min(first + lines, height)
+            n = last - first
+            cv.merge([u[first:last], v[first:last]], dst=uv[:n])
+            cv.merge([y[first:last], uv[:n].reshape(n, width)], dst=yuyv[:n])
+            cv.cvtColor(yuyv[:n], cv.COLOR_YUV2RGB_YUYV, dst=out[first:last])
+        return out
 
     def get_pixel_raw_components(self, image, row, column, index):
-        return [
+        return sample_values(image.color_format, [
             image.processed_data[index],
             image.processed_data[image.height * image.width + index // 2],
             image.processed_data[image.height *
                                  (3 * image.width // 2 + image.width % 2) +
                                  index // 2]
-        ]
+        ])
 
     def crop_image2rawformat(self, image, up_row, down_row, left_column,
                              right_column):
         return_data = numpy.reshape(
-            image.processed_data.astype('uint8'),
+            image.processed_data,
             (len(image.processed_data) // image.width, image.width))
         u = numpy.array(
             image.processed_data[image.height * image.width:image.height *
                                  (3 * image.width // 2 + image.width % 2)])
         u = numpy.repeat(u, 2)
         u = numpy.array(u)
-        u = numpy.reshape(u.astype('uint8'), (image.height, image.width))
+        u = numpy.reshape(u, (image.height, image.width))
         u = u[up_row:down_row, left_column:right_column:2]
         u = u.flatten()
 
@@ -729,7 +970,7 @@ class ParserYUV422P(AbstractParserYUV422):
                                  (3 * image.width // 2 + image.width % 2):])
         v = numpy.repeat(v, 2)
         v = numpy.array(v)
-        v = numpy.reshape(v.astype('uint8'), (image.height, image.width))
+        v = numpy.reshape(v, (image.height, image.width))
         v = v[up_row:down_row, left_column:right_column:2]
         v = v.flatten()
         yuv = numpy.concatenate([
@@ -2,14 +2,52 @@
 
 from ..image.image import Image
 from ..parser.factory import ParserFactory
+from ..parser.bayer import DEMOSAIC_METHODS
+from ..parser.common import set_threads
 from .utils import determine_color_format
-from ..image.color_format import PixelFormat, PixelPlane
+from .transforms import Align
+from ..image.color_format import PixelFormat, PixelPlane, AVAILABLE_FORMATS
 
 import numpy as np
+import os
+import stat
 from pyrav4l2 import Stream
 
+# pixel formats displayed with a lookup table supporting gamma, besides grayscale
+BAYER_FORMATS = [
+    PixelFormat.BAYER_RG, PixelFormat.BAYER_BG, PixelFormat.BAYER_GB,
+    PixelFormat.BAYER_GR
+]
+# packed pixel formats displayed into a preallocated output, besides planar and semi-planar formats
+RGB_FORMATS = [
+    PixelFormat.RGB, PixelFormat.BGR, PixelFormat.RGBA, PixelFormat.BGRA,
+    PixelFormat.ARGB, PixelFormat.ABGR
+]
+# pixel formats converted from YUV with a chosen matrix and range
+YUV_FORMATS = [
+    PixelFormat.YUV, PixelFormat.YVU, PixelFormat.YUYV, PixelFormat.UYVY,
+    PixelFormat.VYUY, PixelFormat.YVYU
+]
+
+
+def set_yuv_conversion(matrix=None, yuv_range=None):
+    """Sets the conversion of all YUV formats to RGB.
 
-def parse_image(data_buffer, color_format, width, reverse_bytes=0):
+    Keyword arguments:
+
+        matrix: instance of YUVMatrix, unchanged if None
+        yuv_range: instance of YUVRange, unchanged if None
+    """
+    for color_format in AVAILABLE_FORMATS.values():
+        if color_format.pixel_format not in YUV_FORMATS:
+            continue
+        if matrix is not None:
+            color_format.yuv_matrix = matrix
+        if yuv_range is not None:
+            color_format.yuv_range = yuv_range
+
+
+def parse_image(data_buffer, color_format, width, reverse_bytes=0, stride=0):
     try:
         image = Image(data_buffer)
         parser = ParserFactory.create_object(
@@ -19,14 +57,22 @@ def parse_image(data_buffer, color_format, width, reverse_bytes=0):
     #Stride image
     image = parser.parse(image.data_buffer,
                          determine_color_format(color_format), width,
-                         reverse_bytes)
+                         reverse_bytes, stride)
 
     return image
 
 
 def load_image(file_path):
     with open(file_path, 'rb') as f:
-        data_buffer = bytearray(f.read())
+        status = os.fstat(f.fileno())
+        if stat.S_ISREG(status.st_mode):
+            #read straight into a mutable buffer, without a temporary copy
+            data_buffer = bytearray(status.st_size)
+            #the file may be truncated while it is read
+            del data_buffer[f.readinto(data_buffer):]
+        else:
+            #size of pipes and devices is not known before reading them
+            data_buffer = bytearray(f.read())
     image = Image(data_buffer)
     return image
 
@@ -49,22 +95,52 @@ def get_displayable(image,
                         "b_v": True,
                         "a_v": True
                     },
-                    raw=False):
+                    raw=False,
+                    gamma=1.0,
+                    out=None,
+                    preview=False,
+                    demosaic="bilinear"):
     if image.color_format is None:
         raise Exception("Image should be already parsed!")
     parser = ParserFactory.create_object(image.color_format)
 
-    if raw and (out := parser.raw_coloring(image)) is not None:
+    if raw and (out := parser.raw_coloring(image, height)) is not None:
         return out
 
     if image.color_format.pixel_format == PixelFormat.MONO:
-        return parser.get_displayable(image)
+        return parser.get_displayable(image, height, gamma=gamma)
     elif image.color_format.pixel_plane in [
             PixelPlane.SEMIPLANAR, PixelPlane.PLANAR
     ]:
-        return parser.get_displayable(image, height, channels=channels)
+        return parser.get_displayable(image,
+                                      height,
+                                      channels=channels,
+                                      out=out)
+    elif image.color_format.pixel_format in BAYER_FORMATS:
+        return parser.get_displayable(image,
+                                      height,
+                                      channels=channels,
+                                      gamma=gamma,
+                                      preview=preview,
+                                      demosaic=demosaic)
+    elif image.color_format.pixel_format in RGB_FORMATS:
+        return parser.get_displayable(image,
+                                      height,
+                                      channels=channels,
+                                      out=out)
     else:
-        return parser.get_displayable(image, channels=channels)
+        return parser.get_displayable(image, height, channels=channels)
+
+
+def change_endianness(image, endianness, stride=0):
+    """Reinterprets already parsed image in given byte order without parsing the raw data again
+    Keyword arguments:
+        image: Image instance returned by parse_image
+        endianness: instance of Endianness
+        stride: number of bytes per line including padding, 0 if lines are not padded
+    """
+    parser = ParserFactory.create_object(image.color_format)
+    return parser.change_endianness(image, endianness, stride)
 
 
 """Resolve picked pixel's raw integrants."""
@@ -111,20 +187,4 @@ def align_image(data_buffer, nnumber, nvalues=0, frame_num=1):
     Returns:
         bytearray: aligned buffer
     """
-
-    raw_data = np.array(data_buffer)
-    frames = np.array_split(raw_data, frame_num)
-    new_frames = [None] * len(frames)
-
-    if nnumber > 0:
-        values_to_insert = np.repeat(nvalues, nnumber)
-        for i, frame in enumerate(frames):
-            new_frames[i] = np.insert(frame, 0, values_to_insert)
-    else:
-        frame_len = len(raw_data) // frame_num
-        if abs(nnumber) > frame_len:
-            return
-        for i, frame in enumerate(frames):
-            new_frames[i] = frame[abs(nnumber):]
-
-    return bytearray(np.concatenate(new_frames).tobytes())
+    return bytearray(Align(nnumber, nvalues, frame_num).apply(data_buffer))
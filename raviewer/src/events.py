@@ -6,20 +6,29 @@ from pathlib import Path
 
 from .. import items
 from .core import (parse_image, load_image, get_displayable,
-                   get_pixel_raw_components, crop_image2rawformat, align_image,
-                   load_from_camera)
-from ..parser.factory import ParserFactory
-from ..image.color_format import PixelFormat, Endianness
+                   get_pixel_raw_components, crop_image2rawformat,
+                   load_from_camera, change_endianness, BAYER_FORMATS,
+                   YUV_FORMATS, DEMOSAIC_METHODS)
+from ..image.color_format import (PixelFormat, Endianness, YUVMatrix, YUVRange)
 from ..image.color_format import AVAILABLE_FORMATS
 from ..image.image import Image
 from .utils import (RGBtoYUV, determine_color_format, save_image_as_file)
+from .transforms import Align, Reverse, TransformedBuffer
 from .hexviewer import Hexviewer
+from .overview import Overview
 from .controls import Controls
 from .camera_ctrls import CameraCtrls
-from ..format_recognition.detect import classify_top1, classify_all, predict_resolution
+from ..format_recognition.detect import classify_top1, predict_resolution
+from ..format_recognition.tiebreak import classify_ranked
+from ..format_recognition.offset import find_offsets
+from ..format_recognition.frames import first_frame
+from ..format_recognition.scan import scan_file
 from pyrav4l2 import Device, Stream, WrongFrameInterval
 import threading
 
+# number of image pixels per screen pixel from which Bayer images are displayed in half resolution
+PREVIEW_ZOOM = 2
+
 
 class meta_events(type):
     """Needed only for Singleton pattern"""
@@ -38,11 +47,16 @@ class Base_img():
     Keyword variables:
         img: Image instance
         data_buffer: binary data read from the input file
+        buffer: data_buffer with transforms applied before parsing (e.g. alignment, reversing bytes), instance of TransformedBuffer
         path_to_File: location of embraced file
         color_format: actual used color format
         width: actual image series width
         height: frame height
-        n_frames: number of frames in the file,
+        stride: bytes per line including padding, 0 if lines are not padded
+        n_frames: number of frames in the file, the last one may be incomplete
+        frame_index: index of the displayed frame
+        frame: displayed frame of img, instance of Image
+        frame_source: img, frame_index and height the displayed frame was taken with, keeps values cached in the frame (e.g. raw planes) while they are the same
         selected_part: selected area resolution in pixels
         left_column, right_column, up_row, down_row: corner coordinates of selected area
         texture_format: actual used texture format(mvFormat_Float_rgba or mvFormat_Float_rgb)
@@ -51,17 +65,28 @@ class Base_img():
         raw_data: image raw data in texture float format
         image_series: image series associated with plot
         display_raw: whether image should be displayed raw (e.g. non-debayerized)
+        zoomed_out: whether a screen pixel of the plot covers at least PREVIEW_ZOOM image pixels
+        preview: whether Bayer image is displayed in half resolution, without demosaicing
+        demosaic: demosaicing method of Bayer images, one of DEMOSAIC_METHODS
+        image_regions: image-like regions found in the file
+        offset_base: number of bytes added to (or skipped from) the data when offset candidates were found, candidates are applied relative to it
+        applied_offset: Align transform of the last applied offset candidate, undone when another candidate is applied
     """
 
     img = None
     data_buffer = None
+    buffer = None
     path_to_File = None
     color_format = None
     list_of_formats = list(AVAILABLE_FORMATS.keys())
     width = 800
     height = 0
+    stride = 0
     list_of_resolutions = [[800, 0]]
     n_frames = 1
+    frame_index = 0
+    frame = None
+    frame_source = None
     selected_part = list()
     left_column, right_column = 0, 0
     up_row, down_row = 0, 0
@@ -70,11 +95,16 @@ class Base_img():
     raw_data = None
     img_postchanneled = None
     image_series = None
-    reverse_bytes = 0
     nnumber, nvalues = 0, 0
     image_mutex = threading.Lock()
     display_raw = False
+    zoomed_out = False
+    preview = False
+    demosaic = "bilinear"
     endianness = None
+    image_regions = list()
+    offset_base = 0
+    applied_offset = None
 
     file_dialog_width = 0
     file_dialog_height = 0
@@ -150,16 +180,90 @@ class Plot_events(Base_img):
         with Base_img.image_mutex:
             nnumber = dpg.get_value(items.buttons.nnumber)
             Base_img.nvalues = dpg.get_value(items.buttons.nvalues)
-            Base_img.data_buffer = align_image(Base_img.data_buffer,
-                                               nnumber - Base_img.nnumber,
-                                               Base_img.nvalues)
+            n_frames = Base_img.n_frames if dpg.get_value(
+                items.buttons.nnumber_every_frame) else 1
+            if Base_img.buffer is None or nnumber == Base_img.nnumber:
+                return
+            Base_img.buffer.push(
+                Align(nnumber - Base_img.nnumber, Base_img.nvalues, n_frames))
             Base_img.nnumber = nnumber
             if Base_img.img != None:
                 Plot_events.update_image(self, fit_image=False)
 
+    @indicate_loading
+    @error_handling
+    def undo_align(self, app_data, user_data):
+        with Base_img.image_mutex:
+            if Base_img.buffer is None or Base_img.buffer.undo() is None:
+                return
+            Base_img.nnumber = Base_img.buffer.offset
+            dpg.set_value(items.buttons.nnumber, Base_img.nnumber)
+            dpg.set_value(items.buttons.reverse, Base_img.buffer.reverse_bytes)
+            if Base_img.img != None:
+                Plot_events.update_image(self, fit_image=False)
+
+    def set_data_buffer(self, data_buffer):
+        """Replaces the original data, dropping transforms of the previous data"""
+        Base_img.data_buffer = data_buffer
+        Base_img.buffer = TransformedBuffer(data_buffer)
+        Base_img.nnumber = 0
+        if dpg.does_item_exist(items.buttons.nnumber):
+            dpg.set_value(items.buttons.nnumber, 0)
+        if dpg.does_item_exist(items.buttons.reverse):
+            dpg.set_value(items.buttons.reverse, 1)
+        Base_img.frame_index = 0
+        #offsets found in the previous data do not apply to the new one
+        Base_img.offset_base = 0
+        Base_img.applied_offset = None
+        if dpg.does_item_exist(items.buttons.offset_candidates):
+            dpg.configure_item(items.buttons.offset_candidates, items=[])
+            dpg.set_value(items.buttons.offset_candidates, "")
+
+    @indicate_loading
+    @error_handling
+    def find_offset(self, app_data, user_data):
+        with Base_img.image_mutex:
+            if Base_img.img is None:
+                return
+            offsets = find_offsets(Base_img.img, Base_img.color_format,
+                                   Base_img.width)
+            Base_img.offset_base = Base_img.nnumber
+            candidates = [
+                f"{offset} B (score {score})" for offset, score in offsets
+            ]
+            dpg.configure_item(items.buttons.offset_candidates,
+                               items=candidates)
+            dpg.set_value(items.buttons.offset_candidates, candidates[0])
+
+    @indicate_loading
+    @error_handling
+    def apply_offset(self, sender, app_data):
+        offset = int(app_data.split(" ")[0])
+        with Base_img.image_mutex:
+            if Base_img.buffer is None:
+                return
+            #candidates replace each other, bytes skipped by the previous one are restored by undoing it
+            transforms = Base_img.buffer.transforms
+            undone = len(
+                transforms) > 0 and transforms[-1] is Base_img.applied_offset
+            if undone:
+                Base_img.buffer.undo()
+                Base_img.nnumber = Base_img.buffer.offset
+            n_transforms = len(transforms)
+        dpg.set_value(items.buttons.nnumber, Base_img.offset_base - offset)
+        self.align(sender, app_data)
+        if len(transforms) > n_transforms:
+            Base_img.applied_offset = transforms[-1]
+        elif undone:
+            Base_img.applied_offset = None
+            with Base_img.image_mutex:
+                Plot_events.update_image(self, fit_image=False)
+
     def reverse_bytes(self, app_data, user_data):
         with Base_img.image_mutex:
-            Base_img.reverse_bytes = user_data
+            if Base_img.buffer is None:
+                return
+            Base_img.buffer.replace(Reverse(user_data))
             if Base_img.img != None:
                 self.update_image(fit_image=True)
 
@@ -170,6 +274,26 @@ class Plot_events(Base_img):
             cf = determine_color_format(Base_img.color_format)
             self._update_color_edits(cf.palette)
 
+            if Base_img.img != None:
+                self.update_image(False, reparse=False)
+
+    def change_demosaic(self, sender, app_data):
+        with Base_img.image_mutex:
+            Base_img.demosaic = app_data
+            if Base_img.img != None:
+                self.update_image(False)
+
+    def change_yuv_matrix(self, sender, app_data):
+        with Base_img.image_mutex:
+            cf = determine_color_format(Base_img.color_format)
+            cf.yuv_matrix = YUVMatrix[app_data]
+            if Base_img.img != None:
+                self.update_image(False)
+
+    def change_yuv_range(self, sender, app_data):
+        with Base_img.image_mutex:
+            cf = determine_color_format(Base_img.color_format)
+            cf.yuv_range = YUVRange[app_data]
             if Base_img.img != None:
                 self.update_image(False)
 
@@ -183,8 +307,9 @@ class Plot_events(Base_img):
             if cf.palette is not None:
                 cf.palette[user_data] = tuple(app_data[:3])
 
+            #components arranged for raw coloring are cached on the image, only their colors change
             if Base_img.img != None:
-                self.update_image(False)
+                self.update_image(False, reparse=False)
 
     def _set_color_format(self, color_format):
         Base_img.color_format = color_format
@@ -231,21 +356,33 @@ class Plot_events(Base_img):
                         "\nPixel plane:  " + str(color_format.pixel_plane)[11:] + "\nBits per component:  " + str(color_format.bits_per_components)
         dpg.set_value(items.buttons.endianness, Base_img.endianness)
         dpg.set_value(items.static_text.color_description, custom_text)
-
-    def update_image(self, fit_image, channels=None):
+        is_yuv = color_format.pixel_format in YUV_FORMATS
+        for tag, option in [(items.buttons.yuv_matrix, "yuv_matrix"),
+                            (items.buttons.yuv_range, "yuv_range")]:
+            if is_yuv:
+                dpg.set_value(tag, getattr(color_format, option).name)
+            dpg.configure_item(tag, enabled=is_yuv)
+
+    def update_image(self, fit_image, channels=None, reparse=True):
         with dpg.mutex():
             AVAILABLE_FORMATS[Base_img.color_format].endianness = Endianness[
                 Base_img.endianness]
-            self.refresh_image()
+            self.refresh_image(reparse)
             dpg.set_value(
                 items.buttons.height_setter, Base_img.img.height
                 if Base_img.height == 0 else Base_img.height)
             dpg.set_value(items.buttons.width_setter, Base_img.img.width)
+            dpg.set_value(items.buttons.stride_setter, Base_img.stride)
             dpg.set_value(items.buttons.combo, Base_img.color_format)
             dpg.set_value(items.buttons.n_frames_setter, Base_img.n_frames)
+            dpg.configure_item(items.buttons.frame_setter,
+                               max_value=Base_img.n_frames - 1,
+                               enabled=True)
+            dpg.set_value(items.buttons.frame_setter, Base_img.frame_index)
 
             dpg.configure_item(items.buttons.width_setter, enabled=True)
             dpg.configure_item(items.buttons.height_setter, enabled=True)
+            dpg.configure_item(items.buttons.stride_setter, enabled=True)
             dpg.configure_item(items.buttons.nnumber, enabled=True)
             dpg.configure_item(items.buttons.nvalues, enabled=True)
             dpg.configure_item(items.buttons.reverse, enabled=True)
@@ -256,62 +393,106 @@ class Plot_events(Base_img):
                 dpg.fit_axis_data(items.plot.xaxis)
                 dpg.fit_axis_data(items.plot.yaxis)
 
-            if (items.texture.raw):
-                dpg.delete_item(Base_img.image_series)
-
-            if not Base_img.display_raw:
-                self.add_texture(Base_img.img.width, Base_img.img.height,
-                                 Base_img.raw_data)
-            else:
-                self.add_texture(Base_img.img_postchanneled.shape[1],
-                                 Base_img.img_postchanneled.shape[0],
-                                 Base_img.raw_data)
-
-            Base_img.image_series = dpg.add_image_series(
-                texture_tag=items.texture.raw,
-                parent=items.plot.yaxis,
-                label="Raw map",
-                bounds_min=[0, 0],
-                bounds_max=[Base_img.img.width, Base_img.img.height])
+            self.show_texture()
 
             dpg.set_item_label(items.plot.main_plot, Base_img.path_to_File)
 
             if dpg.does_item_exist(items.plot.annotation):
                 dpg.delete_item(items.plot.annotation)
 
-    def refresh_image(self):
-        Base_img.img = parse_image(Base_img.img.data_buffer,
-                                   Base_img.color_format, Base_img.width,
-                                   Base_img.reverse_bytes)
-        if Base_img.nnumber or Base_img.nvalues:
-            parser = ParserFactory.create_object(
-                determine_color_format(Base_img.color_format))
-            Base_img.img = parser.parse(
-                Base_img.img.data_buffer,
-                determine_color_format(Base_img.color_format), Base_img.width,
-                Base_img.reverse_bytes)
-        self.change_channel_labels()
-        if Base_img.img.color_format.pixel_format == PixelFormat.MONO:
-            Base_img.img_postchanneled = get_displayable(
-                Base_img.img, raw=Base_img.display_raw)
+    def show_texture(self):
+        """Replaces the texture of the plot, which always spans the whole image"""
+        if (items.texture.raw):
+            dpg.delete_item(Base_img.image_series)
+
+        if not Base_img.display_raw and not Base_img.preview:
+            self.add_texture(Base_img.frame.width, Base_img.frame.height,
+                             Base_img.raw_data)
         else:
-            Base_img.img_postchanneled = get_displayable(
-                Base_img.img,
-                Base_img.height, {
-                    "r_y": dpg.get_value(items.buttons.r_ychannel),
-                    "g_u": dpg.get_value(items.buttons.g_uchannel),
-                    "b_v": dpg.get_value(items.buttons.b_vchannel),
-                    "a_v": dpg.get_value(items.buttons.a_vchannel)
-                },
-                raw=Base_img.display_raw)
-        Base_img.raw_data = np.frombuffer(
-            Base_img.img_postchanneled.tobytes(),
-            dtype=np.uint8).astype("float32") / 255.0
+            self.add_texture(Base_img.img_postchanneled.shape[1],
+                             Base_img.img_postchanneled.shape[0],
+                             Base_img.raw_data)
+
+        Base_img.image_series = dpg.add_image_series(
+            texture_tag=items.texture.raw,
+            parent=items.plot.yaxis,
+            label="Raw map",
+            bounds_min=[0, 0],
+            bounds_max=[Base_img.frame.width, Base_img.frame.height])
+
+    def is_zoomed_out(self):
+        """Checks whether a screen pixel of the plot covers at least PREVIEW_ZOOM image pixels in both directions"""
+        size = dpg.get_item_rect_size(items.plot.main_plot)
+        x_min, x_max = dpg.get_axis_limits(items.plot.xaxis)
+        y_min, y_max = dpg.get_axis_limits(items.plot.yaxis)
+        return min(size) > 0 and x_max - x_min >= PREVIEW_ZOOM * size[
+            0] and y_max - y_min >= PREVIEW_ZOOM * size[1]
+
+    def refresh_preview(self):
+        """Switches between half resolution preview and full demosaicing of Bayer images as the plot is zoomed"""
+        zoomed_out = self.is_zoomed_out()
+        if zoomed_out == Base_img.zoomed_out:
+            return
+        Base_img.zoomed_out = zoomed_out
+        with Base_img.image_mutex:
+            if Base_img.img is not None and Base_img.img.color_format is not None \
+                    and Base_img.img.color_format.pixel_format in BAYER_FORMATS:
+                with dpg.mutex():
+                    self.refresh_image(reparse=False)
+                    self.show_texture()
+
+    def get_postchanneled(self, preview=False):
+        """Provides displayable data of the displayed frame with chosen channels
+        Keyword arguments:
+            preview: whether Bayer image should be displayed in half resolution
+        """
+        if Base_img.frame.color_format.pixel_format == PixelFormat.MONO:
+            return get_displayable(Base_img.frame, raw=Base_img.display_raw)
+        return get_displayable(Base_img.frame,
+                               channels={
+                                   "r_y":
+                                   dpg.get_value(items.buttons.r_ychannel),
+                                   "g_u":
+                                   dpg.get_value(items.buttons.g_uchannel),
+                                   "b_v":
+                                   dpg.get_value(items.buttons.b_vchannel),
+                                   "a_v":
+                                   dpg.get_value(items.buttons.a_vchannel)
+                               },
+                               raw=Base_img.display_raw,
+                               preview=preview,
+                               demosaic=Base_img.demosaic)
+
+    def get_full_resolution(self):
+        """Provides displayable data of the image in full resolution, e.g. for exporting"""
+        if Base_img.preview:
+            return self.get_postchanneled()
+        return Base_img.img_postchanneled
+
+    def refresh_image(self, reparse=True):
+        if reparse:
+            data_buffer = Base_img.img.data_buffer if Base_img.buffer is None \
+                else Base_img.buffer.data
+            Base_img.img = parse_image(data_buffer,
+                                       Base_img.color_format,
+                                       Base_img.width,
+                                       stride=Base_img.stride)
         if Base_img.height < 1: Base_img.height = 0
-        if Base_img.height != 0:
-            Base_img.n_frames = Base_img.img.height // Base_img.height
-        else:
-            Base_img.n_frames = 1
+        #frames are displayed one at a time, the last one may be incomplete
+        Base_img.n_frames = max(Base_img.img.n_frames(Base_img.height), 1)
+        Base_img.frame_index = min(Base_img.frame_index, Base_img.n_frames - 1)
+        frame_source = (Base_img.img, Base_img.frame_index, Base_img.height)
+        if Base_img.frame_source != frame_source:
+            Base_img.frame = Base_img.img.frame(Base_img.frame_index,
+                                                Base_img.height)
+            Base_img.frame_source = frame_source
+        self.change_channel_labels()
+        Base_img.preview = Base_img.zoomed_out and not Base_img.display_raw \
+            and Base_img.img.color_format.pixel_format in BAYER_FORMATS
+        Base_img.img_postchanneled = self.get_postchanneled(Base_img.preview)
+        Base_img.raw_data = np.divide(Base_img.img_postchanneled.reshape(-1),
+                                      np.float32(255.0),
+                                      dtype=np.float32)
 
     def add_texture(self, width, height, image_data):
         if self._use_software_rendering:
@@ -340,18 +521,20 @@ class Plot_events(Base_img):
         if dpg.is_item_hovered(items.plot.main_plot):
             if Base_img.img != None:
                 plot_mouse_x, plot_mouse_y = dpg.get_plot_mouse_pos()
-                if (plot_mouse_x < Base_img.img.width and plot_mouse_x
-                        > 0) and (plot_mouse_y < Base_img.img.height
+                if (plot_mouse_x < Base_img.frame.width and plot_mouse_x
+                        > 0) and (plot_mouse_y < Base_img.frame.height
                                   and plot_mouse_y > 0):
                     listed_data = Base_img.raw_data.tolist()
                     if Base_img.texture_format == dpg.mvFormat_Float_rgba:
                         components_n = 4
                     else:
                         components_n = 3
-                    row = int(Base_img.img.height - plot_mouse_y)
-                    row_index = int(
-                        plot_mouse_x
-                    ) * components_n + row * Base_img.img.width * components_n
+                    row = int(Base_img.frame.height - plot_mouse_y)
+                    #a pixel of the preview covers a 2x2 cell of the image
+                    scale = 2 if Base_img.preview else 1
+                    row_index = (
+                        int(plot_mouse_x) // scale + row // scale *
+                        (Base_img.frame.width // scale)) * components_n
                     column_index = row_index + components_n
                     pixel_values = [
                         int(pixel_comp * 255)
@@ -365,7 +548,14 @@ class Plot_events(Base_img):
                     dpg.set_item_label(items.buttons.bchannel,
                                        f" B:{pixel_values[2]:>3}")
 
-                    yuv_pixels = RGBtoYUV(pixel_values, components_n)
+                    color_format = determine_color_format(
+                        Base_img.color_format)
+                    if color_format.pixel_format in YUV_FORMATS:
+                        yuv_pixels = RGBtoYUV(pixel_values, components_n,
+                                              color_format.yuv_matrix,
+                                              color_format.yuv_range)
+                    else:
+                        yuv_pixels = RGBtoYUV(pixel_values, components_n)
                     dpg.set_item_label(items.buttons.ychannel,
                                        f" Y:{yuv_pixels[0]:>3}")
                     dpg.set_item_label(items.buttons.uchannel,
@@ -373,9 +563,9 @@ class Plot_events(Base_img):
                     dpg.set_item_label(items.buttons.vchannel,
                                        f" V:{yuv_pixels[2]:>3}")
                     first_index = (int(plot_mouse_x) +
-                                   row * Base_img.img.width)
+                                   row * Base_img.frame.width)
                     components = list(
-                        get_pixel_raw_components(Base_img.img, row,
+                        get_pixel_raw_components(Base_img.frame, row,
                                                  int(plot_mouse_x),
                                                  first_index))
                     bytes_in_components = "Bytes in components " + str(
@@ -425,7 +615,7 @@ class Plot_events(Base_img):
 
         start_x, start_y = Base_img.mouse_down_pos
         plot_mouse_x, plot_mouse_y = (int(x) for x in dpg.get_plot_mouse_pos())
-        img_x, img_y = Base_img.img.width, Base_img.img.height
+        img_x, img_y = Base_img.frame.width, Base_img.frame.height
         x_resolution, y_resolution = 0, 0
 
         if start_x >= img_x:
@@ -606,8 +796,81 @@ class Hexviewer_events(Base_img):
                              parent=items.windows.hex_mode)
 
 
-class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
-    """Events general purpose and inherited from Hexviewer_events, Plot_events"""
+class Overview_events(Base_img):
+    """Events associated with overview map of the data"""
+    #overview - statistics of the whole data, detail - of the zoomed in range
+    overview = None
+    detail = None
+    overview_limits = None
+
+    def __init__(self):
+        pass
+
+    def refresh_overview(self):
+        if Base_img.data_buffer is None:
+            return
+        if self.overview is None or self.overview.data_buffer is not Base_img.data_buffer \
+                or self.overview.size != len(Base_img.data_buffer):
+            self.create_overview()
+        if self.overview.updated:
+            self.show_overview(self.overview, items.overview.coarse_texture,
+                               items.overview.coarse_series)
+        if self.detail is not None and self.detail.updated:
+            self.show_overview(self.detail, items.overview.detail_texture,
+                               items.overview.detail_series)
+
+        #Refine the zoomed in range once the axis limits stop changing
+        limits = dpg.get_axis_limits(items.overview.yaxis)
+        if limits == self.overview_limits:
+            start = int(min(max(-limits[1], 0), self.overview.size))
+            end = int(min(max(-limits[0], 0), self.overview.size))
+            if 0 < end - start < self.overview.size / 2 and (
+                    self.detail is None or start < self.detail.start
+                    or self.detail.end < end
+                    or self.detail.end - self.detail.start > 2 *
+                (end - start)):
+                if self.detail is not None:
+                    self.detail.cancel()
+                self.detail = Overview(Base_img.data_buffer, start, end)
+                self.detail.build()
+        self.overview_limits = limits
+
+        if dpg.is_item_hovered(items.overview.plot):
+            offset = int(-dpg.get_plot_mouse_pos()[1])
+            description = self.detail.describe(
+                offset) if self.detail is not None else None
+            dpg.set_value(items.overview.description, description
+                          or self.overview.describe(offset) or "")
+
+    def create_overview(self):
+        for overview in [self.overview, self.detail]:
+            if overview is not None:
+                overview.cancel()
+        self.detail = None
+        dpg.hide_item(items.overview.detail_series)
+        self.overview = Overview(Base_img.data_buffer)
+        self.overview.build()
+        self.show_overview(self.overview, items.overview.coarse_texture,
+                           items.overview.coarse_series)
+        dpg.fit_axis_data(items.overview.xaxis)
+        dpg.fit_axis_data(items.overview.yaxis)
+
+    def show_overview(self, overview, texture, series):
+        """Uploads overview's texture, offsets are shown downwards as negative values"""
+        overview.updated = False
+        dpg.set_value(texture, overview.texture.ravel())
+        start, end = overview.extent()
+        dpg.configure_item(series,
+                           bounds_min=[0, -end],
+                           bounds_max=[2, -start],
+                           show=True)
+
+
+class Events(Plot_events,
+             Hexviewer_events,
+             Overview_events,
+             metaclass=meta_events):
+    """Events general purpose and inherited from Hexviewer_events, Plot_events, Overview_events"""
 
     def __init__(self, args):
         Plot_events.__init__(self, args["software_rendering"])
@@ -623,15 +886,18 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
                 self._set_color_format(args["color_format"])
             Base_img.height = args["height"]
             Base_img.img = load_image(Base_img.path_to_File)
+            frame, n_frames = first_frame(Base_img.img)
             if args["color_format"] == "unknown":
-                predictions, endianness = classify_all(Base_img.img)
+                predictions, endianness, _ = classify_ranked(
+                    frame, args["width"])
                 args["color_format"] = predictions[0]
                 list_of_formats = predictions + [
                     fmt for fmt in option_list if fmt not in predictions
                 ]
                 Base_img.endianness = endianness
             else:
-                predictions, endianness = classify_all(Base_img.img)
+                predictions, endianness, _ = classify_ranked(
+                    frame, args["width"])
                 list_of_formats = [args["color_format"]] + [
                     fmt for fmt in predictions if fmt != args["color_format"]
                 ] + [
@@ -640,16 +906,19 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
                 ]
                 Base_img.endianness = str(AVAILABLE_FORMATS[
                     args["color_format"]].endianness).split('.')[1]
-            resolutions = predict_resolution(Base_img.img,
-                                             args["color_format"])
+            resolutions = predict_resolution(frame, args["color_format"])
             if args["width"] == 0:
                 args["width"] = resolutions[0][0]
+                if n_frames > 1 and args["height"] == 0:
+                    args["height"] = resolutions[0][1]
             else:
                 resolutions = [[args["width"], args["height"]]] + resolutions
             Base_img.width = args["width"]
             Base_img.height = args["height"]
+            if "stride" in args and args["stride"]:
+                Base_img.stride = args["stride"]
             Base_img.list_of_resolutions = resolutions
-            Base_img.data_buffer = Base_img.img.data_buffer
+            Plot_events.set_data_buffer(self, Base_img.img.data_buffer)
         else:
             args["color_format"] = "RGB24"
             list_of_formats = [args["color_format"]] + [
@@ -661,6 +930,8 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
             elif args["endianness"] == "little":
                 Base_img.endianness = str(
                     Endianness.LITTLE_ENDIAN).split('.')[1]
+        if "demosaic" in args and args["demosaic"] in DEMOSAIC_METHODS:
+            Base_img.demosaic = args["demosaic"]
         Base_img.color_format = args["color_format"]
         Base_img.list_of_formats = list_of_formats
         self.camera_ctrls = None
@@ -686,7 +957,8 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
             path = list_of_paths[0]
             Base_img.path_to_File = path
             Base_img.img = load_image(Base_img.path_to_File)
-            predictions, endianness = classify_all(Base_img.img)
+            frame, n_frames = first_frame(Base_img.img)
+            predictions, endianness, _ = classify_ranked(frame)
             if Base_img.file_dialog_color_format:
                 Base_img.color_format = Base_img.file_dialog_color_format
             else:
@@ -698,14 +970,17 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
                 dpg.configure_item(items.buttons.combo, items=list_of_formats)
                 Base_img.list_of_formats = list_of_formats
             self.change_endianness(0, endianness)
+            Base_img.height = Base_img.file_dialog_height or 0
+            Base_img.stride = 0
             if Base_img.file_dialog_width:
                 Base_img.width = Base_img.file_dialog_width
             else:
                 Base_img.list_of_resolutions = predict_resolution(
-                    Base_img.img, Base_img.color_format)
+                    frame, Base_img.color_format)
                 Base_img.width = Base_img.list_of_resolutions[0][0]
-            Base_img.height = Base_img.file_dialog_height or 0
-            Base_img.data_buffer = Base_img.img.data_buffer
+                if n_frames > 1 and Base_img.height == 0:
+                    Base_img.height = Base_img.list_of_resolutions[0][1]
+            Plot_events.set_data_buffer(self, Base_img.img.data_buffer)
             Plot_events.update_image(self, fit_image=True)
             dpg.enable_item(items.menu_bar.export_tab)
 
@@ -717,6 +992,42 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
         dpg.set_value(items.buttons.file_dialog_height, 0)
         dpg.set_value(items.buttons.file_dialog_color_format, "")
 
+    @Plot_events.indicate_loading
+    @Plot_events.error_handling
+    def find_images(self, callback_id, data):
+        with Base_img.image_mutex:
+            if Base_img.path_to_File is None or not Path(
+                    Base_img.path_to_File).is_file():
+                return
+            Base_img.image_regions = scan_file(Base_img.path_to_File)
+            candidates = [
+                f"{region['offset']} B: {region['format']}, width {region['width']}"
+                for region in Base_img.image_regions
+            ]
+            dpg.configure_item(items.buttons.image_regions, items=candidates)
+            dpg.set_value(items.buttons.image_regions,
+                          candidates[0] if candidates else "No images found")
+
+    @Plot_events.update_hexdump
+    @Plot_events.indicate_loading
+    @Plot_events.error_handling
+    def jump_to_image(self, callback_id, data):
+        offset = int(data.split(" ")[0])
+        region = next(region for region in Base_img.image_regions
+                      if region["offset"] == offset)
+        with Base_img.image_mutex:
+            dump = np.memmap(Base_img.path_to_File, dtype=np.uint8, mode='r')
+            Base_img.img = Image(
+                bytearray(dump[offset:offset + region["size"]]))
+            Plot_events.set_data_buffer(self, Base_img.img.data_buffer)
+            self._set_color_format(region["format"])
+            Base_img.endianness = region["endianness"]
+            Base_img.width = region["width"]
+            Base_img.height = 0
+            Base_img.stride = 0
+            Plot_events.update_image(self, fit_image=True)
+            dpg.enable_item(items.menu_bar.export_tab)
+
     @Plot_events.update_hexdump
     @Plot_events.indicate_loading
     def load_img_from_camera(self, callback_id, data):
@@ -748,7 +1059,7 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
             Base_img.path_to_File = cam.path
 
             Base_img.img = load_from_camera(cam, num_of_frames)
-            Base_img.data_buffer = Base_img.img.data_buffer
+            Plot_events.set_data_buffer(self, Base_img.img.data_buffer)
 
             Plot_events.update_image(self, fit_image=True)
             dpg.enable_item(items.menu_bar.export_tab)
@@ -843,6 +1154,9 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
                 break
             with Base_img.image_mutex:
                 Base_img.img = Image(frame)
+                #transforms of the first frame apply to every streamed frame
+                Base_img.buffer = TransformedBuffer(frame,
+                                                    Base_img.buffer.transforms)
             self.frame_ready_event.set()
 
     def refresh_frame(self):
@@ -855,7 +1169,7 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
     def file_save(self, callback_id, data):
         path = data["file_path_name"]
         if Base_img.img != None:
-            save_image_as_file(Base_img.img_postchanneled, path)
+            save_image_as_file(Plot_events.get_full_resolution(self), path)
 
     def export_raw_buffer(self, callback_id, data, user_data):
         path = data["file_path_name"]
@@ -879,6 +1193,19 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
                 Base_img.height = data
                 Plot_events.update_image(self, fit_image=True)
 
+    def update_frame(self, callback_id, data):
+        with Base_img.image_mutex:
+            if Base_img.img != None:
+                Base_img.frame_index = data
+                Plot_events.update_image(self, fit_image=False, reparse=False)
+
+    @Plot_events.error_handling
+    def update_stride(self, callback_id, data):
+        with Base_img.image_mutex:
+            if Base_img.img != None:
+                Base_img.stride = data
+                Plot_events.update_image(self, fit_image=True)
+
     def change_resolution(self, callback_id, data):
         idx = -1
         i = 0
@@ -916,15 +1243,24 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
         AVAILABLE_FORMATS[Base_img.color_format].endianness = Endianness[data]
         Base_img.endianness = data
         if Base_img.img != None:
-            Plot_events.update_image(self, fit_image=True)
+            #an image already parsed in the current format only swaps the cached values
+            parsed = Base_img.img.color_format is determine_color_format(
+                Base_img.color_format)
+            if parsed and Base_img.img.byte_order_views:
+                Base_img.img = change_endianness(Base_img.img,
+                                                 Endianness[data],
+                                                 Base_img.stride)
+                Plot_events.update_image(self, fit_image=True, reparse=False)
+            else:
+                Plot_events.update_image(self, fit_image=True)
 
     def export_as_image(self, callback_id, data):
         path = data["file_path_name"]
         if Base_img.img != None:
             save_image_as_file(
-                Base_img.img_postchanneled[
-                    Base_img.up_row:Base_img.down_row,
-                    Base_img.left_column:Base_img.right_column], path)
+                Plot_events.get_full_resolution(self)
+                [Base_img.up_row:Base_img.down_row,
+                 Base_img.left_column:Base_img.right_column], path)
 
     def export_raw_selection(self, callback_id, data):
         path = data["file_path_name"]
@@ -932,7 +1268,7 @@ class Events(Plot_events, Hexviewer_events, metaclass=meta_events):
         if Base_img.img != None:
             with open(path, "wb") as f:
                 return_data = np.array(
-                    crop_image2rawformat(Base_img.img, Base_img.up_row,
+                    crop_image2rawformat(Base_img.frame, Base_img.up_row,
                                          Base_img.down_row,
                                          Base_img.left_column,
                                          Base_img.right_column))
@@ -0,0 +1,92 @@
+"""Overview map of the data displayed next to the plot and the hexdump."""
+
+import threading
+import numpy as np
+import cv2 as cv
+
+from ..format_recognition.scan import overview_statistics, overview_block_size
+
+
+class Overview:
+    """Entropy and mean byte value of blocks of a range of data.
+
+    Statistics are computed in a background thread, a chunk at a time, and
+    stored as a texture with two columns (entropy and mean value) and one row
+    per block, rows that are not computed yet are transparent.
+    """
+    #blocks - number of blocks (texture rows) the range is divided into
+    blocks = 1024
+    #max_entropy - entropy of uniformly distributed bytes
+    max_entropy = 8
+
+    def __init__(self, data_buffer, start=0, end=None):
+        """Constructs Overview instance.
+        Keyword arguments:
+            data_buffer: binary data to describe
+            start: offset of the first described byte
+            end: offset of the first byte after described range, defaults to the end of data
+        """
+        self.data_buffer = data_buffer
+        self.size = len(data_buffer)
+        self.start = start
+        self.end = self.size if end is None else end
+        self.block_size = overview_block_size(self.start, self.end,
+                                              self.blocks)
+        self.entropy = np.zeros(self.blocks, dtype=np.float32)
+        self.mean = np.zeros(self.blocks, dtype=np.float32)
+        self.texture = np.zeros((self.blocks, 2, 4), dtype=np.float32)
+        self.computed = 0
+        #updated - tells whether texture has changed since it was last displayed
+        self.updated = False
+        self.cancelled = False
+
+    def build(self):
+        threading.Thread(target=self.processed_content, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def processed_content(self):
+        for first, entropy, mean in overview_statistics(
+                self.data_buffer, self.start, self.end, self.blocks):
+            #Stop processing if the data was changed or another range was requested
+            if self.cancelled or len(self.data_buffer) != self.size:
+                return
+            last = first + len(entropy)
+            self.entropy[first:last] = entropy
+            self.mean[first:last] = mean
+            self.texture[first:last] = self.colorize(entropy, mean)
+            self.computed = last
+            self.updated = True
+
+    def colorize(self, entropy, mean):
+        """Maps entropy to colors and mean byte value to shades of gray
+
+        Returns: array of RGBA pixels of shape (number of blocks, 2, 4)
+        """
+        levels = np.clip(entropy * (255 / self.max_entropy), 0,
+                         255).astype(np.uint8)
+        colors = cv.applyColorMap(levels.reshape(-1, 1), cv.COLORMAP_VIRIDIS)
+        pixels = np.ones((len(entropy), 2, 4), dtype=np.float32)
+        pixels[:, 0, :3] = colors[:, 0, ::-1] / 255
+        pixels[:, 1, :3] = (mean / 255)[:, None]
+        return pixels
+
+    def extent(self):
+        """Returns: range of offsets covered by the texture"""
+        return self.start, self.start + self.blocks * self.block_size
+
+    def describe(self, offset):
+        """Describes the block containing given offset
+
+        Returns: text with the block's range and statistics or None if it is not computed
+        """
+        if not self.start <= offset < self.end:
+            return None
+        index = (offset - self.start) // self.block_size
+        if index >= self.computed:
+            return None
+        begin = self.start + index * self.block_size
+        return "{:#08x} - {:#08x}\nEntropy: {:.2f}\nMean: {:.1f}".format(
+            begin, min(begin + self.block_size, self.end), self.entropy[index],
+            self.mean[index])
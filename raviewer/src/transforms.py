@@ -0,0 +1,179 @@
+"""Transforms of raw data (e.g. alignment) resolved lazily over the original buffer."""
+
+import numpy as np
+
+
+def reverse_groups(data_buffer, group):
+    """Reverses the order of bytes in consecutive groups, the last group may be shorter
+    Keyword arguments:
+        data_buffer: bytes-like object
+        group: number of bytes in a group
+    Returns: bytearray with reversed groups
+    """
+    data = np.frombuffer(data_buffer, dtype=np.uint8)
+    result = bytearray(len(data))
+    out = np.frombuffer(result, dtype=np.uint8)
+    whole = len(data) - len(data) % group
+    out[:whole].reshape(-1, group)[:] = data[:whole].reshape(-1,
+                                                             group)[:, ::-1]
+    out[whole:] = data[whole:][::-1]
+    return result
+
+
+class Align:
+    """Inserts bytes of a value at (positive count), or skips bytes from (negative count), the beginning of every frame."""
+
+    def __init__(self, count, value=0, n_frames=1):
+        """Constructs Align instance.
+        Keyword arguments:
+            count: number of inserted bytes if positive, number of skipped bytes if negative
+            value: value of inserted bytes
+            n_frames: number of frames of equal size the data is split into
+        """
+        self.count = count
+        self.value = value
+        self.n_frames = n_frames
+
+    def shift(self, prefix, start):
+        """Applies the transform to data represented as prefix + original[start:], without touching the original
+        Keyword arguments:
+            prefix: bytes inserted before the original data
+            start: offset of the first used byte of the original data
+        Returns: tuple of new prefix and start
+        """
+        if self.count >= 0:
+            return bytes([self.value]) * self.count + prefix, start
+        skipped = min(-self.count, len(prefix))
+        return prefix[skipped:], start - self.count - skipped
+
+    def apply(self, data_buffer):
+        """Provides transformed data, a view of data_buffer if bytes are only skipped from the whole data"""
+        if self.n_frames == 1:
+            prefix, start = self.shift(b"", 0)
+            return join(prefix, data_buffer, start)
+        frames = np.array_split(np.frombuffer(data_buffer, dtype=np.uint8),
+                                self.n_frames)
+        if self.count >= 0:
+            inserted = np.full(self.count, self.value, dtype=np.uint8)
+            frames = [part for frame in frames for part in (inserted, frame)]
+        else:
+            frames = [frame[-self.count:] for frame in frames]
+        return bytearray(np.concatenate(frames).tobytes())
+
+
+class Reverse:
+    """Reverses the order of bytes in groups."""
+
+    def __init__(self, group):
+        """Constructs Reverse instance.
+        Keyword arguments:
+            group: number of bytes in a group, data is not changed if less than 2
+        """
+        self.group = group
+
+    def apply(self, data_buffer):
+        """Provides transformed data"""
+        if self.group < 2:
+            return data_buffer
+        return reverse_groups(data_buffer, self.group)
+
+
+def join(prefix, data_buffer, start):
+    """Provides prefix + data_buffer[start:], a view of data_buffer if prefix is empty"""
+    view = memoryview(data_buffer)[min(start, len(data_buffer)):]
+    if len(prefix) == 0:
+        return view
+    return b"".join([prefix, view])
+
+
+def resolve(data_buffer, transforms):
+    """Applies transforms to data in order
+    Alignments of the whole data following each other are folded into an
+    offset of the original data and inserted bytes, so that the data is
+    copied at most once for them and not at all if bytes are only skipped.
+    Keyword arguments:
+        data_buffer: bytes-like object
+        transforms: list of transforms (e.g. Align, Reverse)
+    Returns: bytes-like object with transformed data
+    """
+    prefix, start = b"", 0
+    for transform in transforms:
+        if isinstance(transform, Align) and transform.n_frames == 1:
+            prefix, start = transform.shift(prefix, start)
+        else:
+            data_buffer = transform.apply(join(prefix, data_buffer, start))
+            prefix, start = b"", 0
+    return join(prefix, data_buffer, start)
+
+
+class TransformedBuffer:
+    """Original raw data with a list of transforms, resolved when the data is needed.
+
+    The original data is never modified, so undoing a transform only drops
+    it from the list, and data resolved to a view of the original is kept
+    for every step to be reused after undoing later transforms.
+    """
+
+    def __init__(self, data_buffer, transforms=()):
+        """Constructs TransformedBuffer instance.
+        Keyword arguments:
+            data_buffer: original bytes-like object
+            transforms: initial list of transforms
+        """
+        self.original = data_buffer
+        self.transforms = []
+        #resolved - data resolved for every number of applied transforms, None if not resolved yet
+        self.resolved = [data_buffer]
+        for transform in transforms:
+            self.push(transform)
+
+    def push(self, transform):
+        """Appends a transform"""
+        self.transforms.append(transform)
+        #copies are dropped, views of the original data cost nothing to keep
+        self.resolved = [
+            data if data is self.original or isinstance(data, memoryview)
+            and data.obj is self.original else None for data in self.resolved
+        ]
+        self.resolved.append(None)
+
+    def replace(self, transform):
+        """Replaces the transform of the same type in its place, or appends the transform if there is none"""
+        for i, previous in enumerate(self.transforms):
+            if type(previous) is type(transform):
+                following = self.transforms[i + 1:]
+                #data resolved before the replaced transform stays valid
+                del self.transforms[i:]
+                del self.resolved[i + 1:]
+                for t in [transform] + following:
+                    self.push(t)
+                return
+        self.push(transform)
+
+    def undo(self):
+        """Drops the last transform
+        Returns: dropped transform or None if there are no transforms
+        """
+        if len(self.transforms) == 0:
+            return None
+        self.resolved.pop()
+        return self.transforms.pop()
+
+    @property
+    def data(self):
+        """Transformed data"""
+        if self.resolved[-1] is None:
+            self.resolved[-1] = resolve(self.original, self.transforms)
+        return self.resolved[-1]
+
+    @property
+    def reverse_bytes(self):
+        """Number of bytes in reversed groups, 1 if bytes are not reversed"""
+        return next((transform.group for transform in self.transforms
+                     if isinstance(transform, Reverse)), 1)
+
+    @property
+    def offset(self):
+        """Number of bytes inserted at (positive) or skipped from (negative) the beginning of the data or frames"""
+        return sum(transform.count for transform in self.transforms
+                   if isinstance(transform, Align))
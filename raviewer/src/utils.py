@@ -2,24 +2,34 @@
 import numpy as np
 import os
 import cv2
-from ..image.color_format import AVAILABLE_FORMATS
+from ..image.color_format import (AVAILABLE_FORMATS, YUVMatrix, YUVRange,
+                                  LUMA_WEIGHTS)
 """Convert RGB to YUV format values."""
 
 
-def RGBtoYUV(rgb_format, components_n):
-    #The CCIR 601 Standard (now ITU-R 601)
-    """Conversion formula
-    Y = R *  .299000 + G *  .587000 + B *  .114000
-    U = R * -.168736 + G * -.331264 + B *  .500000 + 128
-    V = R *  .500000 + G * -.418688 + B * -.081312 + 128
+def RGBtoYUV(rgb_format,
+             components_n,
+             matrix=YUVMatrix.BT601,
+             yuv_range=YUVRange.FULL):
+    #The CCIR 601 Standard (now ITU-R 601) by default
+    """Conversion formula, with Kr and Kb weights of the matrix (0.299 and 0.114 for BT.601)
+    Y = R * Kr + G * (1 - Kr - Kb) + B * Kb
+    U = (B - Y) / (1 - Kb) / 2 + 128
+    V = (R - Y) / (1 - Kr) / 2 + 128
+    In limited range Y is scaled to 16-235 and U, V to 16-240.
     """
     if components_n == 4:
         rgb_format.pop()
-    sub_rgb = np.array([[0.29900, -0.168736, 0.50000],
-                        [0.58700, -0.331264, -0.418688],
-                        [0.11400, 0.50000, -0.08132]])
+    kr, kb = LUMA_WEIGHTS[matrix]
+    kg = 1 - kr - kb
+    sub_rgb = np.array([[kr, -kr / (1 - kb) / 2, 0.5],
+                        [kg, -kg / (1 - kb) / 2, -kg / (1 - kr) / 2],
+                        [kb, 0.5, -kb / (1 - kr) / 2]])
     #Matrix formula: rows X columns
     sub_yuv = np.dot(rgb_format, sub_rgb)
+    if yuv_range == YUVRange.LIMITED:
+        sub_yuv = sub_yuv * np.array([219, 224, 224]) / 255
+        sub_yuv[0] += 16.0
     sub_yuv[1:] += 128.0
     yuv_float = sub_yuv.clip(0, 255)
     yuv_int = [int(i) for i in yuv_float]
@@ -54,8 +64,10 @@ def determine_color_format(format_string):
 
 def pad_modulo(im, dims):
     """Pads the np.array and makes each dimension divisible by corresponding
-    factor."""
+    factor. The array is returned without copying if it needs no padding."""
     to_pad = [(0,
                dim_mod - dim % dim_mod) if dim % dim_mod and dim_mod != -1 else
               (0, 0) for dim_mod, dim in zip(dims, im.shape)]
+    if not any(after for _, after in to_pad):
+        return im
     return np.pad(im, pad_width=to_pad, constant_values=0)
@@ -29,6 +29,9 @@ setup(
         'pytest',
         'pyrav4l2 @ git+https://github.com/antmicro/pyrav4l2.git'
     ],
+    extras_require={
+        'jit': ['numba'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache Software License",
@@ -0,0 +1,40 @@
+"""Tests for batch format detection"""
+import os
+import json
+
+from raviewer.format_recognition.batch import collect_files, detect_file, detect_files
+
+RESOURCES = os.path.join(os.path.dirname(__file__), "../resources")
+
+
+def test_collect_files():
+    files = collect_files([os.path.join(RESOURCES, "test_reference")])
+    assert len(files) > 0
+    assert files == sorted(files)
+    assert all(os.path.isfile(f) for f in files)
+
+
+def test_detect_file():
+    report = detect_file(os.path.join(RESOURCES, "RGBA32_1000_750"))
+    assert report["formats"][0] == "RGBA32"
+    assert 0 < report["confidence"] <= 1
+    assert report["endianness"] == "BIG_ENDIAN"
+    assert [1000, 750] in report["resolutions"]
+    assert report["frames"] == 1
+    assert report["frame_size"] == 3000000
+    assert set(report["time"].keys()) == {"frames", "format", "resolution"}
+    json.dumps(report)
+
+
+def test_detect_missing_file():
+    report = detect_file("not_real_path")
+    assert "error" in report
+
+
+def test_detect_files_order():
+    paths = [
+        os.path.join(RESOURCES, "GRAY_1000_750"),
+        os.path.join(RESOURCES, "RGB24_1000_750")
+    ]
+    reports = list(detect_files(paths, jobs=2))
+    assert [r["file"] for r in reports] == paths
@@ -1,4 +1,5 @@
 from raviewer.parser.bayer import ParserBayerRG
+from raviewer.src.core import parse_image, get_displayable, get_pixel_raw_components
 import unittest
 import numpy
 from unittest.mock import (Mock, patch)
@@ -54,3 +55,79 @@ class TestBayerParserClass(unittest.TestCase):
         Too complicated algorithm.
         """
         pass
+
+    def test_tegra_alignment(self):
+
+        values = numpy.random.default_rng(0).integers(0,
+                                                      1 << 10,
+                                                      64,
+                                                      dtype=numpy.uint16)
+        reference = parse_image(values.astype('>u2').tobytes(), "RG10", 8)
+        for fmt, shift in [("RG10 (Jetson TX2)", 4),
+                           ("RG10 (Jetson Xavier)", 6)]:
+            img = parse_image((values << shift).astype('<u2').tobytes(), fmt,
+                              8)
+            self.assertTrue(
+                (get_displayable(img) == get_displayable(reference)).all())
+            self.assertTrue((get_pixel_raw_components(img, 0, 0,
+                                                      0) == values[:3]).all())
+
+    def test_non_debayerized_display(self):
+
+        im = numpy.arange(15, dtype=numpy.uint8).reshape(3, 5) * 10
+        cmap = numpy.array([(1., 0., 0.), (0., 1., 0.), (0., 1., 0.),
+                            (0., 0., 0.5)]).reshape(1, 4, 3)
+        out = ParserBayerRG._non_debayerized_display(im, cmap)
+        self.assertEqual(out.shape, (3, 5, 3))
+        self.assertEqual(out.dtype, numpy.uint8)
+        for row in range(3):
+            for column in range(5):
+                color = cmap[0, row % 2 * 2 + column % 2]
+                self.assertTrue((out[row,
+                                     column] == (im[row, column] *
+                                                 color).astype('uint8')).all())
+
+    def test_superpixel_display(self):
+
+        values = numpy.random.default_rng(0).integers(0,
+                                                      256, (7, 9),
+                                                      dtype=numpy.uint8)
+        cells = values[:6, :8].reshape(3, 2, 4, 2).transpose(0, 2, 1, 3)
+        cells = cells.reshape(3, 4, 4).astype(int)
+        for fmt in ["RGGB", "BGGR", "GBRG", "GRBG"]:
+            img = parse_image(values.tobytes(), fmt, 9)
+            preview = get_displayable(img, preview=True)
+            self.assertEqual(preview.shape, (3, 4, 3))
+            self.assertTrue((preview[..., 0] == cells[...,
+                                                      fmt.index('R')]).all())
+            self.assertTrue(
+                (preview[..., 1] == (cells[..., fmt.index('G')] +
+                                     cells[..., fmt.rindex('G')]) // 2).all())
+            self.assertTrue((preview[..., 2] == cells[...,
+                                                      fmt.index('B')]).all())
+
+        preview = get_displayable(img,
+                                  channels={
+                                      "r_y": True,
+                                      "g_u": False,
+                                      "b_v": True
+                                  },
+                                  preview=True)
+        self.assertTrue((preview[..., 1] == 0).all())
+        self.assertTrue((preview[..., 0] == cells[..., 1]).all())
+
+    def test_demosaic_methods(self):
+
+        values = numpy.random.default_rng(0).integers(0,
+                                                      256, (8, 10),
+                                                      dtype=numpy.uint8)
+        img = parse_image(values.tobytes(), "RGGB", 10)
+        bilinear = get_displayable(img)
+        self.assertTrue(
+            (get_displayable(img, demosaic="bilinear") == bilinear).all())
+        for method in ["vng", "ea"]:
+            displayable = get_displayable(img, demosaic=method)
+            self.assertEqual(displayable.shape, bilinear.shape)
+            self.assertFalse((displayable == bilinear).all())
+        with self.assertRaises(ValueError):
+            get_displayable(img, demosaic="nearest")
@@ -0,0 +1,57 @@
+"""Tests for reinterpreting parsed images in the other byte order"""
+import numpy
+import pytest
+
+from raviewer.src.core import parse_image, change_endianness, get_displayable
+from raviewer.image.color_format import AVAILABLE_FORMATS, Endianness
+
+FORMATS = [
+    "GRAY", "GRAY10", "GRAY12", "RG10", "RG12", "RG16", "RG10 (Jetson TX2)",
+    "RG12 (Jetson Xavier)", "RGB24", "RGB565", "RGBA444", "ABGR555", "RGB332",
+    "NV12", "YUY2"
+]
+
+
+@pytest.fixture
+def data():
+    return numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                64 * 48 * 4,
+                                                dtype=numpy.uint8).tobytes()
+
+
+def parse(data, fmt, endianness, stride=0):
+    original = AVAILABLE_FORMATS[fmt].endianness
+    AVAILABLE_FORMATS[fmt].endianness = endianness
+    try:
+        return parse_image(data, fmt, 64, stride=stride)
+    finally:
+        AVAILABLE_FORMATS[fmt].endianness = original
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+@pytest.mark.parametrize('stride', [0, 256])
+def test_change_endianness(data, fmt, stride):
+    little = parse(data, fmt, Endianness.LITTLE_ENDIAN, stride)
+    big = parse(data, fmt, Endianness.BIG_ENDIAN, stride)
+    assert little.processed_data.dtype.isnative
+    assert big.processed_data.dtype.isnative
+
+    swapped = change_endianness(little, Endianness.BIG_ENDIAN, stride)
+    assert numpy.array_equal(swapped.processed_data, big.processed_data)
+    assert (swapped.width, swapped.height) == (big.width, big.height)
+    assert numpy.array_equal(get_displayable(swapped), get_displayable(big))
+
+    restored = change_endianness(swapped, Endianness.LITTLE_ENDIAN, stride)
+    assert numpy.array_equal(restored.processed_data, little.processed_data)
+
+
+def test_change_endianness_reuses_views(data):
+    img = parse(data, "GRAY10", Endianness.BIG_ENDIAN)
+    swapped = change_endianness(img, Endianness.LITTLE_ENDIAN)
+    views = dict(swapped.byte_order_views)
+    assert set(views.keys()) == set(Endianness)
+    restored = change_endianness(swapped, Endianness.BIG_ENDIAN)
+    assert restored.byte_order_views[Endianness.BIG_ENDIAN] is views[
+        Endianness.BIG_ENDIAN]
+    assert numpy.array_equal(restored.processed_data, img.processed_data)
@@ -0,0 +1,62 @@
+"""Tests for estimating endianness from sampled blocks"""
+import numpy
+import pytest
+
+from raviewer.format_recognition.detect import estimate_endianness, sample_blocks
+from raviewer.image.image import Image
+from .utils import resource_image
+
+
+def swap_bytes(img):
+    data = numpy.frombuffer(img.data_buffer, dtype=numpy.uint8)
+    return Image(data.reshape(-1, 2)[:, ::-1].tobytes())
+
+
+@pytest.mark.parametrize('fmt', [
+    "GRAY10", "GRAY12", "RG10", "RG12", "RGB565", "RGBA444", "ARGB444",
+    "BGRA555", "ABGR555"
+])
+def test_estimate_endianness(fmt):
+    img = resource_image(fmt, 1000, 750)
+    endianness, confidence = estimate_endianness(img, fmt)
+    expected = "BIG_ENDIAN" if fmt[-2:] in ["10", "12"] else "LITTLE_ENDIAN"
+    assert endianness == expected
+    assert 0.5 < confidence <= 1
+    swapped, swapped_confidence = estimate_endianness(swap_bytes(img), fmt)
+    assert swapped != endianness
+    assert swapped_confidence == confidence
+
+
+@pytest.mark.parametrize('fmt', ["GRAY10", "RGB565"])
+def test_estimate_endianness_without_format(fmt):
+    img = resource_image(fmt, 1000, 750)
+    assert estimate_endianness(img)[0] == estimate_endianness(img, fmt)[0]
+
+
+@pytest.mark.parametrize('fmt', ["GRAY", "RGB24", "NV12", "RGGB"])
+def test_endianness_irrelevant(fmt):
+    endianness, confidence = estimate_endianness(
+        resource_image(fmt, 1000, 750), fmt)
+    assert (endianness, confidence) == ("BIG_ENDIAN", 1.0)
+
+
+def test_estimate_endianness_of_noise():
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                1 << 22,
+                                                dtype=numpy.uint8)
+    _, confidence = estimate_endianness(Image(data.tobytes()), "RGB565")
+    assert confidence < 0.5
+    assert estimate_endianness(Image(bytes(3)),
+                               "RGB565") == ("LITTLE_ENDIAN", 0.0)
+
+
+def test_sample_blocks():
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                200000,
+                                                dtype=numpy.uint8)
+    blocks = sample_blocks(data, 1 << 20, 4096)
+    assert blocks.shape == (len(data) // 4096, 4096)
+    assert numpy.array_equal(blocks[0], data[:4096])
+    assert numpy.array_equal(blocks[-1], data[-4096:])
@@ -0,0 +1,60 @@
+"""Tests for frame size detection of multi-frame dumps"""
+import numpy
+import pytest
+
+from raviewer.image.image import Image
+from raviewer.format_recognition.frames import find_frames, first_frame
+from raviewer.format_recognition.detect import classify_all, predict_resolution
+from .utils import resource_image
+
+FORMATS = ["RGB24", "RGBA444", "GRAY10", "RGGB", "YUY2", "NV12", "I422"]
+
+
+def make_recording(fmt, n_frames, width=1000, height=750):
+    """Stacks noisy copies of a resource image"""
+    rng = numpy.random.default_rng(0)
+    frame = numpy.frombuffer(resource_image(fmt, width, height).data_buffer,
+                             dtype=numpy.uint8)
+    frames = [
+        numpy.clip(frame + rng.integers(-5, 6, len(frame)), 0,
+                   255).astype(numpy.uint8) for _ in range(n_frames)
+    ]
+    return Image(bytearray(numpy.concatenate(frames).tobytes())), len(frame)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_single_frame(fmt):
+    img = resource_image(fmt, 1000, 750)
+    assert find_frames(img) == (len(img.data_buffer), 1)
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+@pytest.mark.parametrize('n_frames', [2, 5])
+def test_find_frames(fmt, n_frames):
+    img, frame_size = make_recording(fmt, n_frames)
+    assert find_frames(img) == (frame_size, n_frames)
+
+    img, frame_size = make_recording(fmt, n_frames + 1)
+    img.data_buffer = img.data_buffer[:-frame_size // 3]
+    assert find_frames(img) == (frame_size, n_frames)
+
+
+def test_many_small_frames():
+    yuy2 = numpy.frombuffer(resource_image("YUY2", 1000, 750).data_buffer,
+                            dtype=numpy.uint8).reshape(750, 2000)
+    frame = numpy.ascontiguousarray(yuy2[:120, :320])
+    img = Image(bytearray(numpy.tile(frame.ravel(), 300).tobytes()))
+    assert find_frames(img) == (frame.size, 300)
+
+
+def test_first_frame():
+    img, frame_size = make_recording("YUY2", 4)
+    frame, n_frames = first_frame(img)
+    assert n_frames == 4
+    assert frame.data_buffer == img.data_buffer[:frame_size]
+    formats, _ = classify_all(frame)
+    assert "YUY2" in formats
+    assert [1000, 750] in predict_resolution(frame, formats[0])
+
+    img = resource_image("YUY2", 1000, 750)
+    assert first_frame(img) == (img, 1)
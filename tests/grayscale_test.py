@@ -1,4 +1,5 @@
 from raviewer.parser.grayscale import ParserGrayscale
+from raviewer.parser.common import display_lut
 import unittest
 import numpy
 from unittest.mock import (Mock, patch)
@@ -87,3 +88,22 @@ class TestGrayscaleParserClass(unittest.TestCase):
             displayable.shape,
             (self.GRAY12_IMAGE.height, self.GRAY12_IMAGE.width, 3))
         self.assertTrue((displayable == numpy.array([[[15, 15, 15]]])).all())
+
+    def test_get_displayable_gamma(self):
+
+        self.GRAY12_IMAGE.processed_data = numpy.array([1023])
+        displayable = self.parser.get_displayable(self.GRAY12_IMAGE, gamma=2)
+        self.assertTrue((displayable == numpy.array([[[127, 127,
+                                                       127]]])).all())
+
+    def test_display_lut(self):
+
+        lut = display_lut(10, shift=4)
+        self.assertEqual(lut.shape, (1 << 14, ))
+        self.assertEqual((lut[0], lut[16 * 1023], lut[-1]), (0, 255, 255))
+        self.assertFalse(lut.flags.writeable)
+        self.assertIs(display_lut(10, shift=4), lut)
+
+        values = numpy.array([[0, 4095], [4096, 65535]], dtype=numpy.uint16)
+        mapped = self.parser.apply_lut(values, display_lut(12))
+        self.assertTrue((mapped == numpy.array([[0, 255], [255, 255]])).all())
@@ -0,0 +1,63 @@
+"""Tests for YUV formats with components wider than 8 bits"""
+import numpy
+import pytest
+
+from raviewer.src.core import (parse_image, get_displayable,
+                               get_pixel_raw_components, crop_image2rawformat)
+from .utils import resource_image
+
+WIDTH, HEIGHT = 1000, 750
+# 8-bit formats with the same layout of samples
+LAYOUTS = {"P010": "NV12", "P016": "NV12", "I010": "I420", "Y210": "YUY2"}
+
+
+def widen(data, fmt):
+    """Converts 8-bit samples to 16-bit little endian words of given format"""
+    samples = data.astype(numpy.uint16)
+    if fmt == "P016":
+        words = samples << 8 | samples
+    else:
+        words = samples << 2 | samples >> 6
+        if fmt != "I010":
+            words <<= 6
+    return words.astype('<u2').tobytes()
+
+
+def images(fmt):
+    data = numpy.frombuffer(resource_image(LAYOUTS[fmt], WIDTH,
+                                           HEIGHT).data_buffer,
+                            dtype=numpy.uint8)
+    img = parse_image(widen(data, fmt), fmt, WIDTH)
+    return img, parse_image(data.tobytes(), LAYOUTS[fmt], WIDTH)
+
+
+@pytest.mark.parametrize('fmt', LAYOUTS.keys())
+def test_get_displayable(fmt):
+    img, reference = images(fmt)
+    assert img.processed_data.dtype == numpy.uint16
+    assert numpy.array_equal(get_displayable(img), get_displayable(reference))
+    channels = {"r_y": True, "g_u": False, "b_v": True}
+    assert numpy.array_equal(get_displayable(img, channels=channels),
+                             get_displayable(reference, channels=channels))
+
+
+@pytest.mark.parametrize('fmt', ["P010", "I010"])
+def test_raw_coloring(fmt):
+    img, reference = images(fmt)
+    assert numpy.array_equal(get_displayable(img, raw=True),
+                             get_displayable(reference, raw=True))
+
+
+@pytest.mark.parametrize('fmt', LAYOUTS.keys())
+def test_full_precision(fmt):
+    img, reference = images(fmt)
+    bits = 16 if fmt == "P016" else 10
+    components = get_pixel_raw_components(img, 10, 20, 10 * WIDTH + 20)
+    expected = get_pixel_raw_components(reference, 10, 20, 10 * WIDTH + 20)
+    assert [int(c) >> (bits - 8) for c in components] == list(expected)
+
+    crop = crop_image2rawformat(img, 10, 20, 30, 40)
+    assert crop.dtype == numpy.uint16
+    assert numpy.array_equal(
+        crop_image2rawformat(reference, 10, 20, 30, 40),
+        numpy.right_shift(crop, 16 - 8 if fmt != "I010" else 2))
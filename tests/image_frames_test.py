@@ -0,0 +1,100 @@
+"""Tests for splitting images of all formats into frames"""
+import numpy
+import pytest
+
+from raviewer.parser.factory import ParserFactory
+from raviewer.src.core import parse_image, get_displayable
+
+WIDTH, HEIGHT, N_FRAMES = 64, 48, 4
+# sizes of pixels in bytes, frames of other formats are tested in yuv_frames_test
+PIXEL_SIZES = {
+    "RGB24": 3,
+    "ABGR32": 4,
+    "RGB332": 1,
+    "RGB565": 2,
+    "YUY2": 2,
+    "Y210": 4,
+    "GRAY": 1,
+    "GRAY12": 2,
+    "RGGB": 1,
+    "GBRG": 1,
+    "RG12": 2
+}
+
+
+def recording(fmt, frame_bytes=None):
+    frame_bytes = frame_bytes or WIDTH * HEIGHT * PIXEL_SIZES[fmt]
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                frame_bytes * N_FRAMES,
+                                                dtype=numpy.uint8).tobytes()
+    frames = [
+        data[i * frame_bytes:(i + 1) * frame_bytes] for i in range(N_FRAMES)
+    ]
+    return parse_image(data, fmt, WIDTH), frames
+
+
+@pytest.mark.parametrize('fmt', PIXEL_SIZES.keys())
+def test_frames_are_views(fmt):
+    img, frames = recording(fmt)
+    assert img.n_frames() == 1
+    assert img.frame(0) is img
+    assert img.n_frames(HEIGHT) == N_FRAMES
+    for frame, data in zip(img.frames(HEIGHT), frames):
+        assert (frame.width, frame.height) == (WIDTH, HEIGHT)
+        assert numpy.shares_memory(frame.processed_data, img.processed_data)
+        expected = parse_image(data, fmt, WIDTH)
+        assert numpy.array_equal(frame.processed_data, expected.processed_data)
+        if expected.packed_pixels is not None:
+            assert numpy.array_equal(frame.packed_pixels,
+                                     expected.packed_pixels)
+
+
+@pytest.mark.parametrize('fmt', PIXEL_SIZES.keys())
+def test_frames(fmt):
+    img, frames = recording(fmt)
+    displayable = get_displayable(img, HEIGHT)
+    expected = [
+        get_displayable(parse_image(data, fmt, WIDTH)) for data in frames
+    ]
+    assert numpy.array_equal(displayable, numpy.concatenate(expected))
+
+
+@pytest.mark.parametrize('fmt', ["RGB24", "RGB565", "YUY2", "RGGB", "GBRG"])
+def test_raw_coloring_frames(fmt):
+    img, frames = recording(fmt)
+    parser = ParserFactory.create_object(img.color_format)
+    colored = parser.raw_coloring(img, HEIGHT)
+    expected = [
+        parser.raw_coloring(parse_image(data, fmt, WIDTH)) for data in frames
+    ]
+    assert numpy.array_equal(colored, numpy.concatenate(expected))
+
+
+def test_odd_frame_height():
+    """Every frame of Bayer data starts with the first line of the pattern"""
+    img, frames = recording("RGGB", WIDTH * (HEIGHT + 1))
+    displayable = get_displayable(img, HEIGHT + 1)
+    assert displayable.shape == ((HEIGHT + 1) * N_FRAMES, WIDTH, 3)
+    first = get_displayable(parse_image(frames[1], "RGGB", WIDTH))
+    assert numpy.array_equal(displayable[HEIGHT + 1:2 * (HEIGHT + 1)], first)
+
+
+def test_incomplete_frame():
+    img, _ = recording("GRAY", WIDTH * HEIGHT - WIDTH * 5)
+    assert img.n_frames(HEIGHT) == N_FRAMES
+    assert img.frames(HEIGHT)[-1].height == HEIGHT - 4 * 5
+    assert get_displayable(img, HEIGHT).shape == (img.height, WIDTH, 3)
+
+
+def test_frames_with_stride():
+    stride = WIDTH + 16
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                (HEIGHT * N_FRAMES, stride),
+                                                dtype=numpy.uint8)
+    img = parse_image(data.tobytes(), "RGGB", WIDTH, stride=stride)
+    for i, frame in enumerate(img.frames(HEIGHT)):
+        assert numpy.shares_memory(frame.processed_data, img.processed_data)
+        assert numpy.array_equal(frame.processed_data,
+                                 data[i * HEIGHT:(i + 1) * HEIGHT, :WIDTH])
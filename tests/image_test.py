@@ -1,6 +1,8 @@
 import unittest
 import numpy
 import os
+import tempfile
+import threading
 import raviewer.image.image as image
 import raviewer.image.color_format as cf
 from raviewer.src.core import load_image
@@ -22,6 +24,22 @@ class TestImageClass(unittest.TestCase):
         with self.assertRaises(Exception):
             load_image("not_real_path")
 
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "requires named pipes")
+    def test_from_pipe(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "pipe")
+            os.mkfifo(path)
+
+            def write():
+                with open(path, "wb") as pipe:
+                    pipe.write(self.img.data_buffer)
+
+            writer = threading.Thread(target=write)
+            writer.start()
+            data_buffer = load_image(path).data_buffer
+            writer.join()
+        self.assertEqual(data_buffer, self.img.data_buffer)
+
     def test_height_width(self):
         self.assertEqual(self.img.width, 1280)
         self.assertEqual(self.img.height, 720)
@@ -0,0 +1,80 @@
+"""Tests for compiled kernels and their numpy fallbacks"""
+import numpy
+import pytest
+
+from raviewer.image.color_format import AVAILABLE_FORMATS
+from raviewer.parser import kernels
+from raviewer.parser.factory import ParserFactory
+from raviewer.src.core import parse_image, get_displayable
+
+WIDTH, HEIGHT = 322, 240
+
+
+@pytest.fixture
+def backend():
+    default = kernels.get_backend()
+    yield
+    kernels.set_backend(default)
+
+
+def test_set_backend(backend):
+    assert "numpy" in kernels.available_backends()
+    kernels.set_backend("numpy")
+    assert kernels.get_backend() == "numpy"
+    with pytest.raises(ValueError):
+        kernels.set_backend("unknown")
+
+
+@pytest.mark.parametrize('name', kernels.BACKENDS)
+def test_lookup(name, backend):
+    if name not in kernels.available_backends():
+        pytest.skip("{} is not installed".format(name))
+    kernels.set_backend(name)
+    values = numpy.arange(300, dtype=numpy.uint16)
+    for columns in [1, 3, 4]:
+        lut = numpy.arange(256 * columns,
+                           dtype=numpy.uint8).reshape(256, columns)
+        out = numpy.empty((len(values), columns), dtype=numpy.uint8)
+        kernels.lookup(values, lut, out)
+        assert numpy.array_equal(out, lut[numpy.minimum(values, 255)])
+
+
+@pytest.mark.parametrize('name', kernels.BACKENDS)
+def test_palette_color(name, backend):
+    if name not in kernels.available_backends():
+        pytest.skip("{} is not installed".format(name))
+    kernels.set_backend(name)
+    values = numpy.random.default_rng(0).integers(0,
+                                                  256, (5, 7),
+                                                  dtype=numpy.uint8)
+    colors = numpy.array([[[1., 0., 0.3], [0.5, 1., 0.]],
+                          [[0., 0.7, 1.], [1., 1., 1.]]])
+    out = kernels.palette_color(values, colors)
+    for y in range(5):
+        for x in range(7):
+            expected = (values[y, x] * colors[y % 2, x % 2]).astype('uint8')
+            assert numpy.array_equal(out[y, x], expected)
+
+
+@pytest.mark.parametrize('fmt', AVAILABLE_FORMATS.keys())
+def test_backends_give_identical_results(fmt, backend):
+    pytest.importorskip("numba")
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                WIDTH * HEIGHT * 4,
+                                                dtype=numpy.uint8).tobytes()
+    img = parse_image(data, fmt, WIDTH)
+    parser = ParserFactory.create_object(img.color_format)
+    results = {}
+    for name in kernels.BACKENDS:
+        kernels.set_backend(name)
+        results[name] = [
+            parse_image(data, fmt, WIDTH).processed_data,
+            get_displayable(img),
+            parser.raw_coloring(img)
+        ]
+    for numpy_result, numba_result in zip(*results.values()):
+        if numpy_result is None:
+            assert numba_result is None
+        else:
+            assert numpy.array_equal(numpy_result, numba_result)
@@ -0,0 +1,56 @@
+"""Tests for memory allocated while parsing images"""
+import copy
+import tracemalloc
+
+import numpy
+import pytest
+
+from raviewer.image.color_format import AVAILABLE_FORMATS, Endianness
+from raviewer.parser.factory import ParserFactory
+
+WIDTH, HEIGHT = 1920, 1080
+# largest allowed memory allocated while parsing, as a fraction of the size of the data
+MAX_EXTRA_MEMORY = 0.1
+
+
+def parse(data, color_format):
+    parser = ParserFactory.create_object(color_format)
+    return parser.parse(data, color_format, WIDTH)
+
+
+@pytest.mark.parametrize('fmt', AVAILABLE_FORMATS.keys())
+def test_parse_peak_memory(fmt):
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                WIDTH * HEIGHT * 4,
+                                                dtype=numpy.uint8).tobytes()
+    #values in other byte order than native are swapped once, which copies them
+    color_format = copy.copy(AVAILABLE_FORMATS[fmt])
+    color_format.endianness = Endianness.LITTLE_ENDIAN
+    #lookup tables are built and cached by the first parse
+    parse(data[:WIDTH * 4], color_format)
+
+    tracemalloc.start()
+    try:
+        img = parse(data, color_format)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+    if numpy.shares_memory(img.processed_data, buffer):
+        decoded = 0
+    else:
+        #components not aligned to bytes are decoded once
+        assert max(color_format.bits_per_components) % 8 != 0
+        decoded = img.processed_data.nbytes
+    assert peak - decoded < MAX_EXTRA_MEMORY * len(data)
+
+
+@pytest.mark.parametrize('fmt', ["GRAY10", "RGB24", "NV12", "YUY2"])
+def test_parse_copies_unaligned_data(fmt):
+    data = bytearray(WIDTH * HEIGHT * 4 + 1)
+    img = parse(data, AVAILABLE_FORMATS[fmt])
+    assert len(data) == WIDTH * HEIGHT * 4 + 1
+    assert not numpy.shares_memory(img.processed_data,
+                                   numpy.frombuffer(data, dtype=numpy.uint8))
@@ -0,0 +1,32 @@
+"""Tests for offset discovery"""
+import numpy
+import pytest
+
+from raviewer.format_recognition.offset import find_offsets, line_layout, row_coherence
+from raviewer.image.image import Image
+from .utils import resource_image
+
+
+def test_line_layout():
+    assert line_layout("RGB24", 10) == (30, 3)
+    assert line_layout("RG12", 10) == (20, 4)
+    assert line_layout("YUY2", 10) == (20, 4)
+    assert line_layout("I420", 10) == (10, 1)
+
+
+def test_row_coherence():
+    rows = numpy.array(
+        [[0, 1, 2, 3], [0, 1, 2, 3], [3, 2, 1, 0], [5, 5, 5, 5]],
+        dtype=numpy.float32)
+    assert numpy.allclose(row_coherence(rows), [1., -1., 0.])
+    assert numpy.allclose(row_coherence(rows, 2), [-1., 0.])
+
+
+@pytest.mark.parametrize('fmt', ["RGB24", "GRAY", "RGGB", "YUY2", "NV12"])
+@pytest.mark.parametrize('header', [0, 54, 4096, 10001])
+def test_find_offsets(fmt, header, width=1000, height=750):
+    img = resource_image(fmt, width, height)
+    rng = numpy.random.default_rng(header)
+    data = rng.integers(0, 256, header, dtype=numpy.uint8).tobytes()
+    offsets = find_offsets(Image(data + bytes(img.data_buffer)), fmt, width)
+    assert offsets[0][0] == header
@@ -0,0 +1,28 @@
+"""Tests for the overview map"""
+import numpy
+
+from raviewer.src.overview import Overview
+
+
+def test_overview():
+    data = bytearray(2048) + bytearray(range(256)) * 4
+    overview = Overview(data, 1024)
+    overview.processed_content()
+    assert overview.computed == Overview.blocks
+    assert overview.updated
+    assert overview.block_size == 2
+    assert overview.extent() == (1024, 1024 + 2 * Overview.blocks)
+    assert numpy.all(overview.texture[:, :, 3] == 1)
+    assert numpy.all(overview.texture[:512, 1, :3] == 0)
+    assert overview.describe(0) is None
+    assert overview.describe(2048 + 254) == \
+        "0x0008fe - 0x000900\nEntropy: 1.00\nMean: 254.5"
+
+
+def test_overview_cancel():
+    overview = Overview(bytearray(1 << 20))
+    overview.cancel()
+    overview.processed_content()
+    assert overview.computed == 0
+    assert not overview.updated
+    assert numpy.all(overview.texture == 0)
@@ -5,8 +5,10 @@ import sys
 import os
 import re
 
-from raviewer.src.core import load_image, parse_image
-from raviewer.image.color_format import AVAILABLE_FORMATS, PixelFormat, SubsampledColorFormat
+from raviewer.src.core import load_image, parse_image, get_displayable, set_yuv_conversion, DEMOSAIC_METHODS
+from raviewer.parser import kernels
+from raviewer.parser.factory import ParserFactory
+from raviewer.image.color_format import AVAILABLE_FORMATS, PixelFormat, SubsampledColorFormat, YUVMatrix, YUVRange
 from raviewer.image.image import Image
 from raviewer.src.utils import determine_color_format
 
@@ -19,11 +21,11 @@ def print_result(fmt, res):
     print()
 
 
-def print_header(sizes):
+def print_header(sizes, name="Format", unit="ms"):
     """Print header of the table with sizes of test images"""
-    print(f'{"Format":20}', end='')
+    print(f'{name:20}', end='')
     for i in range(0, len(sizes), 2):
-        print(f' {str(sizes[i])+"x"+str(sizes[i+1])+"[ms]":>14}', end='')
+        print(f' {str(sizes[i])+"x"+str(sizes[i+1])+"["+unit+"]":>14}', end='')
     print()
 
 
@@ -101,6 +103,76 @@ def random_mode(sizes, image_formats, count):
         print_result(fmt, res)
 
 
+def demosaic_mode(sizes, count):
+    """Run benchmark of displaying Bayer images with every demosaicing method on random data"""
+    print_header(sizes, "Method", "ms/MP")
+    methods = [(method, {"demosaic": method}) for method in DEMOSAIC_METHODS]
+    for name, kwargs in methods + [("preview", {"preview": True})]:
+        res = []
+        for i in range(0, len(sizes), 2):
+            megapixels = sizes[i] * sizes[i + 1] / 1e6
+            img = parse_image(os.urandom(sizes[i] * sizes[i + 1]), "RGGB",
+                              sizes[i])
+            #the first call sets up lookup tables and OpenCV buffers
+            get_displayable(img, **kwargs)
+            t = timeit.Timer(lambda: get_displayable(img, **kwargs))
+            res.append(1000 * t.timeit(count) / count / megapixels)
+        print_result(name, res)
+
+
+def kernels_mode(sizes, image_formats, count):
+    """Run benchmark of displaying and raw coloring images with every available kernel backend on random data"""
+    print_header(sizes, "Format (backend)")
+    max_size = 0
+    for i in range(0, len(sizes), 2):
+        max_size = max(max_size, sizes[i] * sizes[i + 1])
+    random_image_data = os.urandom(max_size * 8)
+    for fmt in image_formats:
+        for backend in kernels.available_backends():
+            kernels.set_backend(backend)
+            res = []
+            for i in range(0, len(sizes), 2):
+                img = parse_image(
+                    random_image_data[:sizes[i] * sizes[i + 1] * 8], fmt,
+                    sizes[i])
+                parser = ParserFactory.create_object(img.color_format)
+
+                def display():
+                    get_displayable(img)
+                    parser.raw_coloring(img)
+
+                #the first call compiles the kernels
+                display()
+                t = timeit.Timer(display)
+                res.append(1000 * t.timeit(count) / count)
+            print_result(f'{fmt} ({backend})', res)
+
+
+def yuv_conversion_mode(sizes, image_formats, count):
+    """Run benchmark of displaying YUV images with every matrix and range on random data, BT.601 with limited range is converted by OpenCV"""
+    print_header(sizes, "Format (conversion)")
+    max_size = 0
+    for i in range(0, len(sizes), 2):
+        max_size = max(max_size, sizes[i] * sizes[i + 1])
+    random_image_data = os.urandom(max_size * 8)
+    conversions = [(matrix, yuv_range) for matrix in YUVMatrix
+                   for yuv_range in YUVRange]
+    for fmt in image_formats:
+        if not hasattr(determine_color_format(fmt), "yuv_matrix"):
+            continue
+        for matrix, yuv_range in conversions:
+            set_yuv_conversion(matrix, yuv_range)
+            res = []
+            for i in range(0, len(sizes), 2):
+                img = parse_image(
+                    random_image_data[:sizes[i] * sizes[i + 1] * 8], fmt,
+                    sizes[i])
+                t = timeit.Timer(lambda: get_displayable(img))
+                res.append(1000 * t.timeit(count) / count)
+            print_result(f'{fmt} ({matrix.name}, {yuv_range.name})', res)
+    set_yuv_conversion(YUVMatrix.BT601, YUVRange.LIMITED)
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog='Parser performance benchmark script')
@@ -117,6 +189,18 @@ def main():
                        '--random',
                        action='store_true',
                        help='Use random data for testing')
+    group.add_argument('--demosaic',
+                       action='store_true',
+                       help=('Measure time per megapixel of displaying '
+                             'Bayer images with every demosaicing method'))
+    group.add_argument('--kernels',
+                       action='store_true',
+                       help=('Compare time of displaying and raw coloring '
+                             'images with every available kernel backend'))
+    group.add_argument('--yuv-conversion',
+                       action='store_true',
+                       help=('Compare time of displaying YUV images '
+                             'with every matrix and range'))
     group.add_argument('--coverage',
                        help=('Run dedicated test from specified '
                              'directory for each supported format'))
@@ -143,6 +227,15 @@ def main():
         return directory_mode(args.DIRECTORY, args.size, args.image_formats,
                               args.count)
 
+    if args.demosaic:
+        return demosaic_mode(args.size, args.count)
+
+    if args.kernels:
+        return kernels_mode(args.size, args.image_formats, args.count)
+
+    if args.yuv_conversion:
+        return yuv_conversion_mode(args.size, args.image_formats, args.count)
+
     if args.coverage is not None:
         return coverage_mode(args.coverage, args.size, args.image_formats,
                              args.count)
@@ -1,5 +1,6 @@
 """Tests for raw view"""
 
+import copy
 import re
 from glob import glob
 from os import environ
@@ -8,6 +9,7 @@ import numpy as np
 import pytest
 
 from raviewer.image.color_format import AVAILABLE_FORMATS
+from raviewer.parser import kernels
 from raviewer.parser.factory import ParserFactory
 from raviewer.src.utils import determine_color_format
 
@@ -84,3 +86,51 @@ def test_compare_with_expected(image_data):
     out = parser.raw_coloring(image)
 
     assert (out == expected).all()
+
+
+@pytest.fixture
+def backend():
+    default = kernels.get_backend()
+    yield
+    kernels.set_backend(default)
+
+
+@pytest.mark.parametrize('fmt', [
+    "RGB24", "RGBA32", "RGB565", "YUY2", "UYVY", "NV12", "NV21", "I420",
+    "YV12", "I422", "P010"
+])
+def test_palette_change_reuses_components(fmt, backend):
+    """Changing the palette recolors cached components like a new image"""
+    color_format = copy.deepcopy(determine_color_format(fmt))
+    parser = ParserFactory.create_object(color_format)
+    data = np.random.default_rng(0).integers(0,
+                                             256,
+                                             64 * 48 * 3,
+                                             dtype=np.uint8).tobytes()
+    image = parser.parse(data, color_format, 64)
+    parser.raw_coloring(image)
+    planes = image.raw_planes
+    for i, key in enumerate(color_format.palette):
+        color_format.palette[key] = (0.7, 0.1 * i, 0.33)
+    results = []
+    for name in kernels.available_backends():
+        kernels.set_backend(name)
+        out = parser.raw_coloring(image)
+        assert image.raw_planes is planes
+        expected = parser.raw_coloring(parser.parse(data, color_format, 64))
+        assert np.array_equal(out, expected)
+        results.append(out)
+    assert all(np.array_equal(results[0], out) for out in results)
+
+    image.reshape(32)
+    assert parser.raw_coloring(image).shape != results[0].shape
+    assert image.raw_planes is not planes
+
+
+def test_palette_color_in_single_precision(backend):
+    values = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    colors = [[(0.7, 0.1, 0.33)]]
+    expected = (values[..., None] * np.float32(colors)).astype(np.uint8)
+    for name in kernels.available_backends():
+        kernels.set_backend(name)
+        assert np.array_equal(kernels.palette_color(values, colors), expected)
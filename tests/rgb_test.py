@@ -2,7 +2,7 @@ import unittest
 import numpy
 import os
 from unittest.mock import (Mock, patch)
-from raviewer.parser.rgb import ParserARGB, ParserRGBA, ParserBGRA, ParserABGR, ParserRGB, ParserBGR
+from raviewer.parser.rgb import ParserARGB, ParserRGBA, ParserBGRA, ParserABGR, ParserRGB, ParserBGR, pixel_lut
 from enum import Enum
 
 
@@ -42,6 +42,7 @@ class TestRGBParserClass(unittest.TestCase):
                                  width=2,
                                  height=1)
         self.RGB565_IMAGE.processed_data = numpy.array([0, 0, 0, 31, 63, 31])
+        self.RGB565_IMAGE.packed_pixels = numpy.array([[0, 0xFFFF]])
 
         self.raw_data = bytes((0, 0, 255, 255))
 
@@ -122,6 +123,7 @@ class TestARGBParserClass(unittest.TestCase):
                                   height=1)
         self.ARGB444_IMAGE.processed_data = numpy.array(
             [0, 0, 0, 0, 15, 15, 15, 15])
+        self.ARGB444_IMAGE.packed_pixels = numpy.array([[0, 0xFFFF]])
 
         self.raw_data = bytes((0, 0, 255, 255))
 
@@ -186,6 +188,41 @@ class TestARGBParserClass(unittest.TestCase):
         self.assertTrue((displayable == numpy.array([[[255, 255, 0,
                                                        0]]])).all())
 
+    def test_get_displayable_out(self):
+        out = numpy.zeros((1, 2, 4), dtype=numpy.uint8)
+        displayable = self.parserARGB.get_displayable(self.ARGB444_IMAGE,
+                                                      channels={
+                                                          "r_y": True,
+                                                          "g_u": False,
+                                                          "b_v": True,
+                                                          "a_v": False
+                                                      },
+                                                      out=out)
+        self.assertIs(displayable, out)
+        self.assertTrue((out == numpy.array([[[0, 0, 0, 255],
+                                              [255, 0, 255, 255]]])).all())
+
+        with self.assertRaises(ValueError):
+            self.parserABGR.get_displayable(self.ABGR32_IMAGE,
+                                            out=numpy.empty((1, 2, 4),
+                                                            numpy.uint8))
+
+
+class TestPixelLut(unittest.TestCase):
+
+    def test_pixel_lut(self):
+        lut = pixel_lut((5, 6, 5, 0))
+        self.assertEqual(lut.shape, (1 << 16, 4))
+        self.assertEqual(list(lut[0b1000000100000001]), [16, 8, 1, 0])
+
+        lut = pixel_lut((5, 6, 5, 0), (2, 1, 0, 3), scaled=True)
+        self.assertEqual(list(lut[0xFFFF]), [255, 255, 255, 255])
+        self.assertEqual(list(lut[0b1000000100000001]), [8, 32, 131, 255])
+
+        lut = pixel_lut((3, 3, 2, 0))
+        self.assertEqual(lut.shape, (256, 4))
+        self.assertFalse(lut.flags.writeable)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,80 @@
+"""Tests for locating images inside dumps"""
+import numpy
+import pytest
+
+from raviewer.format_recognition.scan import block_entropy, find_images, overview_statistics, overview_block_size, scan_file
+from .utils import resource_image
+
+
+def test_block_entropy():
+    blocks = numpy.zeros((3, 256), dtype=numpy.uint8)
+    blocks[1, 128:] = 1
+    blocks[2] = numpy.arange(256)
+    assert numpy.allclose(block_entropy(blocks), [0., 1., 8.])
+
+
+@pytest.mark.parametrize('n_blocks', [1, 7, 1024])
+def test_overview_statistics(n_blocks):
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                100001,
+                                                dtype=numpy.uint8)
+    data[:50000] = 10
+    entropy, mean = [
+        numpy.concatenate(stats) for stats in zip(*[
+            stats[1:] for stats in overview_statistics(
+                data.tobytes(), 1, len(data), n_blocks, chunk_size=4096)
+        ])
+    ]
+    block_size = overview_block_size(1, len(data), n_blocks)
+    assert len(entropy) == len(mean) == -(-(len(data) - 1) // block_size)
+    assert numpy.isclose(mean[0], data[1:1 + block_size].mean())
+    assert numpy.isclose(mean[-1],
+                         data[1 + (len(mean) - 1) * block_size:].mean())
+    if n_blocks > 2:
+        assert entropy[0] == 0
+        assert entropy[-2] > 0.9 * numpy.log2(min(block_size, 256))
+
+
+def make_dump(fmts, width=1000, height=750):
+    rng = numpy.random.default_rng(0)
+    parts = [rng.integers(0, 256, 300001, dtype=numpy.uint8)]
+    offsets = []
+    for fmt in fmts:
+        parts.append(numpy.zeros(77777, dtype=numpy.uint8))
+        offsets.append(sum(len(part) for part in parts))
+        parts.append(
+            numpy.frombuffer(resource_image(fmt, width, height).data_buffer,
+                             dtype=numpy.uint8))
+    parts.append(rng.integers(0, 256, 100000, dtype=numpy.uint8))
+    return numpy.concatenate(parts), offsets
+
+
+@pytest.mark.parametrize(
+    'fmts', [["RGB24", "NV12", "YUY2"], ["GRAY", "RGGB", "RGBA32"]])
+def test_find_images(fmts):
+    data, offsets = make_dump(fmts)
+    regions = find_images(data)
+    assert [region["offset"] for region in regions] == offsets
+    for region, offset in zip(regions, offsets):
+        assert offset + region["size"] < len(data)
+
+
+def test_find_images_in_random_data():
+    rng = numpy.random.default_rng(0)
+    assert find_images(rng.integers(0, 256, 1 << 21, dtype=numpy.uint8)) == []
+
+
+def test_scan_file(tmp_path):
+    data, offsets = make_dump(["RGB24"])
+    path = tmp_path / "dump.bin"
+    data.tofile(path)
+    regions = scan_file(str(path))
+    assert len(regions) == 1
+    assert regions[0]["offset"] == offsets[0]
+    assert regions[0]["format"] == "RGB24"
+    assert regions[0]["width"] == 1000
+
+    empty = tmp_path / "empty.bin"
+    empty.touch()
+    assert scan_file(str(empty)) == []
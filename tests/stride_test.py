@@ -0,0 +1,68 @@
+"""Tests for parsing data with padded lines"""
+import numpy
+import pytest
+
+from raviewer.src.core import parse_image, get_displayable
+from .utils import resource_image
+
+WIDTH, HEIGHT = 1000, 750
+# fraction of lines (of luma width) that belong to the luma plane of planar formats
+PLANAR = {"I420": 2 / 3, "YV12": 2 / 3, "I422": 1 / 2}
+SEMIPLANAR = ["NV12", "NV21"]
+
+
+def pad_lines(data, line_size, stride):
+    lines = data.reshape(-1, line_size)
+    padded = numpy.full((len(lines), stride), 0xAA, dtype=numpy.uint8)
+    padded[:, :line_size] = lines
+    return padded.ravel()
+
+
+def pad_image(fmt, data, padding):
+    """Pads lines of a resource image like capture hardware does"""
+    if fmt in PLANAR:
+        luma = int(len(data) // WIDTH * PLANAR[fmt]) * WIDTH
+        return WIDTH + padding, numpy.concatenate([
+            pad_lines(data[:luma], WIDTH, WIDTH + padding),
+            pad_lines(data[luma:], WIDTH // 2, (WIDTH + padding) // 2)
+        ])
+    line_size = WIDTH if fmt in SEMIPLANAR else len(data) // HEIGHT
+    return line_size + padding, pad_lines(data, line_size, line_size + padding)
+
+
+@pytest.mark.parametrize('fmt', [
+    "GRAY", "GRAY10", "RGGB", "RG12", "RGB24", "BGRA32", "RGB565", "RGBA444",
+    "RGB332", "YUY2", "UYVY", "NV12", "NV21", "I420", "YV12", "I422"
+])
+def test_stride(fmt):
+    data = numpy.frombuffer(resource_image(fmt, WIDTH, HEIGHT).data_buffer,
+                            dtype=numpy.uint8)
+    stride, padded = pad_image(fmt, data, 24)
+    reference = parse_image(data.tobytes(), fmt, WIDTH)
+    img = parse_image(padded.tobytes(), fmt, WIDTH, stride=stride)
+    assert (img.width, img.height) == (reference.width, reference.height)
+    assert numpy.array_equal(img.processed_data.ravel(),
+                             reference.processed_data)
+    assert numpy.array_equal(get_displayable(img), get_displayable(reference))
+
+
+@pytest.mark.parametrize('fmt', ["GRAY", "GRAY10", "RGGB", "RGB24"])
+def test_stride_without_copy(fmt):
+    data = numpy.frombuffer(resource_image(fmt, WIDTH, HEIGHT).data_buffer,
+                            dtype=numpy.uint8)
+    stride, padded = pad_image(fmt, data, 64)
+    img = parse_image(padded.tobytes(), fmt, WIDTH, stride=stride)
+    words = img.byte_order_views[img.color_format.endianness]
+    assert numpy.shares_memory(img.processed_data, words)
+    if words.itemsize == 1:
+        assert numpy.shares_memory(
+            words, numpy.frombuffer(img.data_buffer, dtype=numpy.uint8))
+
+
+def test_stride_too_short():
+    with pytest.raises(ValueError):
+        parse_image(bytes(1000), "RGB24", 100, stride=200)
+    with pytest.raises(ValueError):
+        parse_image(bytes(1000), "GRAY10", 100, stride=201)
+    with pytest.raises(ValueError):
+        parse_image(bytes(1000), "I420", 100, stride=101)
@@ -1,4 +1,6 @@
 from raviewer.src.core import (align_image)
+from raviewer.src.transforms import Align, Reverse, TransformedBuffer
+import numpy as np
 import pytest
 
 
@@ -10,3 +12,78 @@ def test_align():
 
     aligned_buffer = align_image(data_buffer, -8)
     assert aligned_buffer == data_buffer[8:]
+
+
+def test_align_every_frame():
+    data_buffer = bytearray(range(12))
+    aligned_buffer = align_image(data_buffer, 2, 255, 3)
+    assert aligned_buffer == bytearray([255, 255, 0, 1, 2, 3]) + bytearray(
+        [255, 255, 4, 5, 6, 7]) + bytearray([255, 255, 8, 9, 10, 11])
+    assert align_image(data_buffer, -1, 0,
+                       3) == bytearray([1, 2, 3, 5, 6, 7, 9, 10, 11])
+
+
+def test_skip_resolves_to_view():
+    """Skipped bytes are resolved to a view of the original data"""
+    data_buffer = bytearray(range(64))
+    buffer = TransformedBuffer(data_buffer)
+    buffer.push(Align(-8))
+    assert buffer.data == data_buffer[8:]
+    assert np.shares_memory(np.frombuffer(buffer.data, dtype=np.uint8),
+                            np.frombuffer(data_buffer, dtype=np.uint8))
+
+    #inserted bytes are skipped before the original data
+    buffer.push(Align(4, 16))
+    buffer.push(Align(-6))
+    assert buffer.data == data_buffer[10:]
+    assert buffer.data.obj is data_buffer
+    assert buffer.offset == -10
+
+
+def test_undo():
+    data_buffer = bytearray(range(64))
+    buffer = TransformedBuffer(data_buffer)
+    buffer.push(Align(-8))
+    skipped = buffer.data
+    buffer.push(Align(12, 7))
+    assert buffer.data == bytearray([7] * 12) + data_buffer[8:]
+    buffer.push(Reverse(4))
+    assert buffer.data[8:16] == bytearray([7] * 4 + [11, 10, 9, 8])
+
+    assert isinstance(buffer.undo(), Reverse)
+    assert isinstance(buffer.undo(), Align)
+    assert buffer.data is skipped
+    buffer.undo()
+    assert buffer.data is data_buffer
+    assert buffer.undo() is None
+    assert data_buffer == bytearray(range(64))
+
+
+@pytest.mark.parametrize('group', [0, 1, 2, 3, 4])
+def test_reverse(group):
+    data_buffer = bytearray(range(10))
+    expected = bytearray()
+    for i in range(0, len(data_buffer), max(group, 1)):
+        expected += data_buffer[i:i + max(group, 1)][::-1]
+    assert Reverse(group).apply(data_buffer) == expected
+
+
+def test_replace_reverse():
+    """Reversal replaced in its place applies before later alignments"""
+    data_buffer = bytearray(range(16))
+    buffer = TransformedBuffer(data_buffer)
+    buffer.push(Reverse(2))
+    buffer.push(Align(-1))
+    assert buffer.data == Reverse(2).apply(data_buffer)[1:]
+    assert buffer.reverse_bytes == 2
+
+    buffer.replace(Reverse(4))
+    assert buffer.data == Reverse(4).apply(data_buffer)[1:]
+    assert [type(t) for t in buffer.transforms] == [Reverse, Align]
+    assert buffer.reverse_bytes == 4
+
+    buffer.undo()
+    buffer.undo()
+    assert buffer.reverse_bytes == 1
+    buffer.replace(Reverse(2))
+    assert buffer.data == Reverse(2).apply(data_buffer)
@@ -0,0 +1,55 @@
+"""Tests for converting bands of images in parallel"""
+import numpy
+import pytest
+
+from raviewer.src.core import parse_image, get_displayable, set_threads
+from raviewer.parser.common import get_threads, split_bands, MIN_BAND_LINES
+
+WIDTH, HEIGHT = 1000, 750
+
+
+@pytest.fixture
+def threads():
+    yield
+    set_threads(0)
+
+
+def test_set_threads(threads):
+    set_threads(3)
+    assert get_threads() == 3
+    set_threads(0)
+    assert get_threads() >= 1
+    with pytest.raises(ValueError):
+        set_threads(-1)
+
+
+def test_split_bands(threads):
+    set_threads(4)
+    assert split_bands(10 * MIN_BAND_LINES) == [(0, 160), (160, 320),
+                                                (320, 480), (480, 640)]
+    bands = split_bands(4 * MIN_BAND_LINES + 3, 4)
+    assert all((last - first) % 4 == 0 for first, last in bands[:-1])
+    assert bands[-1][1] == 4 * MIN_BAND_LINES + 3
+    assert split_bands(MIN_BAND_LINES) == [(0, MIN_BAND_LINES)]
+    assert split_bands(0) == [(0, 0)]
+    set_threads(1)
+    assert split_bands(10 * MIN_BAND_LINES) == [(0, 10 * MIN_BAND_LINES)]
+
+
+@pytest.mark.parametrize('fmt', [
+    "GRAY", "GRAY10", "RGGB", "RG12", "RGB24", "RGB565", "YUY2", "UYVY",
+    "NV12", "NV21", "I420", "I422", "P010"
+])
+def test_threads_do_not_change_result(fmt, threads):
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                WIDTH * HEIGHT * 3,
+                                                dtype=numpy.uint8).tobytes()
+    img = parse_image(data, fmt, WIDTH)
+    channels = {"r_y": True, "g_u": False, "b_v": True, "a_v": True}
+    set_threads(1)
+    expected = [get_displayable(img), get_displayable(img, channels=channels)]
+    set_threads(4)
+    result = [get_displayable(img), get_displayable(img, channels=channels)]
+    for a, b in zip(expected, result):
+        assert numpy.array_equal(a, b)
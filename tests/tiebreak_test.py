@@ -0,0 +1,72 @@
+"""Tests for ranking of formats indistinguishable by classification"""
+import numpy
+import pytest
+
+from raviewer.format_recognition import detect
+from raviewer.format_recognition.tiebreak import classify_ranked, color_prior, rank_bayer_phases, rank_channel_orders
+from raviewer.image.image import Image
+from .utils import resource_image
+
+
+@pytest.mark.parametrize(
+    'group',
+    [["RGB24", "BGR24"], ["NV12", "NV21"], ["I420", "YV12"], ["YUY2", "YVYU"],
+     ["UYVY", "VYUY"], ["RGBA32", "BGRA32"], ["ARGB32", "ABGR32"]])
+def test_rank_channel_orders(group):
+    for fmt in group:
+        ranked, confidence = rank_channel_orders(
+            resource_image(fmt, 1000, 750), group)
+        assert ranked[0] == fmt
+        assert sorted(ranked) == sorted(group)
+        assert 0.2 < confidence <= 1
+
+
+@pytest.mark.parametrize('shift,phase', [(0, "RGGB"), (1, "GRBG"),
+                                         (1000, "GBRG"), (1001, "BGGR")])
+@pytest.mark.parametrize('width', [0, 1000])
+def test_rank_bayer_phases(shift, phase, width):
+    data = resource_image("RGGB", 1000, 750).data_buffer[shift:]
+    ranked, confidence = rank_bayer_phases(Image(data), width)
+    assert ranked[0] == phase
+    assert sorted(ranked) == ["BGGR", "GBRG", "GRBG", "RGGB"]
+    assert 0.2 < confidence <= 1
+
+
+def test_color_prior():
+    r, g, b = numpy.array([[200, 10], [100, 100], [10, 200]])
+    assert color_prior(r, g, b) == 0
+    assert color_prior(r[:1], g[:1], b[:1]) == 1
+    assert color_prior(b[:1], g[:1], r[:1]) == -1
+    assert color_prior(r[:0], g[:0], b[:0]) == 0
+
+
+@pytest.mark.parametrize('fmt,lowest,highest', [("BGR24", 0.2, 1),
+                                                ("RGB565", 0.5, 1),
+                                                ("GRAY", 0.01, 1),
+                                                ("RGBA444", 0, 0)])
+def test_classify_ranked(fmt, lowest, highest):
+    fmts, _, confidence = classify_ranked(resource_image(fmt, 1000, 750))
+    assert fmts[0] == fmt
+    assert len(set(fmts)) == len(fmts)
+    assert lowest <= confidence <= highest
+
+
+def test_confidence_of_narrow_decision():
+    """NV12 data is told apart from I422 by a narrow margin of the classifier"""
+    _, _, confidence = classify_ranked(resource_image("NV12", 1000, 750))
+    assert confidence < 0.1
+
+
+@pytest.mark.parametrize('vote', [0.5, 1.])
+def test_confidence_ignores_endianness_vote(vote, monkeypatch):
+    """The confidence of the byte order does not change the confidence of RGB565"""
+    img = resource_image("RGB565", 1000, 750)
+    _, _, expected = classify_ranked(img)
+    monkeypatch.setattr(detect, "estimate_endianness", lambda *args:
+                        ("BIG_ENDIAN", vote))
+    fmts, endianness, confidence = classify_ranked(img)
+    assert fmts[0] == "RGB565"
+    assert endianness == ("BIG_ENDIAN"
+                          if vote >= detect.ENDIANNESS_CONFIDENCE_CUTOFF else
+                          "LITTLE_ENDIAN")
+    assert confidence == expected
@@ -0,0 +1,74 @@
+"""Tests for converting recordings of planar and semi-planar YUV frames"""
+import numpy
+import pytest
+
+from raviewer.src.core import parse_image, get_displayable
+
+WIDTH, HEIGHT, N_FRAMES = 64, 48, 5
+LUMA_ONLY = {"r_y": True, "g_u": False, "b_v": False}
+# size of chroma planes relative to the luma plane
+CHROMA = {
+    "NV12": 1 / 2,
+    "NV21": 1 / 2,
+    "I420": 1 / 2,
+    "YV12": 1 / 2,
+    "I422": 1
+}
+
+
+def recording(fmt):
+    frame_size = int(WIDTH * HEIGHT * (1 + CHROMA[fmt]))
+    data = numpy.random.default_rng(0).integers(0,
+                                                256,
+                                                frame_size * N_FRAMES,
+                                                dtype=numpy.uint8)
+    frames = [
+        data[i * frame_size:(i + 1) * frame_size] for i in range(N_FRAMES)
+    ]
+    return parse_image(data.tobytes(), fmt, WIDTH), frames
+
+
+@pytest.mark.parametrize('fmt', ["NV12", "NV21", "I420", "YV12", "I422"])
+def test_frames(fmt):
+    img, frames = recording(fmt)
+    displayable = get_displayable(img, HEIGHT)
+    assert displayable.shape == (HEIGHT * N_FRAMES, WIDTH, 3)
+    for i, frame in enumerate(frames):
+        expected = get_displayable(parse_image(frame.tobytes(), fmt, WIDTH))
+        assert numpy.array_equal(displayable[i * HEIGHT:(i + 1) * HEIGHT],
+                                 expected)
+
+
+@pytest.mark.parametrize('fmt', ["NV12", "I420", "I422"])
+def test_frames_luma_only(fmt):
+    img, frames = recording(fmt)
+    displayable = get_displayable(img, HEIGHT, LUMA_ONLY)
+    assert displayable.shape == (HEIGHT * N_FRAMES, WIDTH, 3)
+    for i, frame in enumerate(frames):
+        luma = frame[:WIDTH * HEIGHT].reshape(HEIGHT, WIDTH)
+        for channel in range(3):
+            assert numpy.array_equal(
+                displayable[i * HEIGHT:(i + 1) * HEIGHT, :, channel], luma)
+
+
+@pytest.mark.parametrize('fmt', ["NV12", "I422"])
+def test_frames_out(fmt):
+    img, _ = recording(fmt)
+    out = numpy.empty((HEIGHT * N_FRAMES, WIDTH, 3), dtype=numpy.uint8)
+    assert get_displayable(img, HEIGHT, out=out) is out
+    assert numpy.array_equal(out, get_displayable(img, HEIGHT))
+    with pytest.raises(ValueError):
+        get_displayable(img, HEIGHT, out=out[1:])
+
+
+def test_planar_422_masks():
+    img, frames = recording("I422")
+    y, u, v = numpy.split(frames[0], [WIDTH * HEIGHT, WIDTH * HEIGHT * 3 // 2])
+    masked = numpy.concatenate([y, numpy.zeros_like(u), v])
+    expected = get_displayable(parse_image(masked.tobytes(), "I422", WIDTH))
+    displayable = get_displayable(img, HEIGHT, {
+        "r_y": True,
+        "g_u": False,
+        "b_v": True
+    })
+    assert numpy.array_equal(displayable[:HEIGHT], expected)
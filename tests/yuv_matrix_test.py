@@ -0,0 +1,113 @@
+"""Tests for conversions of YUV images with chosen matrices and ranges"""
+import cv2 as cv
+import numpy
+import pytest
+
+from raviewer.image.color_format import (AVAILABLE_FORMATS, YUVMatrix,
+                                         YUVRange, LUMA_WEIGHTS)
+from raviewer.parser.yuv import (conversion_coefficients, conversion_matrix,
+                                 yuv_to_rgb)
+from raviewer.src.core import parse_image, get_displayable, set_yuv_conversion
+from raviewer.src.utils import RGBtoYUV
+
+WIDTH, HEIGHT = 64, 32
+
+
+@pytest.fixture
+def conversion():
+    yield
+    set_yuv_conversion(YUVMatrix.BT601, YUVRange.LIMITED)
+
+
+def planes(horizontal, vertical):
+    rng = numpy.random.default_rng(0)
+    y = rng.integers(0, 256, (HEIGHT, WIDTH), dtype=numpy.uint8)
+    u, v = rng.integers(0,
+                        256, (2, HEIGHT // vertical, WIDTH // horizontal),
+                        dtype=numpy.uint8)
+    return y, u, v
+
+
+def pack(fmt, y, u, v):
+    if fmt == "NV12":
+        return numpy.concatenate([y.ravel(), numpy.stack([u, v], -1).ravel()])
+    if fmt == "NV21":
+        return numpy.concatenate([y.ravel(), numpy.stack([v, u], -1).ravel()])
+    if fmt in ("I420", "I422"):
+        return numpy.concatenate([y.ravel(), u.ravel(), v.ravel()])
+    if fmt == "YV12":
+        return numpy.concatenate([y.ravel(), v.ravel(), u.ravel()])
+    cells = numpy.stack([y[:, ::2], u, y[:, 1::2], v], -1)
+    if fmt == "UYVY":
+        cells = cells[..., [1, 0, 3, 2]]
+    return cells.ravel()
+
+
+def reference(y, u, v, matrix, yuv_range):
+    kr, kb = LUMA_WEIGHTS[matrix]
+    kg = 1 - kr - kb
+    vertical = len(y) // len(u)
+    horizontal = y.shape[1] // u.shape[1]
+    u = numpy.repeat(numpy.repeat(u, vertical, 0), horizontal, 1) - 128.
+    v = numpy.repeat(numpy.repeat(v, vertical, 0), horizontal, 1) - 128.
+    y = y.astype(numpy.float64)
+    if yuv_range == YUVRange.LIMITED:
+        y, u, v = (y - 16) * 255 / 219, u * 255 / 224, v * 255 / 224
+    rgb = numpy.stack([
+        y + 2 * (1 - kr) * v, y - 2 * kb * (1 - kb) / kg * u - 2 * kr *
+        (1 - kr) / kg * v, y + 2 * (1 - kb) * u
+    ], -1)
+    return numpy.clip(numpy.round(rgb), 0, 255)
+
+
+def test_default_conversion_uses_opencv(conversion):
+    for color_format in AVAILABLE_FORMATS.values():
+        if hasattr(color_format, "yuv_matrix"):
+            assert conversion_matrix(color_format) is None
+    set_yuv_conversion(YUVMatrix.BT709)
+    assert conversion_matrix(AVAILABLE_FORMATS["NV12"]) is \
+        conversion_coefficients(YUVMatrix.BT709, YUVRange.LIMITED)
+    assert AVAILABLE_FORMATS["YUY2"].yuv_range == YUVRange.LIMITED
+
+
+def test_coefficients_match_opencv():
+    y, u, v = planes(2, 2)
+    out = numpy.empty((HEIGHT, WIDTH, 3), dtype=numpy.uint8)
+    yuv_to_rgb(y, u, v,
+               conversion_coefficients(YUVMatrix.BT601, YUVRange.LIMITED), out)
+    expected = cv.cvtColor(
+        pack("NV12", y, u, v).reshape(-1, WIDTH), cv.COLOR_YUV2RGB_NV12)
+    #OpenCV clips luma below 16 before scaling it
+    valid = y >= 16
+    assert numpy.abs(out.astype(int) - expected)[valid].max() <= 1
+
+
+@pytest.mark.parametrize('fmt,horizontal,vertical', [("NV12", 2, 2),
+                                                     ("NV21", 2, 2),
+                                                     ("I420", 2, 2),
+                                                     ("YV12", 2, 2),
+                                                     ("I422", 2, 1),
+                                                     ("YUY2", 2, 1),
+                                                     ("UYVY", 2, 1)])
+@pytest.mark.parametrize('matrix', YUVMatrix)
+@pytest.mark.parametrize('yuv_range', YUVRange)
+def test_conversion(fmt, horizontal, vertical, matrix, yuv_range, conversion):
+    if (matrix, yuv_range) == (YUVMatrix.BT601, YUVRange.LIMITED):
+        pytest.skip("converted by OpenCV")
+    set_yuv_conversion(matrix, yuv_range)
+    y, u, v = planes(horizontal, vertical)
+    img = parse_image(pack(fmt, y, u, v).tobytes(), fmt, WIDTH)
+    result = get_displayable(img)
+    assert result.shape == (HEIGHT, WIDTH, 3)
+    difference = result.astype(int) - reference(y, u, v, matrix, yuv_range)
+    assert numpy.abs(difference).max() <= 1
+
+
+@pytest.mark.parametrize('matrix', YUVMatrix)
+@pytest.mark.parametrize('yuv_range', YUVRange)
+def test_rgb_to_yuv_inverts_conversion(matrix, yuv_range):
+    for rgb in [[255, 0, 0], [0, 255, 0], [0, 0, 255], [200, 120, 40]]:
+        y, u, v = RGBtoYUV(list(rgb), 3, matrix, yuv_range)
+        converted = reference(numpy.array([[y]]), numpy.array([[u]]),
+                              numpy.array([[v]]), matrix, yuv_range)
+        assert numpy.abs(converted.ravel() - rgb).max() <= 3
@@ -4,6 +4,8 @@ import os
 from unittest.mock import (Mock, patch)
 from raviewer.parser.yuv import ParserYUV422P, ParserYUV420SP, \
     ParserYUV420P, ParserUYVY422PA
+from raviewer.image.color_format import YUVMatrix, YUVRange
+from raviewer.image.image import Image
 from enum import Enum
 
 
@@ -32,31 +34,32 @@ class TestYUVParserClass(unittest.TestCase):
         #YUV420 Parser
         self.Y420_FORMAT = Mock(pixel_format=DummyPixelFormat.YUV,
                                 endianness=DummyEndianness.BIG_ENDIAN,
-                                pixel_plane=DummyPixelPlane.SEMIPLANAR)
+                                pixel_plane=DummyPixelPlane.SEMIPLANAR,
+                                yuv_matrix=YUVMatrix.BT601,
+                                yuv_range=YUVRange.LIMITED)
         self.Y420_FORMAT.bits_per_components = (8, 8, 8, 0)
-        self.Y420_IMAGE = Mock(color_format=self.Y420_FORMAT,
-                               width=2,
-                               height=2)
-        self.Y420_IMAGE.processed_data = numpy.array([255, 255, 0, 0, 255, 0],
-                                                     dtype=numpy.uint8)
         self.raw_data_Y420 = bytes((255, 255, 0, 0, 255, 0))
-        self.Y420_IMAGE.data_buffer = self.raw_data_Y420
+        self.Y420_IMAGE = Image(
+            self.raw_data_Y420, self.Y420_FORMAT,
+            numpy.array([255, 255, 0, 0, 255, 0], dtype=numpy.uint8), 2, 2)
+        self.Y420_IMAGE.samples_per_pixel = 1.5
 
         self.parserY420 = ParserYUV420SP()
 
         #YUV422 Parser
         self.Y422_FORMAT = Mock(pixel_format=DummyPixelFormat.UYVY,
                                 endianness=DummyEndianness.BIG_ENDIAN,
-                                pixel_plane=DummyPixelPlane.PACKED)
+                                pixel_plane=DummyPixelPlane.PACKED,
+                                yuv_matrix=YUVMatrix.BT601,
+                                yuv_range=YUVRange.LIMITED)
         self.Y422_FORMAT.bits_per_components = (8, 8, 8, 8)
 
-        self.Y422_IMAGE = Mock(color_format=self.Y422_FORMAT,
-                               width=2,
-                               height=2)
-        self.Y422_IMAGE.processed_data = numpy.array(
-            [255, 255, 0, 255, 0, 0, 255, 0], dtype=numpy.uint8)
         self.raw_data_Y422 = bytes((255, 255, 0, 255, 0, 0, 255, 0))
-        self.Y422_IMAGE.data_buffer = self.raw_data_Y422
+        self.Y422_IMAGE = Image(
+            self.raw_data_Y422, self.Y422_FORMAT,
+            numpy.array([255, 255, 0, 255, 0, 0, 255, 0], dtype=numpy.uint8),
+            2, 2)
+        self.Y422_IMAGE.samples_per_pixel = 2
 
         self.parserY422 = ParserUYVY422PA()
 
@@ -117,31 +120,32 @@ class TestYUVPlanarParserClass(unittest.TestCase):
         #YUV420 Parser
         self.Y420_FORMAT = Mock(pixel_format=DummyPixelFormat.YUV,
                                 endianness=DummyEndianness.BIG_ENDIAN,
-                                pixel_plane=DummyPixelPlane.PLANAR)
+                                pixel_plane=DummyPixelPlane.PLANAR,
+                                yuv_matrix=YUVMatrix.BT601,
+                                yuv_range=YUVRange.LIMITED)
         self.Y420_FORMAT.bits_per_components = (8, 8, 8, 0)
-        self.Y420_IMAGE = Mock(color_format=self.Y420_FORMAT,
-                               width=2,
-                               height=2)
-        self.Y420_IMAGE.processed_data = numpy.array([255, 255, 0, 0, 255, 0],
-                                                     dtype=numpy.uint8)
         self.raw_data_Y420 = bytes((255, 255, 0, 0, 255, 0))
-        self.Y420_IMAGE.data_buffer = self.raw_data_Y420
+        self.Y420_IMAGE = Image(
+            self.raw_data_Y420, self.Y420_FORMAT,
+            numpy.array([255, 255, 0, 0, 255, 0], dtype=numpy.uint8), 2, 2)
+        self.Y420_IMAGE.samples_per_pixel = 1.5
 
         self.parserY420 = ParserYUV420P()
 
         #YUV422 Parser
         self.Y422_FORMAT = Mock(pixel_format=DummyPixelFormat.YUV,
                                 endianness=DummyEndianness.BIG_ENDIAN,
-                                pixel_plane=DummyPixelPlane.PLANAR)
+                                pixel_plane=DummyPixelPlane.PLANAR,
+                                yuv_matrix=YUVMatrix.BT601,
+                                yuv_range=YUVRange.LIMITED)
         self.Y422_FORMAT.bits_per_components = (8, 8, 8, 0)
 
-        self.Y422_IMAGE = Mock(color_format=self.Y422_FORMAT,
-                               width=2,
-                               height=2)
-        self.Y422_IMAGE.processed_data = numpy.array(
-            [255, 255, 0, 0, 255, 0, 0, 255], dtype=numpy.uint8)
         self.raw_data_Y422 = bytes((255, 255, 0, 0, 255, 0, 0, 255))
-        self.Y422_IMAGE.data_buffer = self.raw_data_Y422
+        self.Y422_IMAGE = Image(
+            self.raw_data_Y422, self.Y422_FORMAT,
+            numpy.array([255, 255, 0, 0, 255, 0, 0, 255], dtype=numpy.uint8),
+            2, 2)
+        self.Y422_IMAGE.samples_per_pixel = 2
         self.parserY422 = ParserYUV422P()
 
     @patch("raviewer.parser.common.Endianness", DummyEndianness)